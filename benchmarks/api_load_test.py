@@ -0,0 +1,191 @@
+# HTTP API Load Test
+# Starts the mood API (src/mood_api.py) on a synthetic history in a separate
+# process and drives it from client threads, reporting requests per second
+# and latency percentiles per endpoint mix, with keep-alive connections and
+# with a new connection per request.
+#
+#   python benchmarks/api_load_test.py                          # 10k rows, 1 and 8 clients
+#   python benchmarks/api_load_test.py --sizes 1M --clients 16 --requests 500
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection, HTTPException
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'src')
+sys.path.insert(0, SRC_DIR)
+
+from mood_core import MoodStore
+from reporting import write_report
+from synthetic import SAMPLE_NOTES, parse_size, size_label, write_history
+
+DEFAULT_SIZES = '10k'
+DEFAULT_CLIENTS = '1,8'
+BATCH_SIZE = 100
+START_TIMEOUT = 300
+READS = ['/stats', '/streak', '/entries?days=30', '/charts/trends.png', '/charts/calendar.png',
+         '/charts/distribution.png', '/charts/hours.png']
+
+
+def past_date(rng):
+    """A random day of the last two years, as a date key."""
+    return time.strftime('%Y-%m-%d', time.localtime(time.time() - rng.randrange(1, 730) * 86400))
+
+
+def entry(rng):
+    return {'mood': rng.randint(1, 5), 'note': rng.choice(SAMPLE_NOTES), 'date': past_date(rng)}
+
+
+# Each plan returns the ``(method, path, body)`` of a client's next request
+PLANS = {
+    'stats': lambda rng: ('GET', '/stats', None),
+    'recent': lambda rng: ('GET', '/entries?days=30', None),
+    'chart_cached': lambda rng: ('GET', '/charts/calendar.png', None),
+    # One write in ten: every write invalidates the cache, so charts re-render
+    'mixed': lambda rng: (('POST', '/entries', json.dumps(entry(rng))) if rng.random() < 0.1 else
+                          ('GET', rng.choice(READS), None)),
+    'log': lambda rng: ('POST', '/entries', json.dumps(entry(rng))),
+    'log_batch': lambda rng: ('POST', '/entries/batch', json.dumps({'entries': [entry(rng) for _ in range(BATCH_SIZE)]})),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir, port):
+    """Start the API on ``workdir``'s history and wait until it answers."""
+    server = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, 'mood_api.py'), '--port', str(port),
+                               '--data-file', os.path.join('data', 'mood_data.csv')],
+                              cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + START_TIMEOUT
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("the API server exited during startup")
+        try:
+            connection = HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/streak')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("the API server did not start in time")
+
+
+def client(port, plan, requests, keepalive, seed, latencies, errors):
+    """Send ``requests`` requests from ``plan``, reusing one connection if ``keepalive``."""
+    rng = random.Random(seed)
+    connection = None
+    for _ in range(requests):
+        method, path, body = plan(rng)
+        headers = {'Content-Type': 'application/json'} if body else {}
+        if connection is None:
+            connection = HTTPConnection('127.0.0.1', port, timeout=120)
+
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            failed = response.status >= 400
+        except (OSError, HTTPException):
+            failed = True
+            connection.close()
+            connection = None
+        latencies.append(time.perf_counter() - start)
+        errors.append(failed)
+
+        if not keepalive and connection is not None:
+            connection.close()
+            connection = None
+    if connection is not None:
+        connection.close()
+
+
+def run_scenario(port, name, clients, requests, keepalive=True):
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(port, PLANS[name], requests, keepalive, seed, latencies, errors))
+               for seed in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    percentile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    return {'clients': clients, 'requests': len(latencies), 'keepalive': keepalive, 'seconds': seconds,
+            'requests_per_second': len(latencies) / seconds, 'mean_ms': statistics.fmean(latencies) * 1000,
+            'p50_ms': percentile(0.5), 'p95_ms': percentile(0.95), 'p99_ms': percentile(0.99),
+            'errors': sum(errors)}
+
+
+def run_size(rows, workdir, client_counts, requests):
+    write_history(os.path.join(workdir, 'data', 'mood_data.csv'), rows)
+    MoodStore(os.path.join(workdir, 'data', 'mood_data.csv'))  # split into partitions once, outside the timings
+
+    port = free_port()
+    started = time.perf_counter()
+    server = start_server(workdir, port)
+    print(f"\n🌐 {size_label(rows)} (server ready in {time.perf_counter() - started:.1f} s)")
+    results = []
+    try:
+        run_scenario(port, 'mixed', 1, len(READS) * 3)  # warm up: first renders and note reads
+
+        runs = [(name, True) for name in PLANS] + [('stats', False)]
+        for name, keepalive in runs:
+            for clients in client_counts:
+                count = max(1, requests // 10) if name == 'log_batch' else requests
+                stats = run_scenario(port, name, clients, count, keepalive)
+                label = name if keepalive else f"{name}.new_connection"
+                stats.update({'name': label, 'rows': rows})
+                results.append(stats)
+                print(f"  {label:<24} {clients:>3} clients {stats['requests_per_second']:>9,.0f} req/s"
+                      f"   p50 {stats['p50_ms']:>8.2f} ms   p99 {stats['p99_ms']:>8.2f} ms"
+                      + (f"   {stats['errors']} errors" if stats['errors'] else ""))
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the local mood HTTP API.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"comma separated history sizes (default {DEFAULT_SIZES})")
+    parser.add_argument('--clients', default=DEFAULT_CLIENTS,
+                        help=f"comma separated concurrent client counts (default {DEFAULT_CLIENTS})")
+    parser.add_argument('--requests', type=int, default=200, help="requests per client and scenario (default 200)")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<time>-<commit>-api.json)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    client_counts = [int(count) for count in args.clients.split(',') if count.strip()]
+    results = []
+    for rows in sizes:
+        workdir = tempfile.mkdtemp(prefix='mood_bench_')
+        try:
+            results.extend(run_size(rows, workdir, client_counts, args.requests))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = write_report('api', sizes, results, args.output)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# CSV Load Benchmark
+# Compares the original inferred-type load with the tuned loader (explicit
+# dtypes, format-based date parsing, column pruning, optional pyarrow engine),
+# and the store's full load with a partition-pruned range read.
+#
+#   python benchmarks/load_benchmark.py                  # 100k and 1M rows
+#   python benchmarks/load_benchmark.py --sizes 1M --repeat 5
+
+import argparse
+import importlib.util
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+import pandas as pd
+from mood_core import ANALYTICS_COLUMNS, MoodStore
+from mood_core.model import FRAME_COLUMNS, TEXT_COLUMNS, typed_frame
+from mood_core.storage import read_mood_csv
+from reporting import write_report
+from synthetic import parse_size, size_label, write_history
+
+DEFAULT_SIZES = '100k,1M'
+
+
+def legacy_load(path):
+    """What load_data originally did: inferred dtypes, then a format-less date parse.
+
+    Cheaper than the others because it leaves Timestamp as text; kept for reference.
+    """
+    df = pd.read_csv(path)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def inferred_typed_load(path):
+    """Text read followed by format-less parsing into the compact schema."""
+    df = pd.read_csv(path, dtype=TEXT_COLUMNS)
+    return pd.DataFrame({
+        'Date': pd.to_datetime(df['Date']),
+        'Mood_Score': pd.to_numeric(df['Mood_Score']).astype('int8'),
+        'Note': df['Note'],
+        'Sentiment_Score': pd.to_numeric(df['Sentiment_Score']).astype('float32'),
+        'Sentiment_Label': df['Sentiment_Label'].astype('category'),
+        'Timestamp': pd.to_datetime(df['Timestamp']),
+    })
+
+
+def tuned_load(path, columns=FRAME_COLUMNS, csv_engine='c'):
+    """The store's base-file parse: explicit schema, formats, optional pruning/engine."""
+    return typed_frame(read_mood_csv(path, columns, csv_engine), columns)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'repeat': repeat, 'min': min(samples), 'median': statistics.median(samples),
+            'mean': statistics.fmean(samples), 'max': max(samples)}
+
+
+def run_size(rows, workdir, repeat):
+    path = write_history(os.path.join(workdir, 'mood_data.csv'), rows)
+    size_mb = os.path.getsize(path) / 1e6
+
+    variants = [
+        ('legacy_read_csv', lambda: legacy_load(path)),
+        ('inferred_typed', lambda: inferred_typed_load(path)),
+        ('tuned', lambda: tuned_load(path)),
+        ('tuned_analytics_columns', lambda: tuned_load(path, ANALYTICS_COLUMNS)),
+    ]
+    if importlib.util.find_spec('pyarrow') is not None:
+        variants.append(('tuned_pyarrow', lambda: tuned_load(path, FRAME_COLUMNS, 'pyarrow')))
+        variants.append(('tuned_pyarrow_analytics', lambda: tuned_load(path, ANALYTICS_COLUMNS, 'pyarrow')))
+
+    # The store reads monthly partitions; split a copy once, outside the timings
+    store_file = os.path.join(workdir, 'store', 'mood_data.csv')
+    os.makedirs(os.path.dirname(store_file))
+    shutil.copy(path, store_file)
+    last_day = pd.Timestamp(MoodStore(store_file).partitions.summary()['max_date'])
+    month_ago = last_day - pd.Timedelta(days=29)
+
+    variants.append(('store_cold_load_all_columns', lambda: MoodStore(store_file, columns=FRAME_COLUMNS).load()))
+    variants.append(('store_cold_load_lazy_text', lambda: MoodStore(store_file).load()))
+    variants.append(('store_read_last_30_days', lambda: MoodStore(store_file).read_range(month_ago, last_day)))
+
+    print(f"\n📂 {size_label(rows)} ({size_mb:.0f} MB)   speedup vs inferred_typed (same compact result)")
+    results = []
+    for name, fn in variants:
+        stats = timed(fn, repeat)
+        stats.update({'name': name, 'rows': rows})
+        results.append(stats)
+
+    baseline = next(stats['median'] for stats in results if stats['name'] == 'inferred_typed')
+    for stats in results:
+        stats['speedup'] = baseline / stats['median']
+        print(f"  {stats['name']:<28} {stats['median'] * 1000:>10.1f} ms   {stats['speedup']:>5.2f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare mood CSV load strategies.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"comma separated history sizes (default {DEFAULT_SIZES})")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per variant (default 3)")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<time>-<commit>-load.json)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    results = []
+    for rows in sizes:
+        workdir = tempfile.mkdtemp(prefix='mood_bench_')
+        try:
+            results.extend(run_size(rows, workdir, args.repeat))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = write_report('load', sizes, results, args.output)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
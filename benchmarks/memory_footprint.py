@@ -0,0 +1,92 @@
+# Mood History Memory Footprint
+# Compares bytes per row of the original object-string frame with the
+# compact typed schema (int8 scores, float32 sentiment, categorical labels,
+# datetime64 timestamps, Mood_Label derived from the score).
+#
+#   python benchmarks/memory_footprint.py              # 1M rows
+#   python benchmarks/memory_footprint.py --sizes 100k,1M
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+import pandas as pd
+from mood_core import MoodStore
+from mood_core.model import TEXT_COLUMNS, typed_frame
+from reporting import write_report
+from synthetic import parse_size, size_label, write_history
+
+DEFAULT_SIZES = '1M'
+
+
+def legacy_frame(path):
+    """The frame load_data used to build: inferred dtypes, parsed Date, everything else as read."""
+    df = pd.read_csv(path)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def footprint(df):
+    """Deep memory usage per column plus the total, in bytes."""
+    usage = df.memory_usage(deep=True, index=False)
+    return {'columns': {column: int(size) for column, size in usage.items()},
+            'total': int(usage.sum())}
+
+
+def measure(rows, workdir):
+    path = write_history(os.path.join(workdir, 'mood_data.csv'), rows)
+
+    legacy = footprint(legacy_frame(path))
+    compact = footprint(typed_frame(pd.read_csv(path, dtype=TEXT_COLUMNS)))
+    view = MoodStore(path).load()  # one row per day after de-duplication
+    store_view = footprint(view)
+
+    result = {
+        'name': 'memory_per_row',
+        'rows': rows,
+        'legacy_bytes_per_row': legacy['total'] / rows,
+        'compact_bytes_per_row': compact['total'] / rows,
+        'reduction': 1 - compact['total'] / legacy['total'],
+        'store_view_rows': len(view),
+        'store_view_bytes_per_row': store_view['total'] / max(len(view), 1),
+        'legacy_columns': legacy['columns'],
+        'compact_columns': compact['columns'],
+    }
+
+    print(f"\n🧠 {size_label(rows)}")
+    print(f"  {'Column':<18} {'Legacy B/row':>13} {'Compact B/row':>14}")
+    for column, size in legacy['columns'].items():
+        compact_size = compact['columns'].get(column)
+        compact_text = f"{compact_size / rows:>14.1f}" if compact_size is not None else f"{'derived':>14}"
+        print(f"  {column:<18} {size / rows:>13.1f} {compact_text}")
+    print(f"  {'Total':<18} {result['legacy_bytes_per_row']:>13.1f} {result['compact_bytes_per_row']:>14.1f}"
+          f"   ({result['reduction']:.0%} smaller)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the in-memory footprint of mood histories.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"comma separated history sizes (default {DEFAULT_SIZES})")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<time>-<commit>-memory.json)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    results = []
+    for rows in sizes:
+        workdir = tempfile.mkdtemp(prefix='mood_bench_')
+        try:
+            results.append(measure(rows, workdir))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = write_report('memory', sizes, results, args.output)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Memory-Mapped Sharing Benchmark
+# Starts several reader processes on one history, with and without the
+# memory-mapped numeric sidecar, and reports how much of each reader's
+# loaded view is private memory versus pages shared with the others.
+# Linux only (reads /proc/self/smaps_rollup).
+#
+#   python benchmarks/mmap_sharing.py                     # 1M rows, 4 readers
+#   python benchmarks/mmap_sharing.py --sizes 100k --readers 8
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+from mood_core import MoodStore
+from reporting import write_report
+from synthetic import parse_size, size_label, write_history
+
+DEFAULT_SIZES = '1M'
+
+
+def memory_kb():
+    """``{'private': kB, 'shared': kB}`` of this process."""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+            'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)}
+
+
+def reader(data_file, use_mmap, start, results):
+    """Load the view once everyone is ready and report the memory it added."""
+    store = MoodStore(data_file, use_mmap=use_mmap)
+    before = memory_kb()
+    start.wait()
+
+    began = time.perf_counter()
+    view = store.load()
+    view['Mood_Score'].sum()  # touch the pages
+    seconds = time.perf_counter() - began
+
+    after = memory_kb()
+    results.put({'seconds': seconds, 'rows': len(view),
+                 'private_kb': after['private'] - before['private'],
+                 'shared_kb': after['shared'] - before['shared']})
+    start.wait()  # stay alive until every reader has measured
+
+
+def run_mode(data_file, use_mmap, readers):
+    context = multiprocessing.get_context('spawn')
+    start = context.Barrier(readers)
+    results = context.Queue()
+    processes = [context.Process(target=reader, args=(data_file, use_mmap, start, results))
+                 for _ in range(readers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return samples
+
+
+def measure(rows, workdir, readers):
+    data_file = write_history(os.path.join(workdir, 'mood_data.csv'), rows)
+    MoodStore(data_file)  # split into partitions once
+    MoodStore(data_file, use_mmap=True).load()  # and write the sidecar
+
+    print(f"\n🗺️ {size_label(rows)}, {readers} concurrent readers")
+    print(f"  {'Mode':<10} {'Private MB/reader':>18} {'Shared MB/reader':>17} {'Load ms':>9}")
+    results = []
+    for name, use_mmap in (('pandas', False), ('mmap', True)):
+        samples = run_mode(data_file, use_mmap, readers)
+        result = {
+            'name': name,
+            'rows': rows,
+            'view_rows': samples[0]['rows'],
+            'readers': readers,
+            'private_mb_per_reader': statistics.fmean(s['private_kb'] for s in samples) / 1024,
+            'shared_mb_per_reader': statistics.fmean(s['shared_kb'] for s in samples) / 1024,
+            'median': statistics.median(s['seconds'] for s in samples),
+        }
+        results.append(result)
+        print(f"  {name:<10} {result['private_mb_per_reader']:>18.1f} {result['shared_mb_per_reader']:>17.1f} "
+              f"{result['median'] * 1000:>9.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-process memory of mapped and pandas-loaded views.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"comma separated history sizes (default {DEFAULT_SIZES})")
+    parser.add_argument('--readers', type=int, default=4, help="concurrent reader processes (default 4)")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<time>-<commit>-mmap.json)")
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("⚠️ This benchmark needs Linux /proc/self/smaps_rollup")
+        return
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    results = []
+    for rows in sizes:
+        workdir = tempfile.mkdtemp(prefix='mood_bench_')
+        try:
+            results.extend(measure(rows, workdir, args.readers))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = write_report('mmap', sizes, results, args.output)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Benchmark Reporting
+# Shared JSON result files so runs can be compared across commits
+
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+import pandas as pd
+
+from synthetic import effective_rows
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(suite, sizes, results, output=None):
+    """Write a suite's results with run metadata; returns the file path.
+
+    Defaults to ``benchmarks/results/<time>-<commit>-<suite>.json``.
+    Results with a ``rows`` size also get ``effective_rows``: histories
+    longer than ``MAX_SPAN_DAYS`` repeat dates and load to fewer entries.
+    """
+    commit = git_commit()
+    for result in results:
+        if 'rows' in result:
+            result.setdefault('effective_rows', effective_rows(result['rows']))
+    report = {
+        'suite': suite,
+        'commit': commit,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'sizes': sizes,
+        'results': results,
+    }
+
+    output = output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}-{suite}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    return output
@@ -0,0 +1,223 @@
+# Mood Tracker Benchmark Suite
+# Times the load, save, streak, forecast, correlation, sentiment, chart and PDF paths on synthetic
+# histories and writes the results to JSON for comparison across commits.
+#
+#   python benchmarks/run_benchmarks.py                      # 1k and 100k rows
+#   python benchmarks/run_benchmarks.py --sizes 1k,100k,10M  # include the 10M stress tier
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import timedelta
+
+import matplotlib
+matplotlib.use('Agg')  # charts render headless
+import matplotlib.pyplot as plt
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+
+from mood_core import MoodCorrelation, MoodDataset, MoodForecast, MoodSnapshot, MoodStore, DEFAULT_DATA_FILE, analyze_sentiment
+from mood_core.sentiment import _polarity
+from mood_tracker_gui import MoodTrackerGUI
+from mood_tracker_professional import MoodWiseDark
+from mood_tracker_pdf import SimplePDFExporter
+from reporting import write_report
+from synthetic import SAMPLE_NOTES, parse_size, size_label, write_history
+
+DEFAULT_SIZES = '1k,100k'
+SENTIMENT_TEXTS = 2000
+FORECAST_UPDATES = 100_000
+
+
+class HeadlessLightGUI(MoodTrackerGUI):
+    """Light GUI with its data and chart code but no Tk window."""
+
+    def create_gui(self):
+        pass
+
+
+class HeadlessDarkGUI(MoodWiseDark):
+    """Dark GUI with its data and chart code but no Tk window or watcher."""
+
+    def create_dark_gui(self):
+        pass
+
+    def setup_data(self):
+        super().setup_data()
+        self.ensure_data()  # charts need the full history, not the snapshot
+
+
+def timed(fn, repeat, setup=None):
+    """Run ``fn`` ``repeat`` times and return timing stats in seconds."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    return {
+        'repeat': repeat,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'max': max(samples),
+    }
+
+
+@contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def render(build_figure):
+    """Build a chart figure and rasterize it on the Agg canvas."""
+    fig = build_figure()
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+class BenchmarkRun:
+    def __init__(self, repeat, only=None):
+        self.repeat = repeat
+        self.only = only
+        self.results = []
+
+    def record(self, name, rows, fn, repeat=None, setup=None, ops=None):
+        if self.only and self.only not in name:
+            return
+
+        stats = timed(fn, repeat or self.repeat, setup)
+        stats.update({'name': name, 'rows': rows})
+        if ops:
+            stats['ops_per_sec'] = ops / stats['median']
+
+        self.results.append(stats)
+        rate = f"  ({stats['ops_per_sec']:,.0f} ops/s)" if ops else ""
+        print(f"  {name:<32} {stats['median'] * 1000:>12.2f} ms{rate}")
+
+    def run_size(self, rows, workdir):
+        print(f"\n📊 {size_label(rows)}")
+        data_file = os.path.join(workdir, DEFAULT_DATA_FILE)
+        start = time.perf_counter()
+        write_history(data_file, rows)
+        MoodStore(data_file)  # split into monthly partitions once, outside the timings
+        print(f"  (generated in {time.perf_counter() - start:.1f}s)")
+
+        os.makedirs(os.path.join(workdir, 'data', 'charts'), exist_ok=True)
+        os.makedirs(os.path.join(workdir, 'data', 'reports'), exist_ok=True)
+
+        with working_directory(workdir):
+            # Big files are slow to load; fewer repeats keep the 10M tier bearable
+            heavy = 1 if rows >= 1_000_000 else self.repeat
+
+            self.record('load_data', rows, lambda: MoodDataset(DEFAULT_DATA_FILE), repeat=heavy)
+
+            data = MoodDataset(DEFAULT_DATA_FILE)
+            self.record('read_snapshot', rows, lambda: MoodSnapshot.read(DEFAULT_DATA_FILE))
+
+            def save_and_reload():
+                data.log_entry(4, "Benchmark entry", sentiment=(0.0, "Neutral"))
+                data.load()
+
+            self.record('save_then_reload', rows, save_and_reload, repeat=heavy)
+            self.record('calculate_streak', rows, data.aggregates.streak)
+            self.record('has_logged_today', rows, data.has_logged_today)
+            self.record('forecast_fit', rows, lambda: MoodForecast.from_frame(data.df))
+
+            self.record('correlation_full', rows, lambda: MoodCorrelation().refresh(data.df))
+
+            def correlation_after_entry():
+                data.log_entry(4, "Benchmark entry", sentiment=(0.2, "Positive"))
+                data.correlations()
+
+            self.record('correlation_after_entry', rows, correlation_after_entry)
+
+            forecaster = MoodForecast.from_frame(data.df)
+            first_day = forecaster.last_date
+
+            def forecast_updates():
+                day = first_day
+                for _ in range(FORECAST_UPDATES):
+                    day += timedelta(days=1)
+                    forecaster.update(day, 3)
+
+            self.record('forecast_update', FORECAST_UPDATES, forecast_updates, repeat=1, ops=FORECAST_UPDATES)
+
+            light = HeadlessLightGUI()
+            dark = HeadlessDarkGUI()
+            charts = [
+                ('light.create_trends_chart', light.build_trends_figure),
+                ('light.create_frequency_chart', light.build_frequency_figure),
+                ('light.create_weekday_chart', light.build_weekday_figure),
+                ('light.create_calendar_chart', light.build_calendar_figure),
+                ('dark.create_trends_chart', dark.build_trends_figure),
+                ('dark.create_frequency_chart', dark.build_frequency_figure),
+                ('dark.create_patterns_chart', dark.build_patterns_figure),
+                ('dark.create_time_of_day_chart', dark.build_time_of_day_figure),
+                ('dark.create_calendar_chart', dark.build_calendar_figure),
+            ]
+            for name, build_figure in charts:
+                self.record(name, rows, lambda build_figure=build_figure: render(build_figure), repeat=heavy)
+
+            exporter = SimplePDFExporter(data.df, DEFAULT_DATA_FILE, data)
+
+            def build_pdf():
+                with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                    if exporter.create_simple_pdf_report() is None:
+                        raise RuntimeError("PDF report was not created")
+
+            self.record('create_simple_pdf_report', rows, build_pdf, repeat=heavy)
+
+    def run_sentiment(self):
+        print(f"\n💭 analyze_sentiment ({SENTIMENT_TEXTS:,} texts)")
+        texts = [f"{SAMPLE_NOTES[i % len(SAMPLE_NOTES)]} (day {i})" for i in range(SENTIMENT_TEXTS)]
+
+        def analyze_all():
+            for text in texts:
+                analyze_sentiment(text)
+
+        self.record('analyze_sentiment.uncached', SENTIMENT_TEXTS, analyze_all,
+                    setup=_polarity.cache_clear, ops=SENTIMENT_TEXTS)
+        self.record('analyze_sentiment.cached', SENTIMENT_TEXTS, analyze_all, ops=SENTIMENT_TEXTS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the mood tracker hot paths.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f"comma separated history sizes, e.g. 1k,100k,10M (default {DEFAULT_SIZES})")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark (default 5)")
+    parser.add_argument('--only', help="run only benchmarks whose name contains this text")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<time>-<commit>-hot_paths.json)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    run = BenchmarkRun(args.repeat, args.only)
+
+    run.run_sentiment()
+    for rows in sizes:
+        workdir = tempfile.mkdtemp(prefix='mood_bench_')
+        try:
+            run.run_size(rows, workdir)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = write_report('hot_paths', sizes, run.results, args.output)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
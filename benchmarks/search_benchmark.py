@@ -0,0 +1,101 @@
+# Note Search Benchmark
+# Times the inverted note index (build, incremental add, queries) against
+# scanning the Note column with str.contains, on histories whose notes
+# mix the sample notes with words from a synthetic vocabulary.
+#
+#   python benchmarks/search_benchmark.py                 # 100k and 1M rows
+#   python benchmarks/search_benchmark.py --sizes 1M --repeat 5
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+import numpy as np
+import pandas as pd
+from mood_core import MoodDataset, MoodStore
+from reporting import write_report
+from synthetic import parse_size, write_history
+
+DEFAULT_SIZES = '100k,1M'
+VOCABULARY = 5_000
+QUERIES = ['coffee', 'great morning', '"great coffee"', '"didn\'t sleep well"', 'word42 coffee']
+
+
+def diversify_notes(data_file, seed=0):
+    """Append two vocabulary words to every note so the index sees many distinct notes."""
+    df = pd.read_csv(data_file, dtype=str, keep_default_na=False)
+    rng = np.random.default_rng(seed)
+    words = np.array([f"word{i}" for i in range(VOCABULARY)], dtype=object)
+    df['Note'] = df['Note'] + ' ' + words[rng.integers(0, VOCABULARY, len(df))] + ' ' + \
+        words[rng.integers(0, VOCABULARY, len(df))]
+    df.to_csv(data_file, index=False)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'repeat': repeat, 'min': min(samples), 'median': statistics.median(samples),
+            'mean': statistics.fmean(samples), 'max': max(samples)}
+
+
+def run_size(rows, workdir, repeat):
+    data_file = write_history(os.path.join(workdir, 'data', 'mood_data.csv'), rows)
+    diversify_notes(data_file)
+    MoodStore(data_file)  # split into partitions once, outside the timings
+
+    data = MoodDataset(data_file)
+    print(f"\n🔎 {rows:,} rows ({len(data.df):,} days)")
+    results = []
+
+    def record(name, fn, times=repeat):
+        stats = timed(fn, times)
+        stats.update({'name': name, 'rows': rows})
+        results.append(stats)
+        print(f"  {name:<36} {stats['median'] * 1000:>10.2f} ms")
+
+    record('index_build', lambda: data.check_note_index(rebuild=True), times=1)
+
+    notes = data.with_text(data.df)['Note'].fillna('')
+    for query in QUERIES:
+        record(f"search {query}", lambda query=query: data.search(query))
+    record('str_contains_scan coffee', lambda: notes.str.contains('coffee', case=False, regex=False))
+
+    fresh = MoodDataset(data_file)
+    record('first_search_new_process', lambda: fresh.search('coffee'), times=1)
+    record('log_entry_with_index', lambda: data.log_entry(4, "Benchmark coffee entry", sentiment=(0.0, "Neutral")))
+    record('merge_log', data.notes.merge, times=1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare indexed note search with scanning the notes.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"comma separated history sizes (default {DEFAULT_SIZES})")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per query (default 5)")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<time>-<commit>-search.json)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    results = []
+    for rows in sizes:
+        workdir = tempfile.mkdtemp(prefix='mood_bench_')
+        try:
+            results.extend(run_size(rows, workdir, args.repeat))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = write_report('search', sizes, results, args.output)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
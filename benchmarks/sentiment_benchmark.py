@@ -0,0 +1,108 @@
+# Sentiment Backend Benchmark
+# Scores one shared corpus of notes with every sentiment backend and reports
+# their throughput (note by note and batched, caches cold) and how often
+# each agrees with TextBlob's scores and Positive/Neutral/Negative labels.
+#
+#   python benchmarks/sentiment_benchmark.py                 # 1k and 10k notes
+#   python benchmarks/sentiment_benchmark.py --sizes 100k --repeat 1
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+import numpy as np
+from textblob.en import sentiment as pattern_lexicon
+from mood_core import BACKENDS, LexiconSentiment, sentiment_label
+from reporting import write_report
+from synthetic import SAMPLE_NOTES, parse_size
+
+DEFAULT_SIZES = '1k,10k'
+
+# Note templates filled with lexicon adjectives, so most generated notes are distinct
+OPENINGS = ["Had a", "It was a", "Such a", "What a", "Another", "Not a", "Today was a", "Kind of a"]
+MODIFIERS = ["", "", "very ", "really ", "extremely ", "not ", "not very ", "pretty ", "so "]
+SUBJECTS = ["day", "morning", "meeting", "workout", "night's sleep", "weekend", "commute", "lunch", "evening"]
+ENDINGS = ["", "", ".", "!", "!!", " :)", " :(", " at work", " with friends", ", but the evening was {adjective}"]
+
+
+def build_corpus(size, seed=0):
+    """``size`` notes: the sample notes, then generated ones, the same for every run with ``seed``."""
+    rng = np.random.default_rng(seed)
+    adjectives = sorted(word for word, senses in pattern_lexicon.items() if ' ' not in word and 'JJ' in senses)
+    corpus = SAMPLE_NOTES[:size]
+    while len(corpus) < size:
+        adjective, other = rng.choice(adjectives, 2)
+        ending = ENDINGS[rng.integers(len(ENDINGS))].format(adjective=other)
+        corpus.append(f"{rng.choice(OPENINGS)} {rng.choice(MODIFIERS)}{adjective} {rng.choice(SUBJECTS)}{ending}")
+    return corpus
+
+
+def timed(fn, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        LexiconSentiment.token_ids.cache_clear()
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return {'repeat': repeat, 'min': min(samples), 'median': statistics.median(samples),
+            'mean': statistics.fmean(samples), 'max': max(samples)}, result
+
+
+def agreement(scores, reference):
+    """Label agreement, exact (3 decimal) agreement and score differences against ``reference``."""
+    scores, reference = np.round(scores, 3), np.round(reference, 3)
+    labels = np.array([sentiment_label(score) for score in scores])
+    reference_labels = np.array([sentiment_label(score) for score in reference])
+    difference = np.abs(scores - reference)
+    return {'label_agreement': float((labels == reference_labels).mean()),
+            'exact_agreement': float((difference == 0).mean()),
+            'mean_abs_difference': float(difference.mean()), 'max_abs_difference': float(difference.max())}
+
+
+def run_size(size, repeat):
+    corpus = build_corpus(size)
+    print(f"\n💭 {size:,} notes ({len(set(corpus)):,} distinct)")
+    results, reference = [], None
+
+    for name, backend_class in BACKENDS.items():
+        stats, backend = timed(backend_class, 1)
+        if name != 'textblob':
+            print(f"  {name + ' setup':<28} {stats['median'] * 1000:>10.2f} ms")
+
+        for mode, fn in (('single', lambda: [backend.polarity_of(text) for text in corpus]),
+                         ('batch', lambda: backend.polarities(corpus))):
+            stats, scores = timed(fn, repeat)
+            stats.update({'name': f"{name}.{mode}", 'notes': size, 'notes_per_second': size / stats['median']})
+            if reference is None:
+                reference = np.asarray(scores)
+            stats.update(agreement(np.asarray(scores), reference))
+            results.append(stats)
+            print(f"  {name + ' ' + mode:<28} {stats['median'] * 1000:>10.2f} ms {stats['notes_per_second']:>12,.0f} notes/s"
+                  f"   labels {stats['label_agreement']:>7.2%}   exact {stats['exact_agreement']:>7.2%}"
+                  f"   mean |diff| {stats['mean_abs_difference']:.4f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the throughput and agreement of the sentiment backends.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"comma separated corpus sizes (default {DEFAULT_SIZES})")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per backend and mode (default 3)")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<time>-<commit>-sentiment.json)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    results = []
+    for size in sizes:
+        results.extend(run_size(size, args.repeat))
+
+    output = write_report('sentiment', sizes, results, args.output)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
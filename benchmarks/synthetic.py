@@ -0,0 +1,102 @@
+# Synthetic Mood Histories
+# Fast, vectorized generation of large mood CSVs for the benchmark suite
+
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from mood_core import COLUMNS, MOOD_LABELS, analyze_sentiments
+
+# Same distributions and notes as the light GUI's "Generate Sample Data"
+WEEKDAY_WEIGHTS = {2: 1, 3: 4, 4: 3, 5: 2}
+WEEKEND_WEIGHTS = {3: 2, 4: 4, 5: 3}
+SAMPLE_NOTES = [
+    "Had a great morning workout", "Stressful day at work", "Enjoyed time with friends",
+    "Feeling overwhelmed with tasks", "Accomplished a lot today", "Weather was beautiful",
+    "Didn't sleep well last night", "Great coffee this morning", "Challenging project at work",
+    "Relaxing weekend vibes", "Productive meeting today", "Feeling a bit under the weather",
+    "Excited about weekend plans", "Long day but satisfying", "Meditation helped my mood",
+    "Traffic was terrible today", "Good news from family", "Deadline pressure building up",
+    "Nice walk in the park", "Feeling grateful today"
+]
+
+# datetime64[ns] only reaches back to 1677, so histories longer than this
+# wrap around and repeat dates; loading collapses them to one row per day.
+MAX_SPAN_DAYS = 200_000
+
+CHUNK_ROWS = 1_000_000
+
+
+def effective_rows(rows):
+    """Entries left of a ``rows``-line history once loading keeps one row per day."""
+    return min(rows, MAX_SPAN_DAYS)
+
+
+def size_label(rows):
+    """``'1,000 rows'``, noting the effective count for histories that wrap around."""
+    if effective_rows(rows) < rows:
+        return f"{rows:,} rows ({effective_rows(rows):,} after one-per-day loading)"
+    return f"{rows:,} rows"
+
+
+def parse_size(text):
+    """Parse '1k', '100k', '10M' or a plain integer into a row count."""
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier > 1 else text
+    return int(float(number) * multiplier)
+
+
+def _sample_scores(rng, weights, n):
+    scores = np.array(list(weights), dtype=np.int64)
+    probs = np.array(list(weights.values()), dtype=float)
+    return rng.choice(scores, size=n, p=probs / probs.sum())
+
+
+def synthetic_frame(start, stop, end, rng):
+    """Rows ``start``..``stop`` of a history whose newest day is ``end``."""
+    offsets = np.arange(start, stop) % MAX_SPAN_DAYS
+    dates = np.datetime64(end.date(), 'D') - offsets.astype('timedelta64[D]')
+    weekend = ((dates.astype('int64') + 3) % 7) >= 5  # 1970-01-01 was a Thursday
+
+    scores = np.where(weekend,
+                      _sample_scores(rng, WEEKEND_WEIGHTS, len(dates)),
+                      _sample_scores(rng, WEEKDAY_WEIGHTS, len(dates)))
+    note_ids = rng.integers(0, len(SAMPLE_NOTES), size=len(dates))
+
+    sentiments = analyze_sentiments(SAMPLE_NOTES)
+    notes = np.array(SAMPLE_NOTES, dtype=object)
+    labels = np.array([None] + [MOOD_LABELS[s] for s in range(1, 6)], dtype=object)
+    date_strings = dates.astype(str)
+
+    return pd.DataFrame({
+        'Date': date_strings,
+        'Mood_Score': scores,
+        'Mood_Label': labels[scores],
+        'Note': notes[note_ids],
+        'Sentiment_Score': np.array([s for s, _ in sentiments])[note_ids],
+        'Sentiment_Label': np.array([l for _, l in sentiments], dtype=object)[note_ids],
+        'Timestamp': np.char.add(date_strings.astype('U10'), ' 20:00:00'),
+    }, columns=COLUMNS)
+
+
+def write_history(path, rows, end=None, seed=0):
+    """Write a ``rows``-line mood CSV (oldest first) and return its path."""
+    end = end or datetime.now()
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        file.write(','.join(COLUMNS) + '\n')
+        # Generate newest-first in chunks, then write the chunks oldest-first
+        starts = list(range(0, rows, CHUNK_ROWS))
+        for start in reversed(starts):
+            chunk = synthetic_frame(start, min(start + CHUNK_ROWS, rows), end, rng)
+            chunk.iloc[::-1].to_csv(file, header=False, index=False)
+
+    return path
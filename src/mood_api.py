@@ -0,0 +1,537 @@
+# Mood Tracker HTTP API
+# A local JSON API over the shared mood history, for scripts and internal tools that can't drive the Tk apps
+#
+#   python src/mood_api.py --port 8765
+#   curl -X POST localhost:8765/entries -d '{"mood": 4, "note": "Great coffee this morning"}'
+#   curl localhost:8765/stats
+
+import argparse
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import matplotlib
+matplotlib.use('Agg')  # render off-screen, from any thread
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+import numpy as np
+import pandas as pd
+from mood_core import (COLUMNS, DATE_FORMAT, DEFAULT_DATA_FILE, MOOD_LABELS, TIMESTAMP_FORMAT, HourBins,
+                       MoodDataset, analyze_sentiments, build_entry, calendar_ticks)
+from mood_tracker_pdf import SimplePDFExporter
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Chart renders run on this many pool threads; PDF reports on one of their
+# own, since the exporter draws with pyplot into fixed chart files
+RENDER_WORKERS = 4
+RENDER_TIMEOUT = 120
+
+# Rendered responses kept per data version, least recently used dropped first
+CACHE_BYTES = 64 << 20
+
+MAX_BODY_BYTES = 8 << 20
+MAX_BATCH = 10_000
+MAX_DAYS = 3660
+
+# Seconds an idle keep-alive connection is held open
+IDLE_TIMEOUT = 30
+
+# JSON field of each storage column, in COLUMNS order
+ENTRY_FIELDS = ('date', 'mood', 'label', 'note', 'sentiment', 'sentiment_label', 'timestamp')
+
+CHARTS = ('trends', 'distribution', 'calendar', 'hours')
+CALENDAR_COLORS = ['#FF6B6B', '#FFA07A', '#FFD700', '#98FB98', '#87CEEB']
+
+
+class APIError(Exception):
+    """A request the API refuses, answered with ``status`` and a JSON error message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MoodAPI:
+    """
+    The tracker behind the HTTP handlers: one ``MoodDataset`` shared by every request.
+
+    The dataset is not thread-safe, so each request holds ``_lock`` only
+    while it reads or writes it, and picks up writes from other processes
+    (the GUIs, the CLI) with a cheap ``sync`` first. Any change bumps
+    ``version``. Read responses are cached under the version and the day
+    (streaks and recent entries move at midnight), so repeated reads and
+    chart renders are served from memory until the next write; concurrent
+    requests for a response not cached yet wait on one shared build.
+    Charts render on a worker pool from data copied out under the lock.
+    """
+
+    def __init__(self, data_file=DEFAULT_DATA_FILE, workers=RENDER_WORKERS, cache_bytes=CACHE_BYTES):
+        self.data_file = data_file
+        self.data = MoodDataset(data_file)
+        self.version = 0
+        self.boot = os.urandom(4).hex()  # ETags from an earlier server never match
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # key -> (tag, response)
+        self._cache_bytes = 0
+        self._cache_limit = cache_bytes
+        self._cache_lock = threading.Lock()
+        self._pending = {}  # (key, tag) -> Future of a response being built
+        self.renderer = ThreadPoolExecutor(workers, thread_name_prefix='mood-render')
+        self.reporter = ThreadPoolExecutor(1, thread_name_prefix='mood-report')
+
+    def close(self):
+        self.renderer.shutdown(wait=False, cancel_futures=True)
+        self.reporter.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Versions and the response cache
+    # ------------------------------------------------------------------
+
+    def tag(self):
+        """ETag of the current data version, after picking up writes from other processes."""
+        with self._lock:
+            changes = self.data.sync()
+            if changes is None or changes:
+                self.version += 1
+            return f'"{self.boot}-{self.version}-{datetime.now():%Y%m%d}"'
+
+    def cached(self, key, build):
+        """``(tag, response)`` for ``key``: from the cache if built at this version, else from ``build()``."""
+        tag = self.tag()
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] == tag:
+                self._cache.move_to_end(key)
+                return tag, hit[1]
+            future = self._pending.get((key, tag))
+            owner = future is None
+            if owner:
+                future = self._pending[key, tag] = Future()
+
+        if owner:
+            try:
+                response = build()
+            except BaseException as e:
+                with self._cache_lock:
+                    del self._pending[key, tag]
+                future.set_exception(e)
+                raise
+            # Cache before dropping the pending entry, so no request sees neither
+            with self._cache_lock:
+                self._remember(key, tag, response)
+                del self._pending[key, tag]
+            future.set_result(response)
+        return tag, future.result()
+
+    def _remember(self, key, tag, response):
+        """Cache ``response``, evicting the least recently used; call with ``_cache_lock`` held."""
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cache_bytes -= len(old[1][2])
+        self._cache[key] = (tag, response)
+        self._cache_bytes += len(response[2])
+        while self._cache_bytes > self._cache_limit and len(self._cache) > 1:
+            _, (_, dropped) = self._cache.popitem(last=False)
+            self._cache_bytes -= len(dropped[2])
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def stats(self):
+        with self._lock:
+            aggregates, df = self.data.aggregates, self.data.df
+            stats = aggregates.stats
+            if aggregates.count == 0:
+                return {'entries': 0, 'streak': 0, 'logged_today': False}
+            most_common = aggregates.most_common()
+            sentiment = stats.sentiment_mean() is not None
+            return {
+                'entries': aggregates.count,
+                'first': f"{df['Date'].min():%Y-%m-%d}",
+                'last': f"{df['Date'].max():%Y-%m-%d}",
+                'average': round(aggregates.mean(), 3),
+                'std': None if stats.std() is None else round(stats.std(), 3),
+                'most_common': {'mood': most_common, 'label': MOOD_LABELS[most_common]},
+                'sentiment_median': stats.sentiment_quantile(0.5) if sentiment else None,
+                'sentiment_iqr': [stats.sentiment_quantile(0.25), stats.sentiment_quantile(0.75)] if sentiment else None,
+                'streak': aggregates.streak(),
+                'last_7_days': aggregates.recent_count(7),
+                'logged_today': self.data.has_logged_today(),
+            }
+
+    def streak(self):
+        with self._lock:
+            return {'streak': self.data.aggregates.streak(), 'logged_today': self.data.has_logged_today()}
+
+    def recent(self, days):
+        with self._lock:
+            rows = self.data.with_text(self.data.recent(days))
+        return {'days': days, 'entries': [_entry_json(row) for row in rows.itertuples(index=False)]}
+
+    def chart(self, name, start=None, end=None):
+        """PNG bytes of a chart of the entries dated ``start``..``end`` (default all)."""
+        with self._lock:
+            frame = self._range(start, end)
+            if len(frame) == 0:
+                raise APIError(404, "no entries in that range")
+            if name == 'trends':
+                args = (frame['Date'].to_numpy(), frame['Mood_Score'].to_numpy())
+            elif name == 'distribution':
+                args = (np.bincount(frame['Mood_Score'].to_numpy(), minlength=6)[1:],)
+            elif name == 'calendar':
+                args = self.data.aggregates.calendar.weeks(frame['Date'].iloc[0], frame['Date'].iloc[-1])
+            elif start is None and end is None:
+                args = (self.data.time_of_day().hours(),)
+            else:
+                args = (HourBins.from_frame(self.data.with_text(frame)).hours(),)
+        return self.renderer.submit(RENDERERS[name], *args).result(RENDER_TIMEOUT)
+
+    def report(self, start=None, end=None):
+        """PDF bytes of the report on the entries dated ``start``..``end`` (default all)."""
+        with self._lock:
+            frame = self._range(start, end)
+            if len(frame) == 0:
+                raise APIError(404, "no entries in that range")
+            frame = self.data.with_text(frame)
+        return self.reporter.submit(render_report, frame, self.data_file).result(RENDER_TIMEOUT)
+
+    def _range(self, start, end):
+        df = self.data.df
+        if (start is None and end is None) or len(df) == 0:
+            return df
+        return self.data.between(start or df['Date'].iloc[0], end or df['Date'].iloc[-1])
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def log(self, item):
+        """Store one entry (JSON object) and return the stored row."""
+        mood, note, date, timestamp = parse_entry(item)
+        entry = api_entry(mood, note, date, timestamp)
+        with self._lock:
+            self.data.log_entries([entry])
+            self.version += 1
+        return dict(zip(ENTRY_FIELDS, entry), timestamp=entry[COLUMNS.index('Timestamp')] or None)
+
+    def log_batch(self, items):
+        """Store many entries with one fsync, scoring their distinct notes in one sentiment batch."""
+        if not isinstance(items, list) or not items:
+            raise APIError(400, "entries must be a non-empty list")
+        if len(items) > MAX_BATCH:
+            raise APIError(413, f"at most {MAX_BATCH:,} entries per batch")
+        parsed = [parse_entry(item) for item in items]
+        sentiments = analyze_sentiments([note for _, note, _, _ in parsed])
+        entries = [api_entry(mood, note, date, timestamp, sentiment)
+                   for (mood, note, date, timestamp), sentiment in zip(parsed, sentiments)]
+        with self._lock:
+            self.data.log_entries(entries)
+            self.version += 1
+        return {'logged': len(entries), 'dates': sorted({entry[0] for entry in entries})}
+
+
+def parse_entry(item):
+    """``(mood, note, date, timestamp)`` of a JSON entry; raises ``APIError`` when it is invalid."""
+    if not isinstance(item, dict):
+        raise APIError(400, "each entry must be a JSON object")
+    mood = item.get('mood')
+    if isinstance(mood, bool) or not isinstance(mood, int) or mood not in MOOD_LABELS:
+        raise APIError(400, "mood must be an integer from 1 to 5")
+    note = item.get('note') or ''
+    if not isinstance(note, str):
+        raise APIError(400, "note must be a string")
+    date = _parse_time(item.get('date'), DATE_FORMAT, 'date')
+    timestamp = _parse_time(item.get('timestamp'), TIMESTAMP_FORMAT, 'timestamp')
+    return mood, note, date and date.date(), timestamp
+
+
+def api_entry(mood, note, date, timestamp, sentiment=None):
+    """``build_entry`` for an API entry; a back-dated entry without a ``timestamp`` gets a blank one.
+
+    Stamping it with the time of the request would bin it in the hour and
+    weekday of the call, so it is left out of the time-of-day analytics instead.
+    """
+    entry = build_entry(mood, note, date, timestamp, sentiment)
+    if timestamp is None and date is not None and date != datetime.now().date():
+        entry[COLUMNS.index('Timestamp')] = ''
+    return entry
+
+
+def _parse_time(value, time_format, name):
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, time_format)
+    except (TypeError, ValueError):
+        raise APIError(400, f"{name} must look like {datetime(2024, 1, 31, 9, 30).strftime(time_format)}")
+
+
+def _entry_json(row):
+    sentiment = None if np.isnan(row.Sentiment_Score) else round(float(row.Sentiment_Score), 3)
+    return {
+        'date': f"{row.Date:%Y-%m-%d}",
+        'mood': int(row.Mood_Score),
+        'label': MOOD_LABELS[int(row.Mood_Score)],
+        'note': row.Note if isinstance(row.Note, str) else '',
+        'sentiment': sentiment,
+        'sentiment_label': None if sentiment is None else str(row.Sentiment_Label),
+        'timestamp': None if pd.isna(row.Timestamp) else f"{row.Timestamp:%Y-%m-%d %H:%M:%S}",
+    }
+
+
+# ----------------------------------------------------------------------
+# Rendering (matplotlib's object API, so pool threads don't share pyplot state)
+# ----------------------------------------------------------------------
+
+def _png(fig):
+    buffer = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buffer, format='png', dpi=100, facecolor='white')
+    return buffer.getvalue()
+
+
+def render_trends(dates, scores):
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.plot(dates, scores, marker='o' if len(dates) <= 90 else None, linewidth=1.5, markersize=4, color='blue')
+    ax.set_title('Mood Trends Over Time', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Mood Score')
+    ax.set_ylim(0.5, 5.5)
+    ax.grid(True, alpha=0.3)
+    fig.autofmt_xdate()
+    return _png(fig)
+
+
+def render_distribution(counts):
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    ax.bar(range(1, 6), counts, color='lightblue', edgecolor='blue')
+    for score, count in zip(range(1, 6), counts):
+        if count:
+            ax.text(score, count, str(count), ha='center', va='bottom')
+    ax.set_title('Mood Distribution', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Mood Score')
+    ax.set_ylabel('Frequency')
+    ax.set_xticks(range(1, 6))
+    ax.set_xticklabels([MOOD_LABELS[score] for score in range(1, 6)])
+    return _png(fig)
+
+
+def render_calendar(matrix, first_monday):
+    cmap = ListedColormap(CALENDAR_COLORS)
+    cmap.set_bad('#EEEEEE')
+    fig = Figure(figsize=(10, 3.5))
+    ax = fig.subplots()
+    image = ax.imshow(matrix, cmap=cmap, vmin=0.5, vmax=5.5, aspect='auto', interpolation='nearest')
+    ax.set_title('Mood Calendar', fontsize=14, fontweight='bold')
+    columns, labels = calendar_ticks(first_monday, matrix.shape[1])
+    ax.set_xticks(columns)
+    ax.set_xticklabels(labels)
+    ax.set_yticks([0, 2, 4])
+    ax.set_yticklabels(['Mon', 'Wed', 'Fri'])
+    ax.tick_params(length=0)
+    colorbar = fig.colorbar(image, ax=ax, ticks=[1, 2, 3, 4, 5])
+    colorbar.ax.set_yticklabels([MOOD_LABELS[score] for score in range(1, 6)])
+    return _png(fig)
+
+
+def render_hours(hours):
+    hours = hours[hours['count'] > 0]
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.bar(hours.index, hours['mean'], color='lightblue', edgecolor='blue')
+    ax.set_title('Average Mood by Hour Logged', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Hour of Day')
+    ax.set_ylabel('Average Mood Score')
+    ax.set_xticks(range(0, 24, 3))
+    ax.set_xlim(-0.5, 23.5)
+    ax.set_ylim(0, 5.5)
+    ax.grid(True, axis='y', alpha=0.3)
+    return _png(fig)
+
+
+RENDERERS = {'trends': render_trends, 'distribution': render_distribution, 'calendar': render_calendar,
+             'hours': render_hours}
+
+
+def render_report(frame, data_file):
+    """PDF bytes of ``SimplePDFExporter``'s report on ``frame``; the file it writes is removed.
+
+    Charts and the report go under the data file's directory, like the store's partitions.
+    """
+    exporter = SimplePDFExporter(frame, data_file, output_dir=os.path.dirname(data_file) or '.')
+    os.makedirs(exporter.charts_dir, exist_ok=True)
+    os.makedirs(exporter.reports_dir, exist_ok=True)
+    path = exporter.create_simple_pdf_report()
+    if path is None:
+        raise APIError(500, "the report could not be created")
+    with open(path, 'rb') as file:
+        body = file.read()
+    os.remove(path)
+    return body
+
+
+# ----------------------------------------------------------------------
+# HTTP
+# ----------------------------------------------------------------------
+
+class MoodAPIHandler(BaseHTTPRequestHandler):
+    """
+    Routes requests to the server's ``MoodAPI``.
+
+    Speaks HTTP/1.1 with a Content-Length on every response, so a client
+    keeps one connection open for many requests. Cached reads carry an
+    ETag and answer ``If-None-Match`` with 304 Not Modified.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MoodAPI/1.0'
+    timeout = IDLE_TIMEOUT
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't hold the body for an ACK
+
+    @property
+    def api(self):
+        return self.server.api
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        key = (url.path, tuple(sorted(query.items())))
+        self._handle(lambda: self._get(url.path, query, key))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        self._handle(lambda: self._post(url.path))
+
+    def _get(self, path, query, key):
+        if path == '/stats':
+            build = lambda: _json_response(self.api.stats())
+        elif path == '/streak':
+            build = lambda: _json_response(self.api.streak())
+        elif path == '/entries':
+            days = _int_param(query, 'days', 7, 1, MAX_DAYS)
+            build = lambda: _json_response(self.api.recent(days))
+        elif path.startswith('/charts/') and path.endswith('.png') and path[8:-4] in CHARTS:
+            start, end = _date_param(query, 'from'), _date_param(query, 'to')
+            build = lambda: (200, 'image/png', self.api.chart(path[8:-4], start, end))
+        elif path == '/report.pdf':
+            start, end = _date_param(query, 'from'), _date_param(query, 'to')
+            build = lambda: (200, 'application/pdf', self.api.report(start, end))
+        else:
+            raise APIError(404, f"no such endpoint: GET {path}")
+
+        tag, (status, content_type, body) = self.api.cached(key, build)
+        if self.headers.get('If-None-Match') == tag:
+            return 304, content_type, b'', tag
+        return status, content_type, body, tag
+
+    def _post(self, path):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # the body is not read
+            raise APIError(413, f"request bodies are limited to {MAX_BODY_BYTES >> 20} MB")
+        try:
+            document = json.loads(self.rfile.read(length) or b'null')
+        except ValueError:
+            raise APIError(400, "the body must be JSON")
+
+        if path == '/entries':
+            status, content_type, body = _json_response(self.api.log(document), status=201)
+        elif path == '/entries/batch':
+            entries = document.get('entries') if isinstance(document, dict) else document
+            status, content_type, body = _json_response(self.api.log_batch(entries), status=201)
+        else:
+            raise APIError(404, f"no such endpoint: POST {path}")
+        return status, content_type, body, None
+
+    def _handle(self, route):
+        try:
+            status, content_type, body, tag = route()
+        except APIError as e:
+            status, content_type, body = _json_response({'error': str(e)}, status=e.status)
+            tag = None
+        except Exception as e:
+            print(f"⚠️ API error on {self.command} {self.path}: {e}")
+            status, content_type, body = _json_response({'error': "internal error"}, status=500)
+            tag = None
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if tag is not None:
+            self.send_header('ETag', tag)
+            self.send_header('Cache-Control', 'no-cache')  # revalidate, then take the 304
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _json_response(document, status=200):
+    return status, 'application/json', json.dumps(document).encode('utf-8')
+
+
+def _int_param(query, name, default, low, high):
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise APIError(400, f"{name} must be an integer")
+    if not low <= value <= high:
+        raise APIError(400, f"{name} must be from {low} to {high}")
+    return value
+
+
+def _date_param(query, name):
+    value = _parse_time(query.get(name), DATE_FORMAT, name)
+    return value and value.date()
+
+
+def make_server(data_file=DEFAULT_DATA_FILE, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=RENDER_WORKERS,
+                verbose=False):
+    """A ``ThreadingHTTPServer`` serving ``data_file`` (port 0 picks a free one); call ``serve_forever``."""
+    server = ThreadingHTTPServer((host, port), MoodAPIHandler)
+    server.daemon_threads = True
+    server.api = MoodAPI(data_file, workers)
+    server.verbose = verbose
+    return server
+
+
+def serve(data_file=DEFAULT_DATA_FILE, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=RENDER_WORKERS, verbose=False):
+    """Serve the API until interrupted."""
+    server = make_server(data_file, host, port, workers, verbose)
+    print(f"🌐 Mood API serving {data_file} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Mood API stopped")
+    finally:
+        server.server_close()
+        server.api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the mood tracker as a local HTTP/JSON API.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"address to bind (default {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port (default {DEFAULT_PORT})")
+    parser.add_argument('--workers', type=int, default=RENDER_WORKERS,
+                        help=f"chart rendering threads (default {RENDER_WORKERS})")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    parser.add_argument('--data-file', default=DEFAULT_DATA_FILE, help="mood data CSV")
+    args = parser.parse_args()
+    serve(args.data_file, args.host, args.port, args.workers, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
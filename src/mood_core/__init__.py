@@ -0,0 +1,27 @@
+# Mood Core - shared data model, storage, aggregates and sentiment analysis
+# used by the CLI tracker, both desktop GUIs and the PDF exporter
+
+from .model import (ANALYTICS_COLUMNS, COLUMNS, DATE_FORMAT, DEFAULT_DATA_FILE, FRAME_COLUMNS, LAZY_COLUMNS,
+                    MOOD_EMOJIS, MOOD_LABELS, MOOD_SCALE, TIMESTAMP_FORMAT, empty_frame, nearest_score)
+from .lexicon import LexiconSentiment
+from .sentiment import (BACKENDS, TextBlobSentiment, analyze_sentiment, analyze_sentiments, get_backend, sentiment_label,
+                        set_backend, tokenize)
+from .partitions import MoodPartitions
+from .sidecar import NumericSidecar
+from .storage import MoodStore
+from .stats import MoodStats, RunningMoments
+from .forecast import MoodForecast
+from .heatmap import DayGrid, calendar_ticks
+from .aggregates import MoodAggregates
+from .notes import NoteIndex
+from .keywords import TermCounts, note_terms
+from .analytics import WEEKDAY_NAMES, weekday_hour_stats, weekday_stats
+from .anomalies import ANOMALY_LABELS, MoodAnomalies, describe_anomaly
+from .correlation import MISMATCHES, MoodCorrelation, correlation_strength
+from .timeofday import DAY_PARTS, EntryTimes, HourBins
+from .snapshot import MoodSnapshot
+from .dataset import MoodDataset, build_entry
+from .sample import generate_sample_entries
+from .watch import MoodFileWatcher
+from .profiling import GuiProfiler, profile_from_argv
+from . import perf
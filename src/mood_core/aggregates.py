@@ -0,0 +1,135 @@
+# Incremental Mood Aggregates
+# Running totals behind the dashboard stats, updated per entry instead of rescanning the history
+
+from datetime import datetime, timedelta
+import numpy as np
+from .forecast import HORIZON, MoodForecast
+from .heatmap import DayGrid
+from .perf import timed
+from .stats import MoodStats
+
+
+class MoodAggregates:
+    """
+    Per-day mood scores plus the totals derived from them.
+
+    Built once from the loaded DataFrame, then kept current with
+    ``set_score`` as entries arrive, so header stats, averages, streaks and
+    weekly counts never need a full pass over the history. ``stats`` holds
+    the streaming ``MoodStats`` (deviation, distributions, quantiles) and
+    ``forecaster`` the ``MoodForecast`` behind ``forecast``, and
+    ``calendar`` the ``DayGrid`` behind the calendar heatmaps.
+    """
+
+    def __init__(self):
+        self.scores = {}  # date -> mood score, one entry per day
+        self.sentiments = {}  # date -> sentiment score, for replacing it in stats
+        self.stats = MoodStats()
+        self.forecaster = MoodForecast()
+        self._forecast_stale = False  # a past day changed; refit before forecasting
+        self.calendar = DayGrid()
+        self.total = 0
+        self.score_counts = {score: 0 for score in range(1, 6)}
+        self.weekday_totals = [0] * 7  # Monday first
+        self.weekday_counts = [0] * 7
+        self.last_date = None
+
+    @classmethod
+    @timed('aggregates.from_frame')
+    def from_frame(cls, df):
+        """Build aggregates from a de-duplicated mood DataFrame."""
+        aggregates = cls()
+        if len(df) == 0:
+            return aggregates
+
+        scores = df['Mood_Score'].astype(int)
+        days = df['Date'].dt.date.tolist()
+        aggregates.scores = dict(zip(days, scores.tolist()))
+        aggregates.sentiments = dict(zip(days, df['Sentiment_Score'].astype(float).tolist()))
+        aggregates.stats = MoodStats.from_frame(df)
+        aggregates.forecaster = MoodForecast.from_frame(df)
+        aggregates.calendar = DayGrid.from_frame(df)
+        aggregates.total = int(scores.sum())
+        for score, count in scores.value_counts().items():
+            aggregates.score_counts[int(score)] = int(count)
+
+        weekdays = df['Date'].dt.weekday.to_numpy()
+        aggregates.weekday_totals = np.bincount(weekdays, weights=scores.to_numpy(), minlength=7).astype(int).tolist()
+        aggregates.weekday_counts = np.bincount(weekdays, minlength=7).tolist()
+        aggregates.last_date = df['Date'].iloc[-1].date()  # the frame is date-sorted
+        return aggregates
+
+    def set_score(self, date, score, sentiment=None):
+        """Record the score (and sentiment) for a day, replacing any earlier entry for it."""
+        date = _as_date(date)
+        score = int(score)
+        sentiment = None if sentiment is None else float(sentiment)
+
+        weekday = date.weekday()
+        previous = self.scores.get(date)
+        if previous is not None:
+            self.total -= previous
+            self.score_counts[previous] -= 1
+            self.weekday_totals[weekday] -= previous
+            self.weekday_counts[weekday] -= 1
+            self.stats.remove(previous, self.sentiments.get(date))
+
+        self.scores[date] = score
+        self.total += score
+        self.score_counts[score] = self.score_counts.get(score, 0) + 1
+        self.weekday_totals[weekday] += score
+        self.weekday_counts[weekday] += 1
+        self.stats.add(score, sentiment)
+        self.sentiments[date] = sentiment
+        self.calendar.set(date, score)
+        if not self.forecaster.update(date, score):
+            self._forecast_stale = True
+        if self.last_date is None or date > self.last_date:
+            self.last_date = date
+
+    @property
+    def count(self):
+        """Number of logged days."""
+        return len(self.scores)
+
+    def mean(self):
+        """Average mood score, or None without entries."""
+        return self.total / self.count if self.count else None
+
+    def most_common(self):
+        """Most frequently logged score, or None without entries."""
+        if not self.count:
+            return None
+        return max(self.score_counts, key=lambda score: (self.score_counts[score], -score))
+
+    def forecast(self, days=HORIZON, today=None):
+        """Mood forecast with a 95% band for the next ``days`` days (see ``MoodForecast.forecast``)."""
+        if self._forecast_stale:
+            self.forecaster = MoodForecast.from_scores(self.scores, self.last_date)
+            self._forecast_stale = False
+        return self.forecaster.forecast(days, today)
+
+    @timed('aggregates.streak')
+    def streak(self, today=None):
+        """Consecutive logged days ending today."""
+        day = today or datetime.now().date()
+        streak = 0
+        while day in self.scores:
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
+    @timed('aggregates.recent_count')
+    def recent_count(self, days=7, today=None):
+        """Number of entries in the last ``days`` days including today."""
+        today = today or datetime.now().date()
+        return sum(1 for offset in range(days) if today - timedelta(days=offset) in self.scores)
+
+
+def _as_date(value):
+    """Convert a storage key, datetime or Timestamp to a ``date``."""
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    if hasattr(value, 'date'):
+        return value.date()
+    return value
@@ -0,0 +1,69 @@
+# Vectorized Mood Analytics
+# Per-weekday and weekday x hour statistics from integer codes and np.bincount, without frame copies
+
+import numpy as np
+import pandas as pd
+from .perf import timed
+
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Two-sided 95% normal quantile for the confidence intervals
+Z_95 = 1.959964
+
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def weekday_codes(dates):
+    """Monday=0 .. Sunday=6 for a datetime64 column, computed from the day number."""
+    days = np.asarray(dates, dtype='datetime64[D]').view('i8')
+    return (days + _EPOCH_WEEKDAY) % 7
+
+
+def group_stats(codes, values, groups):
+    """Count, mean, sample variance and 95% interval of ``values`` for each code in ``range(groups)``.
+
+    Two ``np.bincount`` passes (sums, then squared deviations from the group
+    mean). Groups with fewer than two values have a NaN variance and
+    interval; empty groups a NaN mean. Intervals use the normal approximation.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count = np.bincount(codes, minlength=groups)
+    total = np.bincount(codes, weights=values, minlength=groups)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        deviations = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=groups)
+        var = np.where(count > 1, deviations / (count - 1), np.nan)
+        half_width = Z_95 * np.sqrt(var / count)
+
+    return {'count': count, 'mean': mean, 'var': var,
+            'ci_low': mean - half_width, 'ci_high': mean + half_width}
+
+
+@timed('analytics.weekday_stats')
+def weekday_stats(df, column='Mood_Score'):
+    """Per-weekday count, mean, var, ci_low and ci_high of ``column``, indexed Monday..Sunday."""
+    stats = group_stats(weekday_codes(df['Date'].to_numpy()), df[column].to_numpy(), 7)
+    return pd.DataFrame(stats, index=pd.Index(WEEKDAY_NAMES, name='Weekday'))
+
+
+@timed('analytics.weekday_hour_stats')
+def weekday_hour_stats(timestamps, scores):
+    """Weekday x hour-of-day ``(count, mean)`` frames (7 rows, 24 columns) of ``scores``.
+
+    ``timestamps`` is the datetime64 Timestamp column; entries without one
+    are skipped.
+    """
+    stamps = np.asarray(timestamps, dtype='datetime64[s]')
+    valid = ~np.isnat(stamps)
+    stamps = stamps[valid]
+
+    hours = (stamps - stamps.astype('datetime64[D]')).astype('timedelta64[h]').view('i8')
+    codes = weekday_codes(stamps) * 24 + hours
+    stats = group_stats(codes, np.asarray(scores)[valid], 7 * 24)
+
+    index = pd.Index(WEEKDAY_NAMES, name='Weekday')
+    columns = pd.RangeIndex(24, name='Hour')
+    return (pd.DataFrame(stats['count'].reshape(7, 24), index=index, columns=columns),
+            pd.DataFrame(stats['mean'].reshape(7, 24), index=index, columns=columns))
@@ -0,0 +1,205 @@
+# Mood Anomaly Detection
+# EWMA baselines and lower CUSUMs over the mood and sentiment scores: batch over the history, then per entry
+
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from .perf import timed
+
+# Weight of each entry in the EWMA baseline (about a 20-entry memory)
+BASELINE_ALPHA = 0.1
+
+# Lower CUSUM: drift allowance per entry and alarm level, in baseline deviations
+SLACK = 0.5
+THRESHOLD = 4.0
+
+# A single entry this many deviations under the baseline is flagged on its own
+Z_LOW = 2.0
+
+# Entries before the baseline is trusted; none of them are flagged
+WARMUP_ENTRIES = 14
+
+# Floors on the baseline deviation, so a run of identical scores doesn't flag every small dip
+MIN_SIGMA = {'mood': 0.5, 'sentiment': 0.1}
+
+ANOMALY_LABELS = {
+    'mood_drop': "sustained mood drop",
+    'sentiment_drop': "sustained drop in note sentiment",
+    'low_mood': "unusually low mood",
+    'low_sentiment': "unusually negative note",
+}
+
+
+def drift_scores(values, min_sigma, alpha=BASELINE_ALPHA, slack=SLACK):
+    """Deviation from the EWMA baseline (``z``) and lower CUSUM of ``values``, vectorized.
+
+    Returns ``(z, cusum, mean, square)``: ``z`` of each value against the
+    baseline of the values before it, the CUSUM after it, and the final
+    EWMA mean and mean square to continue from.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mean = pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    square = pd.Series(values * values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+    previous_mean = np.concatenate([values[:1], mean[:-1]])
+    previous_square = np.concatenate([values[:1] ** 2, square[:-1]])
+    sigma = np.maximum(np.sqrt(np.maximum(previous_square - previous_mean ** 2, 0)), min_sigma)
+    z = (values - previous_mean) / sigma
+
+    # S_t = max(0, S_t-1 - z_t - slack) is the running sum minus its running minimum (floored at 0)
+    steps = np.cumsum(-z - slack)
+    cusum = steps - np.minimum(np.minimum.accumulate(steps), 0)
+    return z, cusum, float(mean[-1]), float(square[-1])
+
+
+class DriftTracker:
+    """EWMA baseline and lower CUSUM of one score, updated per entry."""
+
+    __slots__ = ('min_sigma', 'alpha', 'slack', 'count', 'mean', 'square', 'cusum', 'drop_start')
+
+    def __init__(self, min_sigma, alpha=BASELINE_ALPHA, slack=SLACK):
+        self.min_sigma, self.alpha, self.slack = min_sigma, alpha, slack
+        self.count = 0
+        self.mean = self.square = self.cusum = 0.0
+        self.drop_start = None  # first day of the current run with a positive CUSUM
+
+    def state(self):
+        return (self.count, self.mean, self.square, self.cusum, self.drop_start)
+
+    def restore(self, state):
+        self.count, self.mean, self.square, self.cusum, self.drop_start = state
+
+    def update(self, day, value):
+        """Fold in ``value``; returns its ``z`` against the baseline before it."""
+        if self.count == 0:
+            self.mean, self.square, z = value, value * value, 0.0
+        else:
+            sigma = max(max(self.square - self.mean * self.mean, 0.0) ** 0.5, self.min_sigma)
+            z = (value - self.mean) / sigma
+            self.mean += self.alpha * (value - self.mean)
+            self.square += self.alpha * (value * value - self.square)
+
+        cusum = max(0.0, self.cusum - z - self.slack)
+        if cusum == 0:
+            self.drop_start = None
+        elif self.cusum == 0:
+            self.drop_start = day
+        self.cusum = cusum
+        self.count += 1
+        return z
+
+    def dropping(self, threshold=THRESHOLD):
+        return self.count > WARMUP_ENTRIES and self.cusum > threshold
+
+
+class MoodAnomalies:
+    """
+    Flags for days whose mood or note sentiment falls out of line with the recent past.
+
+    Each score has an EWMA baseline (mean and deviation) and a lower CUSUM
+    of its deviations from it. A day is flagged as a sustained drop while
+    the CUSUM is above ``THRESHOLD``, and as unusually low when it sits
+    ``Z_LOW`` deviations under the baseline. ``from_frame`` scores the whole
+    history with NumPy; ``update`` then folds in each new day in O(1) and
+    returns False for a day older than the latest, which needs a rebuild.
+    Missing sentiment counts as neutral (0).
+    """
+
+    def __init__(self):
+        self.mood = DriftTracker(MIN_SIGMA['mood'])
+        self.sentiment = DriftTracker(MIN_SIGMA['sentiment'])
+        self.flags = {}  # date -> tuple of ANOMALY_LABELS keys
+        self.last_date = None
+        self._undo = None  # state before the latest day was folded in
+
+    @classmethod
+    @timed('anomalies.from_frame')
+    def from_frame(cls, df):
+        """Score every day of a date-sorted, de-duplicated mood DataFrame."""
+        anomalies = cls()
+        if len(df) == 0:
+            return anomalies
+
+        dates = df['Date'].to_numpy()
+        warm = np.arange(len(df)) >= WARMUP_ENTRIES
+        masks = {}
+        for name, tracker, column in (('mood', anomalies.mood, 'Mood_Score'),
+                                      ('sentiment', anomalies.sentiment, 'Sentiment_Score')):
+            values = df[column].to_numpy(dtype=np.float64)
+            values = np.where(np.isnan(values), 0.0, values)
+            z, cusum, tracker.mean, tracker.square = drift_scores(values, tracker.min_sigma)
+            tracker.count, tracker.cusum = len(values), float(cusum[-1])
+            if cusum[-1] > 0:
+                zeros = np.flatnonzero(cusum == 0)
+                tracker.drop_start = pd.Timestamp(dates[zeros[-1] + 1 if len(zeros) else 0]).date()
+
+            masks[f'{name}_drop'] = warm & (cusum > THRESHOLD)
+            masks[f'low_{name}'] = warm & (z < -Z_LOW)
+
+        # One bit per tag, then each distinct bit pattern's tags looked up once
+        codes = sum(masks[tag].astype(np.int64) << bit for bit, tag in enumerate(ANOMALY_LABELS))
+        flagged = np.flatnonzero(codes)
+        combinations = [tuple(tag for bit, tag in enumerate(ANOMALY_LABELS) if code >> bit & 1)
+                        for code in range(1 << len(ANOMALY_LABELS))]
+        anomalies.flags = dict(zip(pd.DatetimeIndex(dates[flagged]).date,
+                                   map(combinations.__getitem__, codes[flagged].tolist())))
+        anomalies.last_date = pd.Timestamp(dates[-1]).date()
+        return anomalies
+
+    def update(self, day, score, sentiment=None):
+        """Fold in a new day; False if it is older than the latest (rebuild with ``from_frame``)."""
+        if self.last_date is not None and day == self.last_date and self._undo is not None:
+            self._rollback()
+        elif self.last_date is not None and day <= self.last_date:
+            return False
+
+        sentiment = 0.0 if sentiment is None or np.isnan(sentiment) else float(sentiment)
+        self._undo = (self.mood.state(), self.sentiment.state(), self.last_date, self.flags.get(day))
+        found = {}
+        for name, tracker, value in (('mood', self.mood, float(score)), ('sentiment', self.sentiment, sentiment)):
+            z = tracker.update(day, value)
+            warm = tracker.count > WARMUP_ENTRIES
+            found[f'{name}_drop'] = warm and tracker.cusum > THRESHOLD
+            found[f'low_{name}'] = warm and z < -Z_LOW
+
+        tags = tuple(tag for tag in ANOMALY_LABELS if found[tag])
+        self.flags.pop(day, None)
+        if tags:
+            self.flags[day] = tags
+        self.last_date = day
+        return True
+
+    def _rollback(self):
+        mood, sentiment, last_date, flags = self._undo
+        self.mood.restore(mood)
+        self.sentiment.restore(sentiment)
+        self.flags.pop(self.last_date, None)
+        if flags:
+            self.flags[self.last_date] = flags
+        self.last_date = last_date
+        self._undo = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def ongoing(self):
+        """``{'mood' | 'sentiment': first day}`` of the sustained drops still running at the latest entry."""
+        return {name: tracker.drop_start for name, tracker in (('mood', self.mood), ('sentiment', self.sentiment))
+                if tracker.dropping()}
+
+    def flagged(self, start=None, end=None):
+        """``[(date, tags)]`` of the flagged days between ``start`` and ``end``, oldest first."""
+        return sorted((day, tags) for day, tags in self.flags.items()
+                      if (start is None or day >= start) and (end is None or day <= end))
+
+    def recent(self, days=30):
+        """Flagged days within ``days`` days of the latest entry."""
+        if self.last_date is None:
+            return []
+        return self.flagged(self.last_date - timedelta(days=days - 1))
+
+
+def describe_anomaly(tags):
+    """Readable text of an anomaly's tags."""
+    return ", ".join(ANOMALY_LABELS[tag] for tag in tags)
@@ -0,0 +1,221 @@
+# Mood / Sentiment Correlation
+# Pearson and Spearman correlation of the mood scores with note sentiment: per month, per weekday and rolling
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from .analytics import WEEKDAY_NAMES, weekday_codes
+from .perf import timed
+
+ROLLING_WINDOW = 30
+
+# Rows ranked at once by rolling_spearman, to bound the window matrices
+RANK_CHUNK = 16_384
+
+# A score this high with a note this negative (and the reverse) is a mismatch
+MISMATCHES = {
+    'high_mood_negative_note': "high mood, negative note",
+    'low_mood_positive_note': "low mood, positive note",
+}
+HIGH_MOOD, LOW_MOOD = 4, 2
+NEGATIVE_NOTE, POSITIVE_NOTE = -0.1, 0.3
+
+
+def average_ranks(values, groups):
+    """1-based ranks of ``values`` within each group code, ties sharing their average rank."""
+    values = np.asarray(values)
+    order = np.lexsort((values, groups))
+    ordered, grouped = values[order], np.asarray(groups)[order]
+    count = len(values)
+
+    position = np.arange(count)
+    new_group = np.ones(count, bool)
+    new_group[1:] = grouped[1:] != grouped[:-1]
+    new_run = new_group.copy()
+    new_run[1:] |= ordered[1:] != ordered[:-1]
+
+    group_start = np.maximum.accumulate(np.where(new_group, position, 0))
+    run_start = np.flatnonzero(new_run)
+    run_end = np.append(run_start[1:], count)
+    run_rank = (run_start + run_end + 1) / 2 - group_start[run_start]
+
+    ranks = np.empty(count)
+    ranks[order] = run_rank[np.cumsum(new_run) - 1]
+    return ranks
+
+
+def pearson_sums(codes, x, y, groups):
+    """``(n, sum x, sum y, sum xx, sum yy, sum xy)`` of each group code, stacked as a (groups, 6) array."""
+    return np.stack([np.bincount(codes, weights=weights, minlength=groups)
+                     for weights in (None, x, y, x * x, y * y, x * y)], axis=1)
+
+
+def pearson_from_sums(sums):
+    """Pearson r from ``pearson_sums`` rows; NaN with fewer than two values or no spread."""
+    n, sx, sy, sxx, syy, sxy = np.moveaxis(np.asarray(sums, dtype=np.float64), -1, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    return np.clip(r, -1, 1)
+
+
+def group_correlation(codes, x, y, groups):
+    """Count, Pearson and Spearman r of ``x`` and ``y`` for each code in ``range(groups)``."""
+    sums = pearson_sums(codes, x, y, groups)
+    rank_sums = pearson_sums(codes, average_ranks(x, codes), average_ranks(y, codes), groups)
+    return {'count': sums[:, 0].astype(np.int64), 'pearson': pearson_from_sums(sums),
+            'spearman': pearson_from_sums(rank_sums)}
+
+
+def rolling_pearson(x, y, window=ROLLING_WINDOW):
+    """Pearson r over each run of ``window`` values ending at every position (NaN before the first)."""
+    x, y = np.asarray(x, np.float64), np.asarray(y, np.float64)
+    result = np.full(len(x), np.nan)
+    if len(x) < window:
+        return result
+
+    totals = []
+    for values in (np.ones_like(x), x, y, x * x, y * y, x * y):
+        running = np.concatenate([[0.0], np.cumsum(values)])
+        totals.append(running[window:] - running[:-window])
+    result[window - 1:] = pearson_from_sums(np.stack(totals, axis=1))
+    return result
+
+
+def rolling_spearman(x, y, window=ROLLING_WINDOW):
+    """Spearman r over each run of ``window`` values ending at every position (NaN before the first)."""
+    x, y = np.asarray(x, np.float64), np.asarray(y, np.float64)
+    result = np.full(len(x), np.nan)
+    for start in range(0, len(x) - window + 1, RANK_CHUNK):
+        stop = min(start + RANK_CHUNK, len(x) - window + 1)
+        rank_x = _window_ranks(sliding_window_view(x[start:stop + window - 1], window))
+        rank_y = _window_ranks(sliding_window_view(y[start:stop + window - 1], window))
+        sums = np.stack([np.full(len(rank_x), window), rank_x.sum(1), rank_y.sum(1), (rank_x * rank_x).sum(1),
+                         (rank_y * rank_y).sum(1), (rank_x * rank_y).sum(1)], axis=1)
+        result[start + window - 1:stop + window - 1] = pearson_from_sums(sums)
+    return result
+
+
+def _window_ranks(windows):
+    """Average ranks within each row of a window matrix, from one sorted pass over all rows.
+
+    Each row is shifted past the one before it, so a single flat sort and
+    two searches find every value's count of smaller and equal values.
+    """
+    rows, width = windows.shape
+    low, span = windows.min(), windows.max() - windows.min() + 1
+    keyed = (windows - low) + span * np.arange(rows)[:, None]
+    flat = np.sort(keyed, axis=1).ravel()
+    offsets = (width * np.arange(rows))[:, None]
+    below = np.searchsorted(flat, keyed.ravel(), 'left').reshape(rows, width) - offsets
+    through = np.searchsorted(flat, keyed.ravel(), 'right').reshape(rows, width) - offsets
+    return (below + through + 1) / 2
+
+
+def mismatches(df):
+    """Rows of ``df`` whose score and note sentiment disagree, with a ``Mismatch`` kind column."""
+    scores = df['Mood_Score'].to_numpy()
+    sentiments = df['Sentiment_Score'].to_numpy(dtype=np.float64)
+    high = (scores >= HIGH_MOOD) & (sentiments <= NEGATIVE_NOTE)
+    low = (scores <= LOW_MOOD) & (sentiments >= POSITIVE_NOTE)
+    rows = df[high | low].copy()
+    rows['Mismatch'] = np.where(high[high | low], 'high_mood_negative_note', 'low_mood_positive_note')
+    return rows
+
+
+def correlation_strength(r):
+    """'weak', 'moderate' or 'strong' for a correlation coefficient."""
+    return 'weak' if abs(r) < 0.2 else 'moderate' if abs(r) < 0.5 else 'strong'
+
+
+class MoodCorrelation:
+    """
+    How closely the logged mood follows the note sentiment, kept per monthly partition.
+
+    Each month's Pearson sums, per weekday, and its within-month Spearman
+    r are cached; ``invalidate`` marks the months of changed dates and
+    ``refresh`` recomputes only those, in one vectorized pass. Weekday and
+    overall Pearson r add up the cached sums; weekday Spearman ranks the
+    whole history once per change. Entries without a sentiment are skipped.
+    """
+
+    def __init__(self):
+        self._months = {}  # month number -> (7 x 6 Pearson sums, count, pearson, spearman)
+        self._dirty = set()
+        self._source = None  # the frame last refreshed from
+        self._df = None  # its rows with a sentiment
+        self._weekday_spearman = None
+
+    def invalidate(self, dates=None):
+        """Mark the months of ``dates`` (date keys) as changed, or every month without ``dates``."""
+        if dates is None:
+            self._months.clear()
+            self._source = None  # a reload can hand back the same frame object
+        else:
+            self._dirty.update(_month_number(date) for date in dates)
+        self._weekday_spearman = None
+
+    @timed('correlation.refresh')
+    def refresh(self, df):
+        """Recompute the changed months of ``df`` (date-sorted, one row per day)."""
+        if df is self._source and not self._dirty:
+            return
+        self._source = df
+        df = df[df['Sentiment_Score'].notna()]
+        months = df['Date'].to_numpy().astype('datetime64[M]').view('i8')
+        present = set(np.unique(months).tolist())
+        for month in set(self._months) - present:
+            del self._months[month]
+
+        stale = sorted((present - set(self._months)) | (self._dirty & present))
+        if stale:
+            rows = np.isin(months, stale)
+            codes = np.searchsorted(stale, months[rows])
+            x = df['Mood_Score'].to_numpy(np.float64)[rows]
+            y = df['Sentiment_Score'].to_numpy(np.float64)[rows]
+            weekdays = weekday_codes(df['Date'].to_numpy()[rows])
+
+            sums = pearson_sums(codes * 7 + weekdays, x, y, len(stale) * 7).reshape(len(stale), 7, 6)
+            stats = group_correlation(codes, x, y, len(stale))
+            for i, month in enumerate(stale):
+                self._months[month] = (sums[i], int(stats['count'][i]), float(stats['pearson'][i]),
+                                       float(stats['spearman'][i]))
+        self._dirty.clear()
+        self._df = df
+        self._weekday_spearman = None
+
+    def monthly(self):
+        """Count, pearson and spearman r of each month, indexed by month start."""
+        months = sorted(self._months)
+        return pd.DataFrame([self._months[month][1:] for month in months], columns=['count', 'pearson', 'spearman'],
+                            index=pd.DatetimeIndex(np.array(months, 'datetime64[M]'), name='Month'))
+
+    def weekdays(self):
+        """Count, pearson and spearman r of each weekday over the whole history, Monday first."""
+        sums = sum((entry[0] for entry in self._months.values()), np.zeros((7, 6)))
+        if self._weekday_spearman is None:
+            df = self._df if self._df is not None else pd.DataFrame(columns=['Date', 'Mood_Score', 'Sentiment_Score'])
+            codes = weekday_codes(df['Date'].to_numpy())
+            self._weekday_spearman = group_correlation(
+                codes, df['Mood_Score'].to_numpy(np.float64), df['Sentiment_Score'].to_numpy(np.float64), 7)['spearman']
+        return pd.DataFrame({'count': sums[:, 0].astype(np.int64), 'pearson': pearson_from_sums(sums),
+                             'spearman': self._weekday_spearman}, index=pd.Index(WEEKDAY_NAMES, name='Weekday'))
+
+    def overall(self):
+        """Pearson r over the whole history, from the cached sums (NaN without enough entries)."""
+        sums = sum((entry[0].sum(axis=0) for entry in self._months.values()), np.zeros(6))
+        return float(pearson_from_sums(sums))
+
+    def rolling(self, window=ROLLING_WINDOW, last=None):
+        """Date, pearson and spearman r over each ``window`` entries, for the final ``last`` rows (default all)."""
+        df = self._df if self._df is not None else pd.DataFrame(columns=['Date', 'Mood_Score', 'Sentiment_Score'])
+        if last is not None:
+            df = df.iloc[-(last + window - 1):]
+        x, y = df['Mood_Score'].to_numpy(np.float64), df['Sentiment_Score'].to_numpy(np.float64)
+        rolling = pd.DataFrame({'Date': df['Date'].to_numpy(), 'pearson': rolling_pearson(x, y, window),
+                                'spearman': rolling_spearman(x, y, window)})
+        return rolling.iloc[window - 1:].reset_index(drop=True)
+
+
+def _month_number(date):
+    """Months since 1970-01 of a date key, date or Timestamp."""
+    return int(np.datetime64(str(date)[:7], 'M').astype(np.int64))
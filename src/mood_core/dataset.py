@@ -0,0 +1,322 @@
+# Mood Dataset
+# Store, de-duplicated history and running aggregates behind every front-end
+
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from .aggregates import MoodAggregates, _as_date
+from .analytics import weekday_stats
+from .anomalies import MoodAnomalies
+from .correlation import MoodCorrelation, mismatches
+from .perf import timed
+from .model import (COLUMNS, DEFAULT_DATA_FILE, LAZY_COLUMNS, MOOD_LABELS, DATE_FORMAT, TIMESTAMP_FORMAT,
+                    empty_frame, parse_dates)
+from .keywords import TERMS_NAME, TermCounts
+from .notes import NOTE_INDEX_NAME, NoteIndex, parse_query
+from .sentiment import analyze_sentiment
+from .snapshot import SNAPSHOT_NAME, MoodSnapshot
+from .storage import MoodStore, _date_key
+from .timeofday import MISSING, TIMES_NAME, EntryTimes, HourBins, day_numbers, epoch_seconds
+
+
+class MoodDataset:
+    """
+    The shared mood history.
+
+    Front-ends render from ``df`` (one date-sorted row per day) and
+    ``aggregates``; writes go through ``log_entry``/``log_entries`` so the
+    store, the frame and the aggregates stay in step.
+
+    ``df`` holds the numeric columns only; views that show notes pass the
+    rows they display through ``with_text``. Pass ``columns=FRAME_COLUMNS``
+    to load Note and Timestamp eagerly instead.
+
+    Each write also refreshes a ``MoodSnapshot`` of the totals beside the
+    partitions, inside the same exclusive store lock, so a front-end can
+    show them (``MoodSnapshot.read``) before the full history is loaded.
+    Notes are indexed the same way for ``search`` (see ``NoteIndex``), and
+    their key terms counted per mood score for ``keywords`` (see
+    ``TermCounts``).
+    Their Timestamps are stored once as epoch seconds (see ``EntryTimes``)
+    and binned by hour for ``time_of_day`` (see ``HourBins``).
+    ``anomalies`` flags unusual days (see ``MoodAnomalies``) and is updated
+    with each write like the aggregates; ``correlations`` recomputes only
+    the months that changed.
+    """
+
+    def __init__(self, data_file=DEFAULT_DATA_FILE, columns=None):
+        self.data_file = data_file
+        self.store = MoodStore(data_file, columns=columns)
+        self.snapshot_file = os.path.join(self.store.partitions.directory, SNAPSHOT_NAME)
+        self.notes = NoteIndex(os.path.join(self.store.partitions.directory, NOTE_INDEX_NAME))
+        self._notes_checked = False
+        self.terms = TermCounts(os.path.join(self.store.partitions.directory, TERMS_NAME))
+        self._terms_checked = False
+        self.times = EntryTimes(os.path.join(self.store.partitions.directory, TIMES_NAME))
+        self._times_checked = False
+        self.hour_bins = None  # binned on first use, then updated per entry
+        self.df = empty_frame(self.store.columns)
+        self.aggregates = MoodAggregates()
+        self.anomalies = MoodAnomalies()
+        self.correlation = MoodCorrelation()
+        self.load()
+
+    @timed('dataset.load')
+    def load(self):
+        """Re-read the full history and rebuild the aggregates."""
+        self.store.refresh()  # start change tracking from this full load
+        self.df = self.store.load()
+        self.aggregates = MoodAggregates.from_frame(self.df)
+        self.anomalies = MoodAnomalies.from_frame(self.df)
+        self.correlation.invalidate()
+        self.hour_bins = None
+
+        # Repair a snapshot left stale by a crash or an older version
+        snapshot = MoodSnapshot.load(self.snapshot_file)
+        if snapshot is None or snapshot.to_dict() != MoodSnapshot.from_aggregates(self.aggregates).to_dict():
+            with self.store.write_lock():
+                self.sync()
+                self.save_snapshot()
+        return self.df
+
+    @timed('dataset.sync')
+    def sync(self):
+        """Apply entries written since the last sync; returns changed dates or None after a full reload."""
+        changes = self.store.refresh()
+        self.df = self.store.load()
+
+        if changes is None:
+            self.aggregates = MoodAggregates.from_frame(self.df)
+            self.anomalies = MoodAnomalies.from_frame(self.df)
+            self.correlation.invalidate()
+            self.hour_bins = None
+        else:
+            self.correlation.invalidate(changes)
+            keys = sorted(changes)
+            if self.hour_bins is not None:  # only the new entries' Timestamps are parsed
+                texts = self.store.text(keys)
+                epochs = epoch_seconds([texts.get(key, (None, None))[1] for key in keys]).tolist()
+                days = day_numbers(keys).tolist()
+            rescore = False
+            for i, date_key in enumerate(keys):
+                row = self.store.get(date_key)
+                self.aggregates.set_score(date_key, row['Mood_Score'], row['Sentiment_Score'])
+                rescore = rescore or not self.anomalies.update(_as_date(date_key), row['Mood_Score'],
+                                                               row['Sentiment_Score'])
+                if self.hour_bins is not None:
+                    self.hour_bins.set(days[i], epochs[i], row['Mood_Score'], row['Sentiment_Score'])
+            if rescore:  # a past day changed, which shifts every baseline after it
+                self.anomalies = MoodAnomalies.from_frame(self.df)
+
+        return changes
+
+    def log_entry(self, mood_score, note='', date=None, timestamp=None, sentiment=None):
+        """Analyze and store the entry for a day (replacing any earlier one); returns the row."""
+        entry = build_entry(mood_score, note, date, timestamp, sentiment)
+        self.log_entries([entry])
+        return entry
+
+    def log_entries(self, entries):
+        """Store several prepared rows with a single fsync."""
+        latest = {row[0]: row for row in entries}
+        with self.store.write_lock():
+            replaced = self._replaced_terms(latest)
+            self.store.upsert_many(entries)
+            changes = self.sync()
+            self.save_snapshot()
+            self.notes.add({key: row[COLUMNS.index('Note')] for key, row in latest.items()})
+            self.terms.add(replaced + [(1, row[1], row[COLUMNS.index('Note')]) for row in latest.values()])
+            self.times.add(list(latest), [row[COLUMNS.index('Timestamp')] for row in latest.values()])
+        return changes
+
+    def _replaced_terms(self, latest):
+        """``(-1, score, note)`` for the stored entries that ``latest`` (``{date key: row}``) replaces."""
+        if not self.terms.exists():
+            return []
+        stored = [key for key in latest if self.store.has_entry(key)]
+        notes = self.store.text(stored)
+        return [(-1, self.store.get(key)['Mood_Score'], notes.get(key, ('', ''))[0]) for key in stored]
+
+    def save_snapshot(self):
+        """Write the summary snapshot of the current aggregates."""
+        try:
+            MoodSnapshot.from_aggregates(self.aggregates).save(self.snapshot_file)
+        except OSError as e:
+            print(f"⚠️ Could not write the summary snapshot: {e}")
+
+    def with_text(self, frame):
+        """Return ``frame`` (rows of ``df``) with its Note and Timestamp columns filled in."""
+        if all(column in frame for column in LAZY_COLUMNS):
+            return frame
+
+        keys = frame['Date'].dt.strftime(DATE_FORMAT).tolist()
+        texts = self.store.text(keys)
+        notes = [texts.get(key, (None, None))[0] for key in keys]
+        timestamps = pd.Series([texts.get(key, (None, None))[1] for key in keys], index=frame.index, dtype=object)
+
+        return frame.assign(Note=notes, Timestamp=parse_dates(timestamps, TIMESTAMP_FORMAT, errors='coerce'))
+
+    def between(self, start, end):
+        """Rows of ``df`` dated ``start``..``end`` inclusive, found by binary search on the sorted dates."""
+        dates = self.df['Date']
+        first = dates.searchsorted(pd.Timestamp(start).normalize(), 'left')
+        last = dates.searchsorted(pd.Timestamp(end).normalize(), 'right')
+        return self.df.iloc[first:last]
+
+    def recent(self, days=7, today=None):
+        """Rows of ``df`` from the last ``days`` days including today."""
+        today = pd.Timestamp(today or datetime.now()).normalize()
+        return self.between(today - pd.Timedelta(days=days - 1), today)
+
+    def weekdays(self):
+        """Per-weekday count, mean and 95% interval of the mood score (see ``weekday_stats``)."""
+        return weekday_stats(self.df)
+
+    def weekday_hours(self):
+        """Weekday x hour-of-day ``(count, mean)`` of the mood score, by each entry's Timestamp."""
+        return self.time_of_day().weekday_hours()
+
+    def time_of_day(self):
+        """The ``HourBins`` of every entry by the weekday and hour it was logged, binned on first use."""
+        if self.hour_bins is None:
+            self.check_times()
+            with self.store.read_lock():
+                self.times.refresh()
+            view_days = day_numbers(self.df['Date'].to_numpy())
+            view_epochs = np.fromiter((self.times.epochs.get(day, MISSING) for day in view_days.tolist()),
+                                      np.int64, len(view_days))
+            self.hour_bins = HourBins.from_arrays(view_days, view_epochs, self.df['Mood_Score'].to_numpy(),
+                                                  self.df['Sentiment_Score'].to_numpy())
+        return self.hour_bins
+
+    def check_times(self, rebuild=False):
+        """Parse every Timestamp into ``times``, or reparse if it misses entries (checked once per process)."""
+        if self._times_checked and self.times.exists() and not rebuild:
+            return
+
+        with self.store.write_lock():
+            self.sync()
+            self.times.refresh()
+            if rebuild or not self.times.exists() or len(self.times) != len(self.df):
+                texts = self.store.text()
+                self.times.build(list(texts), [timestamp for _, timestamp in texts.values()])
+        self._times_checked = True
+
+    def correlations(self):
+        """The ``MoodCorrelation`` of mood and note sentiment, brought up to date with ``df``."""
+        self.correlation.refresh(self.df)
+        return self.correlation
+
+    def mismatches(self, days=None, today=None):
+        """Rows whose score and note sentiment disagree (see ``correlation.mismatches``), optionally the last ``days``."""
+        return mismatches(self.df if days is None else self.recent(days, today))
+
+    def forecast(self, days=7, today=None):
+        """Date, Forecast, Low and High of the mood over the next ``days`` days (see ``MoodForecast``)."""
+        return self.aggregates.forecast(days, today)
+
+    @timed('dataset.search')
+    def search(self, query, start=None, end=None, moods=None):
+        """Rows of ``df`` whose notes match ``query``, in date order.
+
+        Every bare word must appear in the note and every "quoted phrase"
+        must appear in order; ``start``/``end`` bound the dates (inclusive)
+        and ``moods`` limits the scores.
+        """
+        terms, phrases = parse_query(query)
+        if not terms and not phrases:
+            return self.df.iloc[:0]
+
+        self.check_note_index()
+        with self.store.read_lock():
+            self.notes.refresh()
+            days = self.notes.search(terms, phrases)
+
+        view_days = self.df['Date'].to_numpy().astype('datetime64[D]').view('i8')
+        positions = np.searchsorted(view_days, days)
+        found = positions < len(view_days)
+        found[found] = view_days[positions[found]] == days[found]
+        rows = self.df.iloc[positions[found]]
+
+        if start is not None or end is not None:
+            dates = rows['Date']
+            first = 0 if start is None else dates.searchsorted(pd.Timestamp(start).normalize(), 'left')
+            last = len(rows) if end is None else dates.searchsorted(pd.Timestamp(end).normalize(), 'right')
+            rows = rows.iloc[first:last]
+        if moods:
+            rows = rows[rows['Mood_Score'].isin(list(moods))]
+        return rows
+
+    def check_note_index(self, rebuild=False):
+        """Build the note index, or rebuild it if it misses days of the history (checked once per process)."""
+        if self._notes_checked and self.notes.exists() and not rebuild:
+            return
+
+        with self.store.write_lock():
+            self.sync()
+            self.notes.refresh()
+            view_days = self.df['Date'].to_numpy().astype('datetime64[D]').view('i8')
+            if rebuild or not self.notes.exists() or not np.array_equal(self.notes.docs(), view_days):
+                self.notes.build({key: note for key, (note, _) in self.store.text().items()})
+        self._notes_checked = True
+
+    def keywords(self, scores, limit=10):
+        """``[(term, weight, notes)]`` of the terms most characteristic of notes scored ``scores``."""
+        self.check_terms()
+        with self.store.read_lock():
+            self.terms.refresh()
+            return self.terms.rank(scores, limit)
+
+    def check_terms(self, rebuild=False):
+        """Count the note terms, or recount them if they miss entries (checked once per process)."""
+        if self._terms_checked and self.terms.exists() and not rebuild:
+            return
+
+        with self.store.write_lock():
+            self.sync()
+            self.terms.refresh()
+            if rebuild or not self.terms.exists() or self.terms.total != len(self.df):
+                notes = self.store.text()
+                keys = self.df['Date'].dt.strftime(DATE_FORMAT)
+                self.terms.build((score, notes.get(key, ('', ''))[0])
+                                 for key, score in zip(keys, self.df['Mood_Score'].tolist()))
+        self._terms_checked = True
+
+    def has_entry(self, date):
+        """Check whether a day already has an entry."""
+        return self.store.has_entry(date)
+
+    def has_logged_today(self):
+        """Check if user has already logged mood today."""
+        return self.has_entry(datetime.now().date())
+
+    def clear(self):
+        """Delete every entry."""
+        with self.store.write_lock():
+            self.store.clear()
+            self.notes.clear()
+            self.terms.clear()
+            self.times.clear()
+        self.load()
+
+
+def build_entry(mood_score, note='', date=None, timestamp=None, sentiment=None):
+    """Return a storage row in ``COLUMNS`` order.
+
+    ``timestamp`` defaults to now and ``date`` to the timestamp's day;
+    ``sentiment`` is an already computed ``(score, label)`` pair.
+    """
+    timestamp = timestamp or datetime.now()
+    date = date or timestamp
+    sentiment_score, sentiment_label = sentiment or analyze_sentiment(note)
+
+    return [
+        _date_key(date),
+        int(mood_score),
+        MOOD_LABELS[int(mood_score)],
+        note,
+        sentiment_score,
+        sentiment_label,
+        timestamp.strftime(TIMESTAMP_FORMAT)
+    ]
@@ -0,0 +1,152 @@
+# Mood Forecasting
+# Additive Holt-Winters smoothing with weekday seasonality, updated in place per logged day
+
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+from .analytics import Z_95, weekday_codes
+from .perf import timed
+from .stats import RunningMoments
+
+# Smoothing weights of the level, the per-day trend and the weekday effects
+ALPHA = 0.3
+BETA = 0.02
+GAMMA = 0.1
+
+HORIZON = 7
+
+# Days replayed when fitting: the weight of older days is below (1 - ALPHA) ** 365,
+# so the state fitted from the last year matches one fitted from the whole history
+FIT_DAYS = 365
+
+# Days averaged for the starting level and weekday effects
+INIT_DAYS = 28
+
+
+class MoodForecast:
+    """
+    A level, a per-day trend and seven weekday effects, smoothed over the logged days.
+
+    ``update`` folds one new day in with a handful of float operations, so
+    logging an entry never refits the model; replacing the latest day
+    rolls that step back first. A day older than the latest cannot be
+    folded in and returns False, and the owner refits with ``from_scores``.
+
+    ``forecast`` returns the next days' means with a 95% band from the
+    one-step errors seen so far, clipped to the 1-5 scale.
+    """
+
+    def __init__(self, alpha=ALPHA, beta=BETA, gamma=GAMMA):
+        self.alpha, self.beta, self.gamma = alpha, beta, gamma
+        self.level = None
+        self.trend = 0.0
+        self.season = [0.0] * 7  # Monday first
+        self.last_date = None
+        self.errors = RunningMoments()  # one-step-ahead forecast errors
+        self._undo = None  # state before the latest day was folded in
+
+    @classmethod
+    @timed('forecast.fit')
+    def from_series(cls, dates, scores, **weights):
+        """Fit to date-sorted ``dates`` (datetime64) and their scores, replaying the last ``FIT_DAYS``."""
+        forecast = cls(**weights)
+        dates = np.asarray(dates, dtype='datetime64[D]')[-FIT_DAYS:]
+        scores = np.asarray(scores, dtype=np.float64)[-FIT_DAYS:]
+        if not len(dates):
+            return forecast
+
+        # Start from the mean of the first weeks and their weekday deviations from it
+        codes = weekday_codes(dates)
+        start = min(INIT_DAYS, len(dates))
+        forecast.level = float(scores[:start].mean())
+        counts = np.bincount(codes[:start], minlength=7)
+        totals = np.bincount(codes[:start], weights=scores[:start], minlength=7)
+        forecast.season = np.where(counts > 0, totals / np.maximum(counts, 1) - forecast.level, 0.0).tolist()
+
+        day_numbers = dates.view('i8')
+        forecast.last_date = _epoch_date(day_numbers[0]) - timedelta(days=1)
+        for day, score in zip(day_numbers.tolist(), scores.tolist()):
+            forecast.update(_epoch_date(day), score)
+        return forecast
+
+    @classmethod
+    def from_frame(cls, df, **weights):
+        """Fit to a date-sorted, de-duplicated mood DataFrame."""
+        return cls.from_series(df['Date'].to_numpy(), df['Mood_Score'].to_numpy(), **weights)
+
+    @classmethod
+    def from_scores(cls, scores, last_date, **weights):
+        """Fit to a ``{date: score}`` mapping, walking back from ``last_date`` over its latest ``FIT_DAYS`` days."""
+        days, day = [], last_date
+        while len(days) < min(FIT_DAYS, len(scores)):
+            if day in scores:
+                days.append(day)
+            day -= timedelta(days=1)
+        days.reverse()
+        return cls.from_series(np.array(days, dtype='datetime64[D]'), [scores[day] for day in days], **weights)
+
+    def update(self, day, score):
+        """Fold in the score of ``day``; False if it is older than the latest day."""
+        if self.level is None:
+            self.level, self.last_date = float(score), day
+            return True
+        if day == self.last_date and self._undo is not None:
+            self._rollback()
+        elif day <= self.last_date:
+            return False
+
+        weekday = day.weekday()
+        gap = (day - self.last_date).days
+        expected = self.level + gap * self.trend
+        error = score - (expected + self.season[weekday])
+        self._undo = (self.level, self.trend, self.season[weekday], self.last_date, error)
+
+        level = self.alpha * (score - self.season[weekday]) + (1 - self.alpha) * expected
+        self.trend = self.beta * (level - self.level) / gap + (1 - self.beta) * self.trend
+        self.season[weekday] = self.gamma * (score - level) + (1 - self.gamma) * self.season[weekday]
+        self.level = level
+        self.last_date = day
+        self.errors.add(error)
+        return True
+
+    def _rollback(self):
+        level, trend, season, last_date, error = self._undo
+        self.season[self.last_date.weekday()] = season
+        self.level, self.trend, self.last_date = level, trend, last_date
+        self.errors.remove(error)
+        self._undo = None
+
+    @timed('forecast.predict')
+    def forecast(self, days=HORIZON, today=None):
+        """Date, Forecast, Low and High of the ``days`` days after today (or after the latest day)."""
+        columns = ['Date', 'Forecast', 'Low', 'High']
+        if self.level is None or days < 1:
+            return pd.DataFrame(columns=columns)
+
+        today = today or datetime.now().date()
+        first = max(today, self.last_date) + timedelta(days=1)
+        targets = np.datetime64(first, 'D') + np.arange(days)
+        steps = (targets - np.datetime64(self.last_date, 'D')).astype(np.int64)
+        mean = self.level + steps * self.trend + np.asarray(self.season)[weekday_codes(targets)]
+
+        # h-step variance of additive Holt-Winters: sigma^2 (1 + sum of c_j^2 for j < h)
+        sigma = self.errors.std() or 0.0
+        j = np.arange(1, steps[-1])
+        c = self.alpha * (1 + j * self.beta) + self.gamma * (j % 7 == 0)
+        spread = np.concatenate([[0.0], np.cumsum(c * c)])[steps - 1]
+        half_width = Z_95 * sigma * np.sqrt(1 + spread)
+
+        return pd.DataFrame({
+            'Date': targets.astype('datetime64[us]'),
+            'Forecast': np.clip(mean, 1, 5),
+            'Low': np.clip(mean - half_width, 1, 5),
+            'High': np.clip(mean + half_width, 1, 5),
+        })
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _epoch_date(day):
+    """The ``date`` of a day number since 1970-01-01."""
+    return date.fromordinal(_EPOCH_ORDINAL + int(day))
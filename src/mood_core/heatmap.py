@@ -0,0 +1,111 @@
+# Mood Calendar Heatmap
+# A dense day grid of mood scores, updated per entry and shaped into a weekday x week matrix for one imshow call
+
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from .analytics import weekday_codes
+
+EMPTY = 0  # score of a day without an entry
+
+# Most month labels a calendar axis gets before it falls back to years
+MAX_TICKS = 12
+
+_EPOCH = date(1970, 1, 1)
+
+
+class DayGrid:
+    """
+    Every day's mood score in one dense int8 array (``EMPTY`` = not logged).
+
+    The array starts on a Monday and grows by doubling, so ``set`` writes a
+    new or replaced day in O(1). ``weeks`` cuts any date range out of it
+    and reshapes it into a 7 x weeks matrix, so a calendar heatmap of ten
+    years is one ``imshow`` of that matrix instead of a rectangle per day.
+    """
+
+    def __init__(self):
+        self.origin = None  # day number (since 1970-01-01) of the Monday the array starts on
+        self.days = np.zeros(0, np.int8)
+        self.first = self.last = None  # day numbers of the first and last logged day
+
+    @classmethod
+    def from_frame(cls, df):
+        """Grid of a date-sorted, de-duplicated mood DataFrame in one vectorized assignment."""
+        grid = cls()
+        if len(df) == 0:
+            return grid
+
+        days = df['Date'].to_numpy().astype('datetime64[D]').view('i8')
+        grid.first, grid.last = int(days[0]), int(days[-1])
+        grid.origin = grid.first - int(weekday_codes(days[:1])[0])
+        grid.days = np.zeros(_capacity(grid.last - grid.origin + 1), np.int8)
+        grid.days[days - grid.origin] = df['Mood_Score'].to_numpy()
+        return grid
+
+    def set(self, day, score):
+        """Record the score of ``day`` (a ``date``), replacing any earlier one."""
+        number = (day - _EPOCH).days
+        if self.origin is None:
+            self.origin = number - day.weekday()
+            self.days = np.zeros(_capacity(number - self.origin + 1), np.int8)
+        elif number < self.origin:
+            # Backfilled before the start: move the history up by whole weeks
+            shift = (self.origin - number + 6) // 7 * 7
+            days = np.zeros(_capacity(len(self.days) + shift), np.int8)
+            days[shift:shift + len(self.days)] = self.days
+            self.days, self.origin = days, self.origin - shift
+        elif number - self.origin >= len(self.days):
+            days = np.zeros(_capacity(number - self.origin + 1, len(self.days) * 2), np.int8)
+            days[:len(self.days)] = self.days
+            self.days = days
+
+        self.days[number - self.origin] = score
+        self.first = number if self.first is None else min(self.first, number)
+        self.last = number if self.last is None else max(self.last, number)
+
+    def weeks(self, start=None, end=None):
+        """``(matrix, first Monday)`` of the days ``start``..``end`` (default the logged range).
+
+        ``matrix`` is 7 rows (Monday first) by one column per week, holding
+        the scores as floats with NaN for days not logged or outside the range.
+        """
+        if self.origin is None:
+            return np.full((7, 0), np.nan), None
+
+        first = self.first if start is None else (pd.Timestamp(start).date() - _EPOCH).days
+        last = self.last if end is None else (pd.Timestamp(end).date() - _EPOCH).days
+        monday = first - int(weekday_codes(np.array([first], 'datetime64[D]'))[0])
+        weeks = max((last - monday) // 7 + 1, 0)
+
+        # Copy the overlap of the range with the array, then fold it into weeks
+        scores = np.zeros(weeks * 7, np.int8)
+        low, high = max(first, self.origin), min(last, self.origin + len(self.days) - 1)
+        if low <= high:
+            scores[low - monday:high - monday + 1] = self.days[low - self.origin:high - self.origin + 1]
+
+        matrix = scores.reshape(weeks, 7).T.astype(np.float64)
+        matrix[matrix == EMPTY] = np.nan
+        return matrix, _EPOCH + timedelta(days=monday)
+
+
+def calendar_ticks(first_monday, weeks, max_ticks=MAX_TICKS):
+    """``(columns, labels)`` marking the weeks where a month starts, thinned to years on long ranges."""
+    if first_monday is None or weeks == 0:
+        return [], []
+
+    months = pd.date_range(first_monday, periods=weeks * 7, freq='D')
+    starts = months[months.day == 1]
+    labels = [f"{day:%b}" for day in starts]
+    if len(starts) > max_ticks:
+        starts = starts[starts.month == 1]
+        step = max(1, -(-len(starts) // max_ticks))
+        starts = starts[::step]
+        labels = [f"{day:%Y}" for day in starts]
+    columns = [(day.date() - first_monday).days // 7 for day in starts]
+    return columns, labels
+
+
+def _capacity(needed, minimum=0):
+    """Array length for ``needed`` days: at least ``minimum``, in whole weeks."""
+    return -(-max(needed, minimum, 7) // 7) * 7
@@ -0,0 +1,232 @@
+# Note Keywords
+# Words and noun phrases of every note, counted per mood score for TF-IDF-style rankings
+
+import json
+import os
+from functools import lru_cache
+import numpy as np
+from textblob.en.taggers import PatternTagger
+from .perf import timed
+
+TERMS_NAME = 'terms.json'
+TERMS_VERSION = 1
+
+# The log is folded into the base counts once it grows past this
+MERGE_BYTES = 1 << 20
+
+# Terms seen in fewer notes of a mood group than this are left out of its ranking
+MIN_COUNT = 3
+
+_NOUNS = {'NN', 'NNS', 'NNP', 'NNPS'}
+_ADJECTIVES = {'JJ', 'JJR', 'JJS'}
+_VERBS = {'VB', 'VBD', 'VBG', 'VBN', 'VBP', 'VBZ'}
+_AUXILIARIES = frozenset({
+    'be', 'been', 'being', 'was', 'were', 'are', 'is', 'am', 'had', 'has', 'have', 'having',
+    'did', 'does', 'do', 'doing', 'got', 'get', 'gets', 'getting', 'made', 'make', 'felt', 'feel', 'feeling',
+})
+
+# Pattern's lexicon tagger: bundled with TextBlob, no NLTK corpora needed
+_TAGGER = PatternTagger()
+
+
+@lru_cache(maxsize=4096)
+def note_terms(text):
+    """Distinct key terms of a note: its nouns, adjectives and content verbs, plus noun phrases.
+
+    A noun phrase is a run of adjectives and nouns ending in a noun
+    (``great morning workout``). Terms are lower-cased; returns a tuple.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return ()
+
+    terms, run = {}, []
+    for word, tag in _TAGGER.tag(text) + [('', '.')]:
+        word = word.lower()
+        usable = len(word) > 2 and word.replace('-', '').isalpha()
+        if usable and (tag in _NOUNS or tag in _ADJECTIVES or (tag in _VERBS and word not in _AUXILIARIES)):
+            terms[word] = None
+        if usable and (tag in _NOUNS or tag in _ADJECTIVES):
+            run.append((word, tag))
+            continue
+
+        # A run of adjectives and nouns just ended: keep it up to its last noun
+        while run and run[-1][1] not in _NOUNS:
+            run.pop()
+        if len(run) > 1:
+            terms[" ".join(word for word, _ in run)] = None
+        run = []
+    return tuple(terms)
+
+
+class TermCounts:
+    """
+    How many notes of each mood score (1-5) contain each key term (see ``note_terms``).
+
+    The base is a JSON file of the counts; entries written after it was
+    built are appended to ``<path>.log`` as +1/-1 deltas (a replaced note
+    is removed, then its new version added), and ``merge`` folds the log
+    back into the base. ``rank`` answers from the counts alone, so no note
+    is re-analyzed when the rankings are shown.
+
+    Writes (``build``, ``add``, ``merge``, ``clear``) run under the store's
+    exclusive lock and ``refresh``/``rank`` under its shared lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.log_file = path + '.log'
+        self._sig = None
+        self._log_offset = 0
+        self._reset()
+
+    def _reset(self):
+        self.docs = np.zeros(5, np.int64)  # notes per score, index 0 is score 1
+        self.counts = {}  # term -> [notes with the term per score]
+        self._matrix = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        """Re-read the base after another process rewrote it and replay new log lines."""
+        signature = (_stat_signature(self.path), _stat_signature(self.log_file, inode_only=True))
+        if signature != self._sig:
+            self._sig = signature
+            self._log_offset = 0
+            self._reset()
+            self._load_base()
+        self._replay_log()
+
+    def _load_base(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                document = json.load(file)
+            if document.get('version') != TERMS_VERSION:
+                return
+            self.docs = np.array(document['docs'], np.int64)
+            self.counts = document['terms']
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset()
+
+    def _replay_log(self):
+        try:
+            with open(self.log_file, 'rb') as file:
+                file.seek(self._log_offset)
+                data = file.read()
+        except FileNotFoundError:
+            return
+
+        for line in data.split(b'\n')[:-1]:  # the last piece is empty or still being written
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            self._apply(record['delta'], record['score'], record['terms'])
+            self._log_offset += len(line) + 1
+
+    def _apply(self, delta, score, terms):
+        self.docs[score - 1] += delta
+        for term in terms:
+            counts = self.counts.setdefault(term, [0] * 5)
+            counts[score - 1] += delta
+            if not any(counts):
+                del self.counts[term]
+        self._matrix = None
+
+    @property
+    def total(self):
+        """Number of counted notes."""
+        return int(self.docs.sum())
+
+    def matrix(self):
+        """``(terms, counts)``: the term list and a (terms, 5) count array, rebuilt after changes."""
+        if self._matrix is None:
+            terms = list(self.counts)
+            counts = np.array([self.counts[term] for term in terms], np.int64).reshape(len(terms), 5)
+            self._matrix = (terms, counts)
+        return self._matrix
+
+    @timed('terms.rank')
+    def rank(self, scores, limit=10, min_count=MIN_COUNT):
+        """``[(term, weight, notes)]`` most characteristic of the notes scored ``scores``, best first.
+
+        The weight is TF-IDF-style: the share of the group's notes holding
+        the term, times the log inverse share of all notes holding it.
+        """
+        terms, counts = self.matrix()
+        columns = [score - 1 for score in scores]
+        group_docs = self.docs[columns].sum()
+        if not len(terms) or not group_docs:
+            return []
+
+        in_group = counts[:, columns].sum(axis=1)
+        overall = counts.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = in_group / group_docs * np.log(self.total / overall)
+        weights[in_group < min_count] = -np.inf
+
+        best = np.argsort(-weights, kind='stable')[:limit]
+        return [(terms[i], float(weights[i]), int(in_group[i])) for i in best if np.isfinite(weights[i])]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @timed('terms.build')
+    def build(self, notes):
+        """Replace the counts with those of ``notes`` (``(score, note)`` pairs) and empty the log."""
+        self._reset()
+        for score, note in notes:
+            self._apply(1, int(score), note_terms(note))
+        self._write()
+
+    def add(self, changes):
+        """Log ``(delta, score, note)`` changes: +1 for a written note, -1 for the one it replaced.
+
+        Skipped until a base exists (building one reads every note anyway).
+        """
+        if not self.exists():
+            return
+        with open(self.log_file, 'a', encoding='utf-8') as file:
+            for delta, score, note in changes:
+                file.write(json.dumps({'delta': delta, 'score': int(score), 'terms': list(note_terms(note))}) + '\n')
+        if os.path.getsize(self.log_file) > MERGE_BYTES:
+            self.merge()
+
+    @timed('terms.merge')
+    def merge(self):
+        """Fold the log into a new base."""
+        self.refresh()
+        self._write()
+
+    def clear(self):
+        """Delete the counts; the next ranking rebuilds them."""
+        for path in (self.path, self.log_file):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._sig = None
+
+    def _write(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': TERMS_VERSION, 'docs': self.docs.tolist(), 'terms': self.counts}, file)
+        os.replace(tmp_path, self.path)
+        try:
+            os.remove(self.log_file)
+        except FileNotFoundError:
+            pass
+        self._sig = None
+
+
+def _stat_signature(path, inode_only=False):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino if inode_only else (stat.st_ino, stat.st_size, stat.st_mtime_ns)
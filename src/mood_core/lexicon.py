@@ -0,0 +1,149 @@
+# Compiled Sentiment Lexicon
+# TextBlob's Pattern lexicon compiled into NumPy arrays, scored over the token ids of whole batches of notes
+
+import re
+from functools import lru_cache
+import numpy as np
+from textblob.en import sentiment as _pattern_sentiment
+from textblob._text import EMOTICONS
+
+# Pattern's rules: a negation flips the next known word to half its polarity
+# in the opposite direction, a modifier ("very") scales it by its intensity,
+# and each "!" boosts the last one by a quarter
+NEGATED_WEIGHT = -0.5
+EXCLAMATION_BOOST = 1.25
+NEGATIONS = ('no', 'not', 'never')
+
+# Token ids of words outside the lexicon, by the length rules Pattern applies
+# to them: a negation survives words of one letter, a modifier words of two
+UNKNOWN_SHORT, UNKNOWN_PAIR, UNKNOWN_LONG, EXCLAMATION = range(4)
+
+
+class LexiconSentiment:
+    """
+    A sentiment backend scoring notes from a compiled copy of Pattern's lexicon.
+
+    Every lexicon word gets an id and per-id arrays hold its polarity,
+    intensity and role (modifier, negation, emoticon). ``polarities``
+    tokenizes a batch of notes into one flat id array and applies Pattern's
+    negation, modifier and exclamation rules with running maxima and
+    ``np.bincount`` instead of a per-word Python loop. Scores follow
+    TextBlob's closely but not exactly; ``benchmarks/sentiment_benchmark.py``
+    reports how often they agree.
+    """
+
+    name = 'lexicon'
+
+    def __init__(self):
+        words = [word for word, senses in _pattern_sentiment.items() if None in senses and ' ' not in word]
+        emoticons = {emoticon.lower(): polarity for (_, polarity), group in EMOTICONS.items() for emoticon in group}
+        emoticons = {emoticon: polarity for emoticon, polarity in emoticons.items() if emoticon not in words}
+        names = ['', '', '', '!'] + list(NEGATIONS) + words + list(emoticons)
+        self.vocabulary = {name: i for i, name in enumerate(names) if i >= EXCLAMATION}
+
+        count = len(names)
+        self.polarity = np.zeros(count)
+        self.intensity = np.ones(count)
+        self.known = np.zeros(count, bool)  # assessed, and may merge with a preceding modifier
+        self.modifier = np.zeros(count, bool)
+        self.emoticon = np.zeros(count, bool)  # assessed on its own
+        self.negation = np.zeros(count, bool)
+        self.clears_negation = np.zeros(count, bool)
+        self.clears_modifier = np.zeros(count, bool)
+
+        first = EXCLAMATION + 1 + len(NEGATIONS)
+        known = slice(first, first + len(words))
+        self.polarity[known] = [_pattern_sentiment[word][None][0] for word in words]
+        self.intensity[known] = [_pattern_sentiment[word][None][2] for word in words]
+        self.known[known] = True
+        self.modifier[known] = ['RB' in _pattern_sentiment[word] for word in words]
+        self.clears_negation[known] = self.clears_modifier[known] = True
+
+        faces = slice(first + len(words), count)
+        self.polarity[faces] = list(emoticons.values())
+        self.emoticon[faces] = True
+        self.clears_negation[faces] = True
+        self.clears_modifier[faces] = [len(face) > 2 for face in emoticons]
+
+        self.negation[EXCLAMATION + 1:first] = True
+        self.clears_modifier[EXCLAMATION + 1:first] = [len(word) > 2 for word in NEGATIONS]
+        self.clears_negation[[UNKNOWN_PAIR, UNKNOWN_LONG]] = True
+        self.clears_modifier[UNKNOWN_LONG] = True
+
+        faces = '|'.join(re.escape(face) for face in sorted(emoticons, key=len, reverse=True))
+        self._tokens = re.compile(rf"(?<!\S)(?:{faces})(?!\S)|\w+(?:[-.]\w+)*|\.\.\.|\S")
+
+    @lru_cache(maxsize=4096)
+    def token_ids(self, text):
+        """Lexicon ids of the lower-cased tokens of ``text``, as an int32 array."""
+        vocabulary = self.vocabulary
+        return np.array([vocabulary.get(token, UNKNOWN_SHORT if len(token) < 2 else
+                                        UNKNOWN_PAIR if len(token) == 2 else UNKNOWN_LONG)
+                         for token in self._tokens.findall(text.lower())], np.int32)
+
+    def polarity_of(self, text):
+        """Polarity in [-1, 1] of one note."""
+        return float(self.polarities([text])[0])
+
+    def polarities(self, texts):
+        """Polarity in [-1, 1] of each of ``texts`` (0 for blank text or no known word)."""
+        arrays = [self.token_ids(text) if isinstance(text, str) else np.zeros(0, np.int32) for text in texts]
+        lengths = np.fromiter(map(len, arrays), np.int64, len(arrays))
+        if not lengths.sum():
+            return np.zeros(len(texts))
+        ids = np.concatenate(arrays)
+        doc = np.repeat(np.arange(len(texts)), lengths)
+        start = np.repeat(np.cumsum(lengths) - lengths, lengths)  # first token position of each token's note
+        position = np.arange(len(ids))
+
+        def previous(mask):
+            """Position of the last token before each token where ``mask`` holds (-1 if none)."""
+            last = np.maximum.accumulate(np.where(mask, position, -1))
+            return np.concatenate([[-1], last[:-1]])
+
+        known, assessed = self.known[ids], self.known[ids] | self.emoticon[ids]
+        clears_modifier = self.clears_modifier[ids]
+
+        # A negation right after a modifier ("really not") negates the modifier's
+        # assessment instead of the next word, and keeps the modifier active
+        before = previous(clears_modifier)
+        negation = self.negation[ids]
+        absorbed = negation & (before >= start) & self.modifier[ids[np.maximum(before, 0)]]
+        negation &= ~absorbed
+        clears_modifier &= ~absorbed
+
+        # A known word is negated by a negation since the last word that clears one
+        negator = previous(negation)
+        negated = known & (negator >= start) & (negator > previous(self.clears_negation[ids]))
+
+        # ... and modified by the known modifier right before it, skipping short words
+        before = previous(clears_modifier)
+        modified = known & (before >= start) & self.modifier[ids[np.maximum(before, 0)]]
+
+        # A modified word extends its modifier's assessment: polarity times the modifier's intensity
+        intensity = np.where(negated, 1 / self.intensity[ids], self.intensity[ids])
+        polarity = np.where(modified, np.clip(self.polarity[ids] * intensity[np.maximum(before, 0)], -1, 1),
+                            self.polarity[ids])
+
+        tokens = np.flatnonzero(assessed)
+        assessment = np.cumsum(assessed & ~modified) - 1  # assessment index of each token
+        count = assessment[tokens[-1]] + 1 if len(tokens) else 0
+        if not count:
+            return np.zeros(len(texts))
+        ends = tokens[np.append(assessment[tokens][1:] != assessment[tokens][:-1], True)]
+        score = polarity[ends]
+        flipped = np.bincount(assessment[tokens], weights=negated[tokens], minlength=count) > 0
+        flipped[assessment[before[absorbed]]] = True
+
+        # Each "!" boosts the last assessment of its note
+        exclaimed = np.flatnonzero(ids == EXCLAMATION)
+        target = np.maximum.accumulate(np.where(assessed, position, -1))[exclaimed]
+        target = target[target >= start[exclaimed]]
+        boosts = np.bincount(assessment[target], minlength=count)
+        score = np.clip(score * EXCLAMATION_BOOST ** boosts, -1, 1)
+        score = np.where(flipped, score * NEGATED_WEIGHT, score)
+
+        notes = doc[ends]
+        totals = np.bincount(notes, weights=score, minlength=len(texts))
+        counts = np.bincount(notes, minlength=len(texts))
+        return np.divide(totals, counts, out=np.zeros(len(texts)), where=counts > 0)
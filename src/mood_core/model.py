@@ -0,0 +1,108 @@
+# Mood Data Model
+# Canonical schema and mood scale shared by the CLI, both GUIs and the PDF exporter
+
+import pandas as pd
+
+DEFAULT_DATA_FILE = 'data/mood_data.csv'
+
+COLUMNS = ['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp']
+TEXT_COLUMNS = {'Date': str, 'Mood_Label': str, 'Note': str, 'Sentiment_Label': str, 'Timestamp': str}
+
+DATE_FORMAT = '%Y-%m-%d'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# In memory Mood_Label is not stored: it follows from the score (see mood_labels)
+FRAME_COLUMNS = [column for column in COLUMNS if column != 'Mood_Label']
+SENTIMENT_LABEL_DTYPE = pd.CategoricalDtype(['Negative', 'Neutral', 'Positive'])
+
+# Enough for stats, charts and aggregates, and what the store loads by
+# default. The free-text Note (which dominates file size) and Timestamp are
+# LAZY_COLUMNS, fetched per row only when a view displays them.
+ANALYTICS_COLUMNS = ['Date', 'Mood_Score', 'Sentiment_Score', 'Sentiment_Label']
+LAZY_COLUMNS = ['Note', 'Timestamp']
+
+# Explicit CSV schema so read_csv never has to infer types; dates stay text
+# (they are the index keys) and are parsed with DATE_FORMAT afterwards
+READ_DTYPES = {
+    'Date': str,
+    'Mood_Score': 'int8',
+    'Mood_Label': str,
+    'Note': str,
+    'Sentiment_Score': 'float32',
+    'Sentiment_Label': SENTIMENT_LABEL_DTYPE,
+    'Timestamp': str,
+}
+
+# Stored in the Mood_Label column
+MOOD_LABELS = {
+    1: "Very Sad",
+    2: "Sad",
+    3: "Neutral",
+    4: "Happy",
+    5: "Very Happy"
+}
+
+MOOD_EMOJIS = {
+    1: "😢",
+    2: "😞",
+    3: "😐",
+    4: "😊",
+    5: "😄"
+}
+
+# Display form used by the menus and the light GUI
+MOOD_SCALE = {score: f"{label} {MOOD_EMOJIS[score]}" for score, label in MOOD_LABELS.items()}
+
+
+def empty_frame(columns=FRAME_COLUMNS):
+    """Return an empty mood DataFrame in the compact in-memory schema."""
+    return typed_frame(pd.DataFrame(columns=COLUMNS), columns)
+
+
+def parse_dates(values, date_format=DATE_FORMAT, errors='raise'):
+    """Parse date strings with an explicit format, inferring only for odd legacy values."""
+    try:
+        return pd.to_datetime(values, format=date_format)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, errors=errors)
+
+
+_CONVERTERS = {
+    'Date': parse_dates,
+    'Mood_Score': lambda values: pd.to_numeric(values).astype('int8'),
+    'Note': lambda values: values,
+    'Sentiment_Score': lambda values: pd.to_numeric(values, errors='coerce').astype('float32'),
+    'Sentiment_Label': lambda values: values.astype(SENTIMENT_LABEL_DTYPE),
+    'Timestamp': lambda values: parse_dates(values, TIMESTAMP_FORMAT, errors='coerce'),
+}
+
+
+def typed_frame(rows, columns=FRAME_COLUMNS):
+    """Convert rows read from storage (``COLUMNS``, mostly text) to the compact schema.
+
+    int8 scores, float32 sentiment, categorical sentiment labels and
+    datetime64 dates/timestamps; ``Note`` stays text and ``Mood_Label`` is
+    dropped. Columns already in their target dtype pass through cheaply.
+    """
+    return pd.DataFrame({column: _CONVERTERS[column](rows[column]) for column in columns},
+                        columns=columns)
+
+
+def mood_labels(scores):
+    """Derive the Mood_Label values for a Series of scores."""
+    return scores.map(MOOD_LABELS)
+
+
+def storage_frame(df):
+    """Turn a compact frame back into text ``COLUMNS`` for writing to CSV."""
+    out = df.copy()
+    out['Date'] = df['Date'].dt.strftime(DATE_FORMAT)
+    out['Timestamp'] = df['Timestamp'].dt.strftime(TIMESTAMP_FORMAT)
+    out['Sentiment_Score'] = df['Sentiment_Score'].astype(float).round(3)
+    out.insert(COLUMNS.index('Mood_Label'), 'Mood_Label', mood_labels(df['Mood_Score']))
+    return out
+
+
+def nearest_score(value):
+    """Round an average mood (e.g. 3.6) to the closest scale point."""
+    return min(5, max(1, int(value + 0.5)))
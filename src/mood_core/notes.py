@@ -0,0 +1,322 @@
+# Inverted Note Index
+# Token -> day/position postings over every note: a memory-mapped base segment plus an append-only log of recent notes
+
+import bisect
+import json
+import os
+import re
+import struct
+from array import array
+import numpy as np
+from .perf import timed
+from .sentiment import tokenize
+
+NOTE_INDEX_NAME = 'notes.idx'
+MAGIC = b'MOODIDX1'
+
+# magic, then the number of documents, terms, postings and vocabulary bytes
+HEADER = struct.Struct('<8sQQQQ')
+
+# The log is folded into the base segment once it grows past this
+MERGE_BYTES = 1 << 20
+
+# A posting is day << POSITION_BITS | token position (0 for single tokens)
+POSITION_BITS = 16
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+_EMPTY = np.empty(0, np.int64)
+
+
+def parse_query(query):
+    """Split a query into ``(terms, phrases)`` of tokens.
+
+    Bare words are terms; "quoted text", and words that tokenize to
+    several tokens (``didn't``), are phrases.
+    """
+    terms, phrases = [], []
+    for quoted, word in _QUERY.findall(query):
+        tokens = tokenize(quoted or word)
+        if len(tokens) == 1:
+            terms.append(tokens[0])
+        elif tokens:
+            phrases.append(tokens)
+    return terms, phrases
+
+
+def day_number(value):
+    """Days since 1970-01-01 of a date key, date or Timestamp (the index's document id)."""
+    return int(np.datetime64(str(value)[:10], 'D').astype(np.int64))
+
+
+def _postings_of(day, tokens):
+    """``(key, posting)`` pairs a note is indexed under: each distinct token, and each adjacent
+    token pair (``"a b"``) with its position."""
+    base = day << POSITION_BITS
+    pairs = {(token, base) for token in tokens}
+    for position, (first, second) in enumerate(zip(tokens, tokens[1:])):
+        pairs.add((f"{first} {second}", base | min(position, POSITION_MASK)))
+    return pairs
+
+
+def _note_tokens(note):
+    return tokenize(note) if isinstance(note, str) else ()
+
+
+class NoteIndex:
+    """
+    An inverted index from note tokens to the days whose notes contain them.
+
+    Every note is indexed under its distinct tokens (see ``tokenize``) and
+    under each pair of adjacent tokens together with the pair's position.
+    A phrase is then an intersection of its pairs aligned on their start
+    position, so terms and phrases of any length are answered from the
+    index alone.
+
+    The base segment is one file: a header, the sorted indexed days, per-term
+    offsets, the sorted postings of every term and the sorted vocabulary.
+    Its arrays are memory-mapped and terms are found by binary search, so
+    opening it costs only the vocabulary. Notes written after it was built
+    are appended as JSON lines to ``<path>.log`` and replace the base
+    postings of their day; ``merge`` folds the log back into a new base.
+
+    Writes (``build``, ``add``, ``merge``, ``clear``) run under the store's
+    exclusive lock and ``refresh``/``search`` under its shared lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.log_file = path + '.log'
+        self._sig = None
+        self._log_offset = 0
+        self._reset()
+
+    def _reset(self):
+        self._docs = _EMPTY
+        self._offsets = np.zeros(1, np.int64)
+        self._postings = _EMPTY
+        self._vocab = []
+
+        # Notes from the log: day -> its (key, posting) pairs, and key -> postings
+        self._recent = {}
+        self._recent_postings = {}
+        self._recent_days = _EMPTY
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        """Re-open the base after another process rewrote it and replay new log lines."""
+        signature = (_stat_signature(self.path), _stat_signature(self.log_file, inode_only=True))
+        if signature != self._sig:
+            self._sig = signature
+            self._log_offset = 0
+            self._reset()
+            self._load_base()
+        self._replay_log()
+
+    def _load_base(self):
+        try:
+            with open(self.path, 'rb') as file:
+                magic, docs, terms, postings, vocab_bytes = HEADER.unpack(file.read(HEADER.size))
+                if magic != MAGIC:
+                    return
+                file.seek(-vocab_bytes, os.SEEK_END)
+                vocab = file.read(vocab_bytes).decode('utf-8')
+        except (OSError, struct.error):
+            return
+
+        offset = HEADER.size
+        if docs:
+            self._docs = np.memmap(self.path, np.int64, 'r', offset, (docs,))
+        offset += docs * 8
+        self._offsets = np.memmap(self.path, np.int64, 'r', offset, (terms + 1,))
+        offset += (terms + 1) * 8
+        if postings:
+            self._postings = np.memmap(self.path, np.int64, 'r', offset, (postings,))
+        self._vocab = vocab.split('\n') if terms else []
+
+    def _replay_log(self):
+        try:
+            with open(self.log_file, 'rb') as file:
+                file.seek(self._log_offset)
+                data = file.read()
+        except FileNotFoundError:
+            return
+
+        for line in data.split(b'\n')[:-1]:  # the last piece is empty or still being written
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            self._index_recent(day_number(record['date']), tuple(record['tokens']))
+            self._log_offset += len(line) + 1
+        self._recent_days = np.array(sorted(self._recent), np.int64)
+
+    def _index_recent(self, day, tokens):
+        for key, posting in self._recent.get(day, ()):
+            self._recent_postings[key].discard(posting)
+        pairs = _postings_of(day, tokens)
+        self._recent[day] = pairs
+        for key, posting in pairs:
+            self._recent_postings.setdefault(key, set()).add(posting)
+
+    def docs(self):
+        """Sorted day numbers of every indexed note."""
+        return np.union1d(self._docs, self._recent_days)
+
+    def postings(self, key):
+        """Sorted postings (``day << POSITION_BITS | position``) of ``key``."""
+        position = bisect.bisect_left(self._vocab, key)
+        if position < len(self._vocab) and self._vocab[position] == key:
+            base = self._postings[self._offsets[position]:self._offsets[position + 1]]
+            if len(self._recent_days):
+                base = base[~np.isin(base >> POSITION_BITS, self._recent_days)]
+        else:
+            base = _EMPTY
+
+        recent = self._recent_postings.get(key)
+        if recent:
+            return np.union1d(base, np.fromiter(recent, np.int64, len(recent)))
+        return np.asarray(base)
+
+    @timed('notes.search')
+    def search(self, terms, phrases=()):
+        """Sorted day numbers whose notes hold every term and every phrase (token tuples)."""
+        matches = [self.postings(term) >> POSITION_BITS for term in set(terms)]
+        for phrase in phrases:
+            # Shift each pair's postings back to the phrase start, then intersect
+            starts = None
+            for offset, pair in enumerate(zip(phrase, phrase[1:])):
+                postings = self.postings(f"{pair[0]} {pair[1]}")
+                postings = postings[(postings & POSITION_MASK) >= offset] - offset
+                starts = postings if starts is None else np.intersect1d(starts, postings, assume_unique=True)
+            matches.append(_unique_sorted(starts >> POSITION_BITS))
+        if not matches:
+            return _EMPTY
+
+        result = None
+        for days in sorted(matches, key=len):
+            result = days if result is None else np.intersect1d(result, days, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @timed('notes.build')
+    def build(self, notes):
+        """Replace the index with ``notes`` (``{date key: note}``) and empty the log."""
+        terms = {}
+        pair_terms, pair_postings = array('q'), array('q')
+        days = array('q')
+        for key, note in notes.items():
+            day = day_number(key)
+            days.append(day)
+            for token_key, posting in _postings_of(day, _note_tokens(note)):
+                pair_terms.append(terms.setdefault(token_key, len(terms)))
+                pair_postings.append(posting)
+
+        self._write(np.frombuffer(days, np.int64), list(terms),
+                    np.frombuffer(pair_terms, np.int64), np.frombuffer(pair_postings, np.int64))
+
+    def add(self, notes):
+        """Log ``{date key: note}`` for notes written since the base was built.
+
+        Skipped until a base exists (building one reads every note anyway).
+        """
+        if not self.exists():
+            return
+        with open(self.log_file, 'a', encoding='utf-8') as file:
+            for key, note in notes.items():
+                file.write(json.dumps({'date': str(key)[:10], 'tokens': list(_note_tokens(note))}) + '\n')
+        if os.path.getsize(self.log_file) > MERGE_BYTES:
+            self.merge()
+
+    @timed('notes.merge')
+    def merge(self):
+        """Fold the log into a new base segment."""
+        self.refresh()
+        postings = np.asarray(self._postings)
+        keep = ~np.isin(postings >> POSITION_BITS, self._recent_days)
+        base_terms = np.repeat(np.arange(len(self._vocab), dtype=np.int64), np.diff(self._offsets))[keep]
+
+        vocab = list(self._vocab)
+        known = {term: i for i, term in enumerate(vocab)}
+        recent_terms, recent_postings = array('q'), array('q')
+        for key, values in self._recent_postings.items():
+            term = known.setdefault(key, len(vocab))
+            if term == len(vocab):
+                vocab.append(key)
+            for posting in values:
+                recent_terms.append(term)
+                recent_postings.append(posting)
+
+        self._write(self.docs(), vocab,
+                    np.concatenate([base_terms, np.frombuffer(recent_terms, np.int64)]),
+                    np.concatenate([postings[keep], np.frombuffer(recent_postings, np.int64)]))
+
+    def clear(self):
+        """Delete the index; the next search rebuilds it."""
+        for path in (self.path, self.log_file):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._sig = None
+
+    def _write(self, docs, vocab, terms, postings):
+        """Write a base segment from (term id, posting) pairs over ``vocab`` and drop the log."""
+        order = sorted(range(len(vocab)), key=vocab.__getitem__)
+        rank = np.empty(len(vocab), np.int64)
+        rank[order] = np.arange(len(vocab))
+
+        # Sort by (term, posting) and drop repeated pairs
+        terms = rank[terms]
+        sort = np.lexsort((postings, terms))
+        terms, postings = terms[sort], postings[sort]
+        distinct = np.ones(len(terms), bool)
+        distinct[1:] = (terms[1:] != terms[:-1]) | (postings[1:] != postings[:-1])
+        terms, postings = terms[distinct], postings[distinct]
+
+        offsets = np.zeros(len(vocab) + 1, np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(vocab)), out=offsets[1:])
+        vocab_bytes = '\n'.join(vocab[i] for i in order).encode('utf-8')
+        docs = np.unique(docs).astype(np.int64)
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, len(docs), len(vocab), len(postings), len(vocab_bytes)))
+            file.write(docs.tobytes())
+            file.write(offsets.tobytes())
+            file.write(postings.astype(np.int64).tobytes())
+            file.write(vocab_bytes)
+        os.replace(tmp_path, self.path)
+        try:
+            os.remove(self.log_file)
+        except FileNotFoundError:
+            pass
+        self._sig = None
+
+
+def _unique_sorted(values):
+    """``np.unique`` for an already sorted array."""
+    if len(values) < 2:
+        return values
+    keep = np.ones(len(values), bool)
+    keep[1:] = values[1:] != values[:-1]
+    return values[keep]
+
+
+def _stat_signature(path, inode_only=False):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino if inode_only else (stat.st_ino, stat.st_size, stat.st_mtime_ns)
@@ -0,0 +1,291 @@
+# Time-Partitioned Mood History
+# One CSV per month under <dir>/YYYY/MM.csv, a manifest of per-partition stats and gzip archives for old years
+
+import gzip
+import io
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from .model import DATE_FORMAT, storage_frame
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+ARCHIVE_NAME = 'archive.csv.gz'
+
+
+# Folder used by every data file before partition folders were named after their file
+LEGACY_DIRECTORY = 'mood'
+
+
+def partition_directory(data_file):
+    """The default partition folder for ``data_file``: ``<stem>.mood`` beside it."""
+    stem = os.path.splitext(os.path.basename(data_file))[0]
+    return os.path.join(os.path.dirname(data_file), f"{stem}.mood")
+
+
+def legacy_partition_directory(data_file):
+    """The shared ``mood`` folder older versions kept ``data_file``'s partitions in."""
+    return os.path.join(os.path.dirname(data_file), LEGACY_DIRECTORY)
+
+
+class MoodPartitions:
+    """
+    The compacted mood history, split by month.
+
+    Each month lives in ``YYYY/MM.csv``, or in ``YYYY/archive.csv.gz`` once
+    its year has been archived. ``manifest.json`` lists every month with
+    the file holding it, its first and last date and summary stats (row
+    count, mood sum and per-score counts, sentiment sum), so date-bounded
+    reads open only the files they need.
+
+    The layout is written by ``MoodStore`` under its exclusive lock; replaced
+    files are staged as ``.tmp`` and the manifest is swapped in last.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, MANIFEST_NAME)
+        self._manifest = None
+        self._manifest_sig = None
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def exists(self):
+        return os.path.exists(self.manifest_file)
+
+    @property
+    def manifest(self):
+        """``{'YYYY-MM': entry}`` for every partition, re-read when the file changes."""
+        signature = _stat_signature(self.manifest_file)
+        if self._manifest is None or signature != self._manifest_sig:
+            try:
+                with open(self.manifest_file, encoding='utf-8') as file:
+                    self._manifest = json.load(file)['partitions']
+            except FileNotFoundError:
+                self._manifest = {}
+            self._manifest_sig = signature
+        return self._manifest
+
+    def create(self):
+        """Start an empty layout."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_manifest({})
+
+    def months(self, start=None, end=None):
+        """Months whose entries overlap ``start``..``end`` (``YYYY-MM-DD`` keys, inclusive)."""
+        return sorted(month for month, entry in self.manifest.items()
+                      if (start is None or entry['max_date'] >= start)
+                      and (end is None or entry['min_date'] <= end))
+
+    def files(self, months=None):
+        """Distinct files holding ``months`` (default all), in date order."""
+        manifest = self.manifest
+        names = {}
+        for month in sorted(manifest if months is None else months):
+            entry = manifest.get(month)
+            if entry is not None:
+                names.setdefault(entry['file'])
+        return list(names)
+
+    def summary(self, months=None):
+        """Totals over ``months`` (default all) straight from the manifest."""
+        entries = [self.manifest[month] for month in (self.months() if months is None else months)]
+        return {
+            'rows': sum(entry['rows'] for entry in entries),
+            'mood_sum': sum(entry['mood_sum'] for entry in entries),
+            'scores': [sum(entry['scores'][i] for entry in entries) for i in range(5)],
+            'sentiment_sum': sum(entry['sentiment_sum'] for entry in entries),
+            'min_date': entries[0]['min_date'] if entries else None,
+            'max_date': entries[-1]['max_date'] if entries else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def csv_buffer(self, months=None):
+        """One CSV (header plus rows, date-sorted) covering ``months``, or None if empty.
+
+        The partition files are concatenated as bytes so the caller parses
+        them with a single ``read_csv`` however many files there are.
+        """
+        chunks = []
+        for name in self.files(months):
+            data = self._read_file(name)
+            if chunks:
+                data = data[data.index(b'\n') + 1:]
+            if data and not data.endswith(b'\n'):
+                data += b'\n'
+            chunks.append(data)
+        if not chunks:
+            return None
+        return io.BytesIO(b''.join(chunks))
+
+    def _read_file(self, name):
+        with open(os.path.join(self.directory, name), 'rb') as file:
+            data = file.read()
+        return gzip.decompress(data) if name.endswith('.gz') else data
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def stage(self, view, months):
+        """Write replacements for every file holding ``months`` and the manifest that lists them.
+
+        ``view`` is the whole date-sorted history in the compact schema.
+        Returns the ``[(tmp path, final path), ...]`` to pass to ``commit``;
+        the new manifest is staged at ``manifest.json.tmp``.
+        """
+        manifest = dict(self.manifest)
+        targets = {}
+        for month in months:
+            name = manifest[month]['file'] if month in manifest else self._file_for(month)
+            targets.setdefault(name, set()).add(month)
+
+        # A rewritten file keeps every month it held
+        for month, entry in manifest.items():
+            if entry['file'] in targets:
+                targets[entry['file']].add(month)
+
+        dates = view['Date']
+        replacements = []
+        for name, file_months in sorted(targets.items()):
+            parts = []
+            for month in sorted(file_months):
+                first = pd.Timestamp(f"{month}-01")
+                lo = dates.searchsorted(first, 'left')
+                hi = dates.searchsorted(first + pd.offsets.MonthBegin(1), 'left')
+                rows = view.iloc[lo:hi]
+                if len(rows):
+                    manifest[month] = dict(_partition_stats(rows), file=name)
+                    parts.append(rows)
+                else:
+                    manifest.pop(month, None)
+
+            path = os.path.join(self.directory, name)
+            data = storage_frame(pd.concat(parts) if parts else view.iloc[:0]).to_csv(index=False).encode('utf-8')
+            _write_file(path + '.tmp', gzip.compress(data, mtime=0) if name.endswith('.gz') else data)
+            replacements.append((path + '.tmp', path))
+
+        self._write_manifest(manifest, self.manifest_file + '.tmp')
+        return replacements
+
+    def commit(self, replacements):
+        """Move staged files into place, the manifest last."""
+        for tmp_path, path in replacements:
+            os.replace(tmp_path, path)
+        for directory in {os.path.dirname(path) for _, path in replacements}:
+            _fsync_directory(directory)
+        os.replace(self.manifest_file + '.tmp', self.manifest_file)
+        _fsync_directory(self.directory)
+
+    def archive(self, before_year):
+        """Fold every month of the years before ``before_year`` into ``YYYY/archive.csv.gz``.
+
+        Returns the number of monthly files archived. Archived months stay
+        in the manifest (pointing at the archive), so range pruning and
+        later updates of those months keep working.
+        """
+        manifest = dict(self.manifest)
+        years = {}
+        for month, entry in manifest.items():
+            if int(month[:4]) < before_year and not entry['file'].endswith('.gz'):
+                years.setdefault(month[:4], []).append(month)
+        if not years:
+            return 0
+
+        replacements = []
+        for year in sorted(years):
+            name = f"{year}/{ARCHIVE_NAME}"
+            year_months = [month for month in manifest if month[:4] == year]
+            rows = pd.read_csv(self.csv_buffer(year_months), dtype=str, keep_default_na=False)
+            data = rows.sort_values('Date', kind='stable').to_csv(index=False).encode('utf-8')
+
+            path = os.path.join(self.directory, name)
+            _write_file(path + '.tmp', gzip.compress(data, mtime=0))
+            replacements.append((path + '.tmp', path))
+            for month in year_months:
+                manifest[month] = dict(manifest[month], file=name)
+
+        self._write_manifest(manifest, self.manifest_file + '.tmp')
+        old_files = self.files([month for months in years.values() for month in months])
+        self.commit(replacements)
+
+        # Only unreferenced once the new manifest is in place
+        for name in old_files:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+        return sum(len(months) for months in years.values())
+
+    def clear(self):
+        """Delete every partition file and reset the manifest."""
+        for name in self.files():
+            try:
+                os.remove(os.path.join(self.directory, name))
+                os.rmdir(os.path.dirname(os.path.join(self.directory, name)))
+            except OSError:
+                pass  # already gone, or the year folder still holds other files
+        self.create()
+
+    def _file_for(self, month):
+        """Where a month not yet in the manifest goes: its year's archive if there is one."""
+        year = month[:4]
+        if any(m[:4] == year and entry['file'].endswith('.gz') for m, entry in self.manifest.items()):
+            return f"{year}/{ARCHIVE_NAME}"
+        return f"{year}/{month[5:7]}.csv"
+
+    def _write_manifest(self, partitions, path=None):
+        document = {'version': MANIFEST_VERSION, 'updated': datetime.now().isoformat(timespec='seconds'),
+                    'partitions': dict(sorted(partitions.items()))}
+        _write_file(path or self.manifest_file, json.dumps(document, indent=1).encode('utf-8'))
+
+
+def _partition_stats(rows):
+    """Manifest stats for one month of compact-schema rows."""
+    scores = rows['Mood_Score'].to_numpy()
+    return {
+        'rows': len(rows),
+        'min_date': rows['Date'].iloc[0].strftime(DATE_FORMAT),
+        'max_date': rows['Date'].iloc[-1].strftime(DATE_FORMAT),
+        'mood_sum': int(scores.sum(dtype=np.int64)),
+        'scores': np.bincount(scores, minlength=6)[1:6].tolist(),
+        'sentiment_sum': round(float(np.nansum(rows['Sentiment_Score'].to_numpy(), dtype=np.float64)), 3),
+    }
+
+
+def _write_file(path, data):
+    """Write ``data`` to ``path`` and fsync it."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _fsync_directory(directory):
+    """Persist renames in ``directory`` where the platform allows it."""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _stat_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
@@ -0,0 +1,186 @@
+# Performance Instrumentation
+# Call counts and latency histograms for the tracker's hot paths
+#
+# Disabled by default: an instrumented call then costs one flag check.
+# Enable with perf.enable() (e.g. `mood_tracker.py stats --perf`) or by
+# setting MOOD_PERF=1; MOOD_PERF_PROM=<path> also dumps Prometheus text on exit.
+
+import atexit
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_NAME = 'mood_tracker_operation_duration_seconds'
+
+_enabled = False
+_lock = threading.Lock()
+_metrics = {}  # operation name -> _Histogram
+_null = nullcontext()
+_prometheus_file = None
+
+
+class _Histogram:
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+def enable(prometheus_file=None):
+    """Start recording; optionally dump Prometheus text to a file at exit."""
+    global _enabled, _prometheus_file
+    _enabled = True
+    if prometheus_file:
+        if _prometheus_file is None:
+            atexit.register(_dump_at_exit)
+        _prometheus_file = prometheus_file
+
+
+def disable():
+    """Stop recording (collected metrics are kept)."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget everything recorded so far."""
+    with _lock:
+        _metrics.clear()
+
+
+def observe(name, seconds):
+    """Record one call of ``name`` that took ``seconds``."""
+    with _lock:
+        histogram = _metrics.get(name)
+        if histogram is None:
+            histogram = _metrics[name] = _Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def _measuring(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def measure(name):
+    """Context manager timing a block as operation ``name``."""
+    return _measuring(name) if _enabled else _null
+
+
+def timed(name):
+    """Decorator timing every call of a function as operation ``name``."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """Return ``{name: {count, total, mean, p50, p95, max}}`` for every operation seen."""
+    with _lock:
+        return {
+            name: {
+                'count': h.count,
+                'total': h.total,
+                'mean': h.total / h.count,
+                'p50': h.quantile(0.5),
+                'p95': h.quantile(0.95),
+                'max': h.max,
+            }
+            for name, h in sorted(_metrics.items())
+        }
+
+
+def format_table():
+    """Human-readable summary of the recorded operations."""
+    stats = snapshot()
+    if not stats:
+        return "No timings recorded."
+
+    width = max(len('Operation'), max(len(name) for name in stats))
+    lines = [f"{'Operation':<{width}}  {'Calls':>7}  {'Total ms':>10}  {'Mean ms':>9}  "
+             f"{'p50 ms':>8}  {'p95 ms':>8}  {'Max ms':>9}"]
+    for name, s in stats.items():
+        lines.append(f"{name:<{width}}  {s['count']:>7}  {s['total'] * 1000:>10.2f}  {s['mean'] * 1000:>9.3f}  "
+                     f"{s['p50'] * 1000:>8.3f}  {s['p95'] * 1000:>8.3f}  {s['max'] * 1000:>9.3f}")
+    return '\n'.join(lines)
+
+
+def prometheus_text():
+    """Render the histograms in the Prometheus text exposition format."""
+    lines = [f"# HELP {METRIC_NAME} Latency of instrumented mood tracker operations.",
+             f"# TYPE {METRIC_NAME} histogram"]
+    with _lock:
+        for name, h in sorted(_metrics.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS, h.buckets):
+                cumulative += count
+                lines.append(f'{METRIC_NAME}_bucket{{op="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{op="{name}",le="+Inf"}} {h.count}')
+            lines.append(f'{METRIC_NAME}_sum{{op="{name}"}} {h.total:.9f}')
+            lines.append(f'{METRIC_NAME}_count{{op="{name}"}} {h.count}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    """Write ``prometheus_text()`` to ``path`` atomically."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def _dump_at_exit():
+    try:
+        write_prometheus(_prometheus_file)
+    except OSError as e:
+        print(f"⚠️ Could not write performance metrics: {e}")
+
+
+if os.environ.get('MOOD_PERF') or os.environ.get('MOOD_PERF_PROM'):
+    enable(os.environ.get('MOOD_PERF_PROM') or None)
@@ -0,0 +1,195 @@
+# GUI Session Profiling
+# cProfile around every Tk callback, a slow-handler log and pstats/speedscope output
+
+import cProfile
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+DEFAULT_PROFILE_DIR = 'data/profiles'
+SLOW_HANDLER_MS = 100  # handlers slower than this are logged as they happen
+TOP_HANDLERS = 15
+
+
+class GuiProfiler:
+    """
+    Profile a Tk session callback by callback.
+
+    ``install()`` swaps ``tkinter.CallWrapper.__call__`` so every command,
+    event binding and ``after`` callback runs under one shared cProfile and
+    is timed with the Tk event that triggered it. ``finish()`` restores
+    Tkinter and writes ``<name>.pstats`` (for pstats/snakeviz) plus a
+    ``<name>.speedscope.json`` timeline of the handlers.
+    """
+
+    def __init__(self, app_name, output_dir=DEFAULT_PROFILE_DIR, slow_ms=SLOW_HANDLER_MS):
+        self.app_name = app_name
+        self.output_dir = output_dir
+        self.slow_seconds = slow_ms / 1000
+        self.profile = cProfile.Profile()
+        self.handlers = {}  # handler name -> [calls, total seconds, max seconds, slowest event]
+        self.frames = {}  # speedscope frame name -> index
+        self.events = []
+        self._depth = 0
+        self._original_call = None
+        self._start = time.perf_counter()
+
+    def install(self):
+        """Start profiling every Tk callback."""
+        import tkinter
+
+        profiler = self
+        original_call = self._original_call = tkinter.CallWrapper.__call__
+
+        def profiled_call(wrapper, *args):
+            try:
+                if wrapper.subst:
+                    args = wrapper.subst(*args)
+                return profiler.run(wrapper.func, args)
+            except SystemExit:
+                raise
+            except:
+                wrapper.widget._report_exception()
+
+        profiled_call.__wrapped__ = original_call
+        tkinter.CallWrapper.__call__ = profiled_call
+        return self
+
+    def run(self, func, args, handler=None, event=None):
+        """Call ``func(*args)`` under the profiler and record its timing."""
+        handler = handler or _handler_name(func)
+        event = event or _describe_event(func, args)
+        frame = self._frame(f"{handler} ({event})")
+
+        outermost = self._depth == 0  # modal dialogs run callbacks inside callbacks
+        self._depth += 1
+        start = time.perf_counter()
+        self.events.append({'type': 'O', 'frame': frame, 'at': self._ms(start)})
+        if outermost:
+            self.profile.enable()
+        try:
+            return func(*args)
+        finally:
+            if outermost:
+                self.profile.disable()
+            end = time.perf_counter()
+            self._depth -= 1
+            self.events.append({'type': 'C', 'frame': frame, 'at': self._ms(end)})
+            self._record(handler, event, end - start)
+
+    def _record(self, handler, event, seconds):
+        stats = self.handlers.setdefault(handler, [0, 0.0, 0.0, None])
+        stats[0] += 1
+        stats[1] += seconds
+        if seconds > stats[2]:
+            stats[2] = seconds
+            stats[3] = event
+
+        if seconds >= self.slow_seconds:
+            print(f"🐢 {seconds * 1000:7.1f} ms  {handler}  [{event}]")
+
+    def _frame(self, name):
+        index = self.frames.get(name)
+        if index is None:
+            index = self.frames[name] = len(self.frames)
+        return index
+
+    def _ms(self, moment):
+        return (moment - self._start) * 1000
+
+    def slowest_handlers(self, limit=TOP_HANDLERS):
+        """Return ``(handler, calls, total, max, slowest event)`` rows, slowest first."""
+        rows = [(name, *stats) for name, stats in self.handlers.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)[:limit]
+
+    def finish(self):
+        """Restore Tkinter, print the slowest handlers and write the profile files."""
+        if self._original_call is not None:
+            import tkinter
+            tkinter.CallWrapper.__call__ = self._original_call
+            self._original_call = None
+
+        print("\n⏱️ Slowest Tk handlers")
+        print(f"{'Max ms':>9}  {'Total ms':>10}  {'Calls':>6}  Handler [slowest event]")
+        for handler, calls, total, longest, event in self.slowest_handlers():
+            print(f"{longest * 1000:>9.1f}  {total * 1000:>10.1f}  {calls:>6}  {handler} [{event}]")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.app_name}-{datetime.now():%Y%m%d-%H%M%S}")
+
+        pstats_file = f"{base}.pstats"
+        self.profile.dump_stats(pstats_file)
+
+        speedscope_file = f"{base}.speedscope.json"
+        with open(speedscope_file, 'w', encoding='utf-8') as file:
+            json.dump(self._speedscope(), file)
+
+        print(f"📁 Profile written to {pstats_file} and {speedscope_file}")
+        return pstats_file, speedscope_file
+
+    def _speedscope(self):
+        end = self.events[-1]['at'] if self.events else 0
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': f"{self.app_name} Tk callbacks",
+            'exporter': 'mood_core.profiling',
+            'shared': {'frames': [{'name': name} for name in self.frames]},
+            'profiles': [{
+                'type': 'evented',
+                'name': 'Tk callbacks',
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': end,
+                'events': self.events,
+            }],
+        }
+
+
+def _handler_name(func):
+    """Readable name for a callback, looking through Tk's ``after`` wrapper."""
+    code = getattr(func, '__code__', None)
+    if code is not None and code.co_name == 'callit' and func.__closure__:
+        cells = dict(zip(code.co_freevars, func.__closure__))
+        if 'func' in cells:
+            func = cells['func'].cell_contents
+            code = getattr(func, '__code__', None)
+
+    name = getattr(func, '__qualname__', None) or type(func).__qualname__
+    if name.endswith('<lambda>') and code is not None:
+        name = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return name
+
+
+def _describe_event(func, args):
+    """Describe what made Tk invoke a callback."""
+    code = getattr(func, '__code__', None)
+    if code is not None and code.co_name == 'callit':
+        return 'after'
+
+    event = args[0] if args else None
+    if event is not None and hasattr(event, 'type') and hasattr(event, 'widget'):
+        detail = f" {event.keysym}" if getattr(event, 'keysym', '??') not in ('??', None) else ""
+        return f"<{event.type}{detail}> {event.widget}"
+    return 'command'
+
+
+def profile_from_argv(app_name, argv=None):
+    """Return an installed GuiProfiler when ``--profile`` was passed, else None.
+
+    ``--profile-dir DIR`` sets where the files go (default data/profiles).
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description=f"Launch {app_name}.")
+    parser.add_argument('--profile', action='store_true',
+                        help="profile every Tk callback and write pstats/speedscope files on exit")
+    parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR,
+                        help=f"where profile files are written (default {DEFAULT_PROFILE_DIR})")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if not args.profile:
+        return None
+    print(f"⏱️ Profiling enabled; handlers slower than {SLOW_HANDLER_MS} ms are logged")
+    return GuiProfiler(app_name, args.profile_dir).install()
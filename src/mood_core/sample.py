@@ -0,0 +1,36 @@
+# Sample Data Generation
+# Synthetic mood histories for demos, testing and benchmarks
+
+import random
+from datetime import datetime, timedelta
+from .dataset import build_entry
+from .sentiment import analyze_sentiments
+
+
+def generate_sample_entries(days, notes, weekday_weights, weekend_weights, end=None, rng=random):
+    """Return ``days`` consecutive daily entries ending at ``end`` (default now).
+
+    ``weekday_weights``/``weekend_weights`` map mood scores to relative
+    frequencies, mirroring how weekends tend to score higher. The
+    ``notes`` are scored once, in one batch, instead of once per entry.
+    """
+    end = end or datetime.now()
+    base_date = end - timedelta(days=days - 1)
+    weekday_scores, weekday_w = list(weekday_weights), list(weekday_weights.values())
+    weekend_scores, weekend_w = list(weekend_weights), list(weekend_weights.values())
+
+    sentiments = dict(zip(notes, analyze_sentiments(notes)))
+
+    entries = []
+    for i in range(days):
+        date = base_date + timedelta(days=i)
+
+        if date.weekday() >= 5:  # Weekend
+            mood_score = rng.choices(weekend_scores, weights=weekend_w)[0]
+        else:  # Weekday
+            mood_score = rng.choices(weekday_scores, weights=weekday_w)[0]
+
+        note = rng.choice(notes)
+        entries.append(build_entry(mood_score, note, timestamp=date, sentiment=sentiments[note]))
+
+    return entries
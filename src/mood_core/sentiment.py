@@ -0,0 +1,114 @@
+# Sentiment Analysis
+# Note polarity from a pluggable backend (TextBlob by default), with the thresholds shared by every front-end
+
+import os
+from functools import lru_cache
+import numpy as np
+from textblob import TextBlob
+from textblob.en import sentiment as _pattern_sentiment
+from .lexicon import LexiconSentiment
+from .perf import timed
+
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+
+class TextBlobSentiment:
+    """The default backend: TextBlob's PatternAnalyzer, one note at a time."""
+
+    name = 'textblob'
+
+    def polarity_of(self, text):
+        """Polarity in [-1, 1] of one note."""
+        return TextBlob(text).sentiment.polarity
+
+    def polarities(self, texts):
+        """Polarity in [-1, 1] of each of ``texts``."""
+        return np.array([self.polarity_of(text) if isinstance(text, str) else 0.0 for text in texts])
+
+
+# Every backend has a ``name``, ``polarity_of(text)`` and a batch ``polarities(texts)``
+BACKENDS = {backend.name: backend for backend in (TextBlobSentiment, LexiconSentiment)}
+DEFAULT_BACKEND = 'textblob'
+
+_backends = {}
+_current = None
+
+
+def get_backend(name=None):
+    """The backend called ``name``, by default the current one (``MOOD_SENTIMENT`` or TextBlob)."""
+    name = name or _current or os.environ.get('MOOD_SENTIMENT') or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"unknown sentiment backend {name!r} (choose from {', '.join(BACKENDS)})")
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
+
+
+def set_backend(name):
+    """Score new notes with the backend called ``name`` from now on; returns it."""
+    global _current
+    backend = get_backend(name)
+    _current = name
+    return backend
+
+
+def sentiment_label(score):
+    """Classify a polarity score as Positive, Negative or Neutral."""
+    if score > POSITIVE_THRESHOLD:
+        return "Positive"
+    elif score < NEGATIVE_THRESHOLD:
+        return "Negative"
+    return "Neutral"
+
+
+@timed('sentiment.analyze')
+def analyze_sentiment(text):
+    """Analyze sentiment of text with the current backend; returns ``(score, label)``."""
+    if not text or text.strip() == "":
+        return 0.0, "Neutral"
+
+    try:
+        sentiment_score = _polarity(get_backend().name, text)
+    except Exception as e:
+        print(f"⚠️ Sentiment analysis error: {e}")
+        return 0.0, "Neutral"
+
+    return round(sentiment_score, 3), sentiment_label(sentiment_score)
+
+
+@timed('sentiment.analyze_many')
+def analyze_sentiments(texts):
+    """``analyze_sentiment`` of many notes, scoring each distinct note once in one backend batch."""
+    texts = list(texts)
+    distinct = list(dict.fromkeys(text for text in texts if isinstance(text, str) and text.strip()))
+    try:
+        scores = dict(zip(distinct, get_backend().polarities(distinct).tolist()))
+    except Exception as e:
+        print(f"⚠️ Sentiment analysis error: {e}")
+        scores = {}
+
+    results = []
+    for text in texts:
+        score = scores.get(text, 0.0) if isinstance(text, str) else 0.0
+        results.append((round(score, 3), sentiment_label(score)))
+    return results
+
+
+@lru_cache(maxsize=4096)
+def _polarity(backend, text):
+    """Polarity from the named backend, memoized because notes repeat a lot (sample data, re-saves)."""
+    return get_backend(backend).polarity_of(text)
+
+
+@lru_cache(maxsize=4096)
+def tokenize(text):
+    """Lower-cased word tokens of ``text`` as TextBlob's polarity analyzer sees them.
+
+    Uses the same pattern tokenizer as the sentiment pipeline (no NLTK
+    corpora needed); punctuation-only tokens are dropped. Returns a tuple.
+    """
+    if not text:
+        return ()
+    words = " ".join(_pattern_sentiment.tokenizer(text)).lower().split()
+    return tuple(word for word in words if any(char.isalnum() for char in word))
@@ -0,0 +1,113 @@
+# Memory-Mapped Numeric Sidecar
+# Fixed 16-byte records of the analytics columns, mapped read-only so every process shares one page-cache copy
+
+import os
+import struct
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+from .model import ANALYTICS_COLUMNS, SENTIMENT_LABEL_DTYPE
+
+SIDECAR_NAME = 'numeric.bin'
+MAGIC = b'MOODNUM1'
+
+# magic, row count, then the four numbers identifying the history it was built from
+HEADER = struct.Struct('<8sQQQQQ')
+
+# Date as datetime64[us] (the unit pandas parses dates to), then the scores;
+# label is the sentiment category code (-1 = missing)
+RECORD_DTYPE = np.dtype([('date', '<i8'), ('sentiment', '<f4'), ('mood', 'i1'), ('label', 'i1'), ('pad', 'V2')])
+
+
+class NumericSidecar:
+    """
+    A read-only, memory-mapped copy of the ``ANALYTICS_COLUMNS``.
+
+    The file is a 48-byte header followed by one fixed-size record per day
+    in date order. ``read`` returns a DataFrame whose columns are views into
+    the mapping, so processes opening the same history share the operating
+    system's page cache instead of each holding a private copy.
+
+    The header records the ``source`` it was built from (see
+    ``MoodStore._sidecar_source``); a sidecar whose source no longer matches
+    is ignored and rewritten by the next reader. It is only a cache, so it
+    is replaced atomically but never fsynced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self, source, columns=ANALYTICS_COLUMNS):
+        """Return a DataFrame of ``columns`` mapped from the file, or None if missing or stale."""
+        try:
+            with open(self.path, 'rb') as file:
+                header = file.read(HEADER.size)
+            size = os.path.getsize(self.path)
+        except OSError:
+            return None
+        if len(header) < HEADER.size:
+            return None
+
+        magic, rows, *built_from = HEADER.unpack(header)
+        if magic != MAGIC or tuple(built_from) != tuple(source) or size != HEADER.size + rows * RECORD_DTYPE.itemsize:
+            return None
+
+        if rows == 0:
+            records = np.empty(0, RECORD_DTYPE)
+        else:
+            records = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(rows,))
+        return _frame(records, columns)
+
+    def write(self, frame, source):
+        """Replace the file with the records of ``frame`` (compact schema, date-sorted)."""
+        records = np.zeros(len(frame), RECORD_DTYPE)
+        records['date'] = frame['Date'].to_numpy().astype('datetime64[us]').view('i8')
+        records['mood'] = frame['Mood_Score'].to_numpy()
+        records['sentiment'] = frame['Sentiment_Score'].to_numpy()
+        records['label'] = frame['Sentiment_Label'].cat.codes.to_numpy()
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, len(records), *source))
+            file.write(records.tobytes())
+        os.replace(tmp_path, self.path)
+
+
+def _frame(records, columns):
+    """DataFrame over ``records`` without copying the column data."""
+    series = {
+        'Date': lambda: pd.Series(records['date'].view('datetime64[us]'), copy=False),
+        'Mood_Score': lambda: pd.Series(records['mood'], copy=False),
+        'Sentiment_Score': lambda: pd.Series(records['sentiment'], copy=False),
+        'Sentiment_Label': lambda: pd.Series(pd.Categorical.from_codes(records['label'], dtype=SENTIMENT_LABEL_DTYPE),
+                                             copy=False),
+    }
+    return pd.DataFrame({column: series[column]() for column in columns}, columns=columns, copy=False)
+
+
+class DateIndex(Mapping):
+    """
+    ``YYYY-MM-DD`` key -> row position over a sorted datetime64 column.
+
+    Lookups binary-search the column itself, so a mapped view needs no
+    per-row Python objects to answer ``get``, ``in`` or iteration.
+    """
+
+    def __init__(self, dates):
+        self._dates = dates.to_numpy()
+
+    def __getitem__(self, key):
+        try:
+            target = np.datetime64(key, 'D').astype(self._dates.dtype)
+        except ValueError:
+            raise KeyError(key) from None
+        position = int(self._dates.searchsorted(target))
+        if position < len(self._dates) and self._dates[position] == target:
+            return position
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(np.datetime_as_string(self._dates, unit='D').tolist())
+
+    def __len__(self):
+        return len(self._dates)
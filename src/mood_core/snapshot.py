@@ -0,0 +1,130 @@
+# Mood Summary Snapshot
+# A small JSON file of the dashboard totals, so a front-end can paint before the history is loaded
+
+import json
+import os
+from datetime import datetime, timedelta
+from .aggregates import _as_date
+from .model import DATE_FORMAT
+from .partitions import partition_directory
+
+SNAPSHOT_NAME = 'summary.json'
+SNAPSHOT_VERSION = 1
+
+# Logged days kept for recent_count(), counted back from the last entry
+RECENT_DAYS = 31
+
+
+class MoodSnapshot:
+    """
+    The totals of a ``MoodAggregates`` without its per-day history.
+
+    Holds the entry count, score sum, per-score counts, per-weekday sums
+    and counts, the last logged date, the streak ending on it and the
+    logged days of the month before it. That answers the same ``count``,
+    ``mean``, ``most_common``, ``streak`` and ``recent_count`` calls as the
+    full aggregates.
+
+    ``MoodDataset`` rewrites the file under the store's exclusive lock with
+    every write, and after a full load if it no longer matches the history.
+    """
+
+    def __init__(self):
+        self.entries = 0
+        self.total = 0
+        self.score_counts = {score: 0 for score in range(1, 6)}
+        self.weekday_totals = [0] * 7  # Monday first
+        self.weekday_counts = [0] * 7
+        self.last_date = None
+        self.last_streak = 0
+        self.recent = set()  # logged days within RECENT_DAYS of last_date
+
+    @classmethod
+    def from_aggregates(cls, aggregates):
+        snapshot = cls()
+        snapshot.entries = aggregates.count
+        snapshot.total = aggregates.total
+        snapshot.score_counts = dict(aggregates.score_counts)
+        snapshot.weekday_totals = list(aggregates.weekday_totals)
+        snapshot.weekday_counts = list(aggregates.weekday_counts)
+        snapshot.last_date = aggregates.last_date
+        if aggregates.last_date is not None:
+            snapshot.last_streak = aggregates.streak(aggregates.last_date)
+            snapshot.recent = {aggregates.last_date - timedelta(days=offset) for offset in range(RECENT_DAYS)
+                               if aggregates.last_date - timedelta(days=offset) in aggregates.scores}
+        return snapshot
+
+    @classmethod
+    def read(cls, data_file):
+        """The snapshot kept for ``data_file`` in its default partition folder, or None."""
+        return cls.load(os.path.join(partition_directory(data_file), SNAPSHOT_NAME))
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot file; None if it is missing, unreadable or from another version."""
+        try:
+            with open(path, encoding='utf-8') as file:
+                document = json.load(file)
+            if document.get('version') != SNAPSHOT_VERSION:
+                return None
+
+            snapshot = cls()
+            snapshot.entries = int(document['count'])
+            snapshot.total = int(document['total'])
+            snapshot.score_counts = {int(score): int(count) for score, count in document['score_counts'].items()}
+            snapshot.weekday_totals = [int(total) for total in document['weekday_totals']]
+            snapshot.weekday_counts = [int(count) for count in document['weekday_counts']]
+            snapshot.last_date = _as_date(document['last_date']) if document['last_date'] else None
+            snapshot.last_streak = int(document['streak'])
+            snapshot.recent = {_as_date(day) for day in document['recent']}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        return snapshot
+
+    def save(self, path):
+        """Atomically replace ``path`` with this snapshot."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=1)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def to_dict(self):
+        return {
+            'version': SNAPSHOT_VERSION,
+            'count': self.entries,
+            'total': self.total,
+            'score_counts': {str(score): count for score, count in sorted(self.score_counts.items())},
+            'weekday_totals': self.weekday_totals,
+            'weekday_counts': self.weekday_counts,
+            'last_date': self.last_date.strftime(DATE_FORMAT) if self.last_date else None,
+            'streak': self.last_streak,
+            'recent': sorted(day.strftime(DATE_FORMAT) for day in self.recent),
+        }
+
+    @property
+    def count(self):
+        """Number of logged days."""
+        return self.entries
+
+    def mean(self):
+        """Average mood score, or None without entries."""
+        return self.total / self.entries if self.entries else None
+
+    def most_common(self):
+        """Most frequently logged score, or None without entries."""
+        if not self.entries:
+            return None
+        return max(self.score_counts, key=lambda score: (self.score_counts[score], -score))
+
+    def streak(self, today=None):
+        """Consecutive logged days ending today."""
+        today = today or datetime.now().date()
+        return self.last_streak if today == self.last_date else 0
+
+    def recent_count(self, days=7, today=None):
+        """Number of entries in the last ``days`` days including today (up to ``RECENT_DAYS``)."""
+        today = today or datetime.now().date()
+        first = today - timedelta(days=days - 1)
+        return sum(1 for day in self.recent if first <= day <= today)
@@ -0,0 +1,167 @@
+# Streaming Mood Statistics
+# Welford moments plus exact score and sentiment histograms: O(1) updates, O(1) reads, exact merges
+
+import math
+import numpy as np
+
+# analyze_sentiment rounds polarity to 3 decimals in [-1, 1], so a histogram
+# with one bin per 0.001 holds every score exactly
+SENTIMENT_RESOLUTION = 1000
+SENTIMENT_BINS = 2 * SENTIMENT_RESOLUTION + 1
+
+
+class RunningMoments:
+    """Count, mean and sum of squared deviations (Welford), with removal and merging."""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return cls()
+        mean = float(values.mean())
+        return cls(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = value - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+
+    def merge(self, other):
+        """Combined moments of both sets of values (Chan et al.)."""
+        count = self.count + other.count
+        if not count:
+            return RunningMoments()
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        return RunningMoments(count, mean, m2)
+
+    def variance(self):
+        """Sample variance, or None with fewer than two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    def std(self):
+        variance = self.variance()
+        return None if variance is None else math.sqrt(variance)
+
+
+class MoodStats:
+    """
+    Running statistics of mood and sentiment scores.
+
+    ``add``/``remove`` update everything in O(1), so replacing a day's entry
+    is a remove plus an add; ``merge`` combines the stats of separate
+    partitions or users exactly. Mood mean and deviation come from Welford
+    moments, the mode and range from an exact 1-5 histogram, and sentiment
+    quantiles from an exact histogram over its 0.001 steps.
+    """
+
+    def __init__(self):
+        self.mood = RunningMoments()
+        self.sentiment = RunningMoments()
+        self.score_counts = np.zeros(6, np.int64)  # indexed by score, 0 unused
+        self.sentiment_counts = np.zeros(SENTIMENT_BINS, np.int64)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Stats of a mood DataFrame in one vectorized pass."""
+        stats = cls()
+        scores = df['Mood_Score'].to_numpy(dtype=np.int64)
+        stats.mood = RunningMoments.from_values(scores)
+        stats.score_counts = np.bincount(scores, minlength=6)[:6].astype(np.int64)
+
+        sentiments = df['Sentiment_Score'].to_numpy(dtype=np.float64)
+        sentiments = sentiments[~np.isnan(sentiments)]
+        stats.sentiment = RunningMoments.from_values(sentiments)
+        stats.sentiment_counts = np.bincount(_sentiment_bin(sentiments), minlength=SENTIMENT_BINS)
+        return stats
+
+    def add(self, score, sentiment=None):
+        self.mood.add(score)
+        self.score_counts[score] += 1
+        if sentiment is not None and not math.isnan(sentiment):
+            self.sentiment.add(sentiment)
+            self.sentiment_counts[_sentiment_bin(sentiment)] += 1
+
+    def remove(self, score, sentiment=None):
+        self.mood.remove(score)
+        self.score_counts[score] -= 1
+        if sentiment is not None and not math.isnan(sentiment):
+            self.sentiment.remove(sentiment)
+            self.sentiment_counts[_sentiment_bin(sentiment)] -= 1
+
+    def merge(self, other):
+        merged = MoodStats()
+        merged.mood = self.mood.merge(other.mood)
+        merged.sentiment = self.sentiment.merge(other.sentiment)
+        merged.score_counts = self.score_counts + other.score_counts
+        merged.sentiment_counts = self.sentiment_counts + other.sentiment_counts
+        return merged
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @property
+    def count(self):
+        return self.mood.count
+
+    def mean(self):
+        return self.mood.mean if self.mood.count else None
+
+    def std(self):
+        return self.mood.std()
+
+    def mode(self):
+        """Most frequent score (the lowest on ties), or None without entries."""
+        return int(self.score_counts[1:].argmax()) + 1 if self.count else None
+
+    def score_range(self):
+        """``(lowest, highest)`` logged score, or None without entries."""
+        logged = np.flatnonzero(self.score_counts[1:])
+        return (int(logged[0]) + 1, int(logged[-1]) + 1) if len(logged) else None
+
+    def sentiment_mean(self):
+        return self.sentiment.mean if self.sentiment.count else None
+
+    def sentiment_std(self):
+        return self.sentiment.std()
+
+    def sentiment_quantile(self, q):
+        """The ``q`` quantile (lower) of the sentiment scores, or None without any."""
+        total = self.sentiment.count
+        if not total:
+            return None
+        position = int(np.searchsorted(np.cumsum(self.sentiment_counts), math.floor(q * (total - 1)), 'right'))
+        return (min(position, SENTIMENT_BINS - 1) - SENTIMENT_RESOLUTION) / SENTIMENT_RESOLUTION
+
+    def sentiment_range(self):
+        """``(lowest, highest)`` sentiment score, or None without any."""
+        logged = np.flatnonzero(self.sentiment_counts)
+        if not len(logged):
+            return None
+        return ((logged[0] - SENTIMENT_RESOLUTION) / SENTIMENT_RESOLUTION,
+                (logged[-1] - SENTIMENT_RESOLUTION) / SENTIMENT_RESOLUTION)
+
+
+def _sentiment_bin(value):
+    """Histogram bin of a sentiment score (or an array of them), clipped to [-1, 1]."""
+    return np.clip(np.rint(np.asarray(value) * SENTIMENT_RESOLUTION), -SENTIMENT_RESOLUTION,
+                   SENTIMENT_RESOLUTION).astype(np.int64) + SENTIMENT_RESOLUTION
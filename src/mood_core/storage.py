@@ -0,0 +1,717 @@
+# Mood Data Storage Engine
+# Append-only write-ahead log with periodic compaction into monthly CSV partitions
+
+import json
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime
+import pandas as pd
+from .model import (ANALYTICS_COLUMNS, COLUMNS, FRAME_COLUMNS, READ_DTYPES, TEXT_COLUMNS, DATE_FORMAT,
+                    DEFAULT_DATA_FILE, typed_frame)
+from .partitions import MoodPartitions, legacy_partition_directory, partition_directory
+from .perf import timed
+from .sidecar import SIDECAR_NAME, DateIndex, NumericSidecar
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class MoodStore:
+    """
+    Crash-safe storage for mood entries.
+
+    Every insert or update is appended to a write-ahead log next to
+    ``data_file`` and fsynced before returning. Once the log grows past
+    ``compact_threshold`` records a background compaction merges it into
+    the monthly partitions (see ``MoodPartitions``) in ``partition_dir``,
+    by default a ``<stem>.mood`` folder beside ``data_file``. Only the months the
+    log touched are rewritten, and ``read_range`` and ``text`` open only the
+    months they need. A legacy single-file ``data_file`` is split into
+    partitions the first time it is opened and kept as ``<data_file>.migrated``.
+
+    Entries are keyed on ``Date``: there is at most one entry per day and a
+    later write for the same day replaces the earlier one. A date -> row
+    index over the loaded view answers lookups without scanning.
+
+    Several processes (CLI, GUIs) may share one data file. Writes and
+    compaction hold an exclusive advisory lock on ``<data_file>.lock``, reads
+    a shared one, and each reader tracks the partition manifest signature and
+    how far into the log it has read so a reload only parses the new tail.
+
+    The view holds ``columns`` (by default the narrow ``ANALYTICS_COLUMNS``);
+    ``text()`` fetches Note and Timestamp for just the rows a view shows.
+    Pass ``columns=FRAME_COLUMNS`` to load everything eagerly.
+    ``csv_engine`` picks the pandas CSV parser for the partitions; set it, or
+    ``MOOD_CSV_ENGINE``, to ``'pyarrow'`` to use the multithreaded reader.
+
+    With ``use_mmap`` (or ``MOOD_MMAP=1``) a view of analytics columns only
+    is served from a memory-mapped ``NumericSidecar`` in the partition
+    folder. The first reader after a change regenerates it; every other
+    process then maps the same file and shares its pages.
+    """
+
+    def __init__(self, data_file=DEFAULT_DATA_FILE, compact_threshold=200, columns=ANALYTICS_COLUMNS,
+                 csv_engine=None, partition_dir=None, use_mmap=None):
+        self.data_file = data_file
+        self.wal_file = data_file + '.wal'
+        self.lock_file = data_file + '.lock'
+        self.partitions = MoodPartitions(partition_dir or partition_directory(data_file))
+        self.compact_threshold = compact_threshold
+        self.columns = [c for c in FRAME_COLUMNS if c == 'Date' or c in (columns or ANALYTICS_COLUMNS)]
+        self.csv_engine = csv_engine or os.environ.get('MOOD_CSV_ENGINE') or 'c'
+
+        self.sidecar = None
+        if os.environ.get('MOOD_MMAP') if use_mmap is None else use_mmap:
+            if set(self.columns) <= set(ANALYTICS_COLUMNS):
+                self.sidecar = NumericSidecar(os.path.join(self.partitions.directory, SIDECAR_NAME))
+
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_exclusive = False
+        self._compaction_thread = None
+        self._wal_records = 0
+
+        # Materialized, de-duplicated view and its date -> row position index
+        self._view = None
+        self._index = None
+
+        # Note/Timestamp of the rows logged since the last compaction; the
+        # rest are read from their month's partition on first use
+        self._wal_text = {}
+        self._text_cache = {}
+
+        # What the view was built from: manifest (inode, size, mtime) and
+        # the byte offset up to which the log has been applied
+        self._base_sig = None
+        self._wal_offset = 0
+
+        # Dates changed since the last refresh() call, None after a full reload
+        self._changes = None
+
+        self.initialize()
+        self.recover()
+
+    # ------------------------------------------------------------------
+    # Setup and recovery
+    # ------------------------------------------------------------------
+
+    def initialize(self):
+        """Create the partition layout, moving a legacy single-file history into it."""
+        data_dir = os.path.dirname(self.data_file)
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+        if self.partitions.exists():
+            return
+
+        with self._file_lock(exclusive=True):
+            if self.partitions.exists():
+                return
+            if self._adopt_legacy_partitions():
+                return
+            if os.path.exists(self.data_file) and os.path.getsize(self.data_file) > 0:
+                self._migrate_legacy()
+            else:
+                self.partitions.create()
+
+    def _adopt_legacy_partitions(self):
+        """Rename the shared ``mood`` folder of older versions to the default data file's own folder."""
+        legacy_dir = legacy_partition_directory(self.data_file)
+        if (os.path.basename(self.data_file) != os.path.basename(DEFAULT_DATA_FILE)
+                or self.partitions.directory != partition_directory(self.data_file)
+                or not MoodPartitions(legacy_dir).exists() or os.path.exists(self.partitions.directory)):
+            return False
+
+        os.replace(legacy_dir, self.partitions.directory)
+        print(f"📦 Moved the partitions in {legacy_dir} to {self.partitions.directory}")
+        return True
+
+    def _migrate_legacy(self):
+        """Split the old one-file base into monthly partitions."""
+        # Parse first: hand-edited dates like 2024-3-5 only dedupe and sort correctly as dates
+        view = typed_frame(read_mood_csv(self.data_file, FRAME_COLUMNS, self.csv_engine))
+        if view['Date'].duplicated().any():
+            view = view.drop_duplicates('Date', keep='last')
+        view = view.sort_values('Date', kind='stable').reset_index(drop=True)
+
+        months = set(view['Date'].dt.strftime('%Y-%m'))
+        self.partitions.commit(self.partitions.stage(view, months))
+        os.replace(self.data_file, self.data_file + '.migrated')
+        print(f"📦 Moved {len(view)} entries from {self.data_file} into "
+              f"{len(months)} monthly partitions under {self.partitions.directory}")
+
+    def recover(self):
+        """Replay the log tail after a crash, dropping torn or stale records."""
+        with self._file_lock(exclusive=True):
+            records, valid_end = self._scan_wal()
+
+            if valid_end < self._wal_size():
+                print(f"⚠️ Discarding truncated write-ahead log tail in {self.wal_file}")
+                self._truncate_wal(valid_end)
+
+            # A trailing checkpoint means a compaction was interrupted. If the
+            # manifest matches it the log is already merged, otherwise it is
+            # replayed as usual (partitions it already replaced hold the same rows).
+            if records and records[-1][1]['op'] == 'checkpoint':
+                offset, checkpoint = records.pop()
+                self._truncate_wal(0 if self._base_matches(checkpoint) else offset)
+
+            # The view itself is built on first use, so range reads never load it
+            self._view = None
+            self._wal_records = len(self._scan_wal()[0])
+
+        if self._wal_records >= self.compact_threshold:
+            self.compact()
+
+    def clear(self):
+        """Remove all stored entries and start with empty partitions."""
+        with self._file_lock(exclusive=True):
+            if os.path.exists(self.wal_file):
+                os.remove(self.wal_file)
+            self.partitions.clear()
+            self._reload_locked()
+
+    def write_lock(self):
+        """Hold the exclusive lock across several calls, e.g. a write and the files derived from it."""
+        return self._file_lock(exclusive=True)
+
+    def read_lock(self):
+        """Hold the shared lock, e.g. to read files derived from the store consistently."""
+        return self._file_lock(exclusive=False)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @timed('storage.load')
+    def load(self):
+        """Return the de-duplicated entries (base file plus log tail) as a DataFrame.
+
+        Only log records written since the previous call are parsed; the
+        partitions are re-read only after another process compacted them.
+        """
+        with self._file_lock(exclusive=False):
+            self._refresh_locked()
+            return self._view
+
+    @timed('storage.refresh')
+    def refresh(self):
+        """Pick up writes from this and other processes.
+
+        Returns the date keys added or replaced since the previous call, or
+        None when the view had to be rebuilt from scratch in the meantime.
+        """
+        with self._file_lock(exclusive=False):
+            self._refresh_locked()
+            changes, self._changes = self._changes, []
+            return changes
+
+    def has_entry(self, date):
+        """Check whether an entry exists for ``date`` without scanning."""
+        with self._file_lock(exclusive=False):
+            self._refresh_locked()
+            return _date_key(date) in self._index
+
+    def get(self, date):
+        """Return the entry for ``date`` as a Series, or None."""
+        with self._file_lock(exclusive=False):
+            self._refresh_locked()
+            position = self._index.get(_date_key(date))
+            if position is None:
+                return None
+            return self._view.iloc[position]
+
+    @timed('storage.text')
+    def text(self, dates=None):
+        """Return ``{date key: (note, timestamp text)}`` for ``dates`` (default every entry).
+
+        Rows logged since the last compaction are answered from memory; the
+        rest are read on first use from the partitions of their months only.
+        """
+        with self._file_lock(exclusive=False):
+            self._refresh_locked()
+            keys = list(self._index) if dates is None else [_date_key(date) for date in dates]
+
+            months = {key[:7] for key in keys
+                      if key not in self._wal_text and key not in self._text_cache and key in self._index}
+            if months:
+                self._read_base_text(months)
+
+            found = {}
+            for key in keys:
+                value = self._wal_text.get(key) or self._text_cache.get(key)
+                if value is not None:
+                    found[key] = value
+            return found
+
+    def _read_base_text(self, months):
+        """Cache Note/Timestamp of every partition row in ``months``."""
+        buffer = self.partitions.csv_buffer(months)
+        if buffer is None:
+            return
+        chunk = pd.read_csv(buffer, usecols=['Date', 'Note', 'Timestamp'], dtype=str)
+        self._text_cache.update(zip(chunk['Date'], zip(chunk['Note'], chunk['Timestamp'])))
+
+    @timed('storage.read_range')
+    def read_range(self, start=None, end=None):
+        """Return the entries dated ``start``..``end`` (inclusive, open when None).
+
+        Reads only the partitions the manifest says overlap the range, plus
+        the log, so it never loads the whole history.
+        """
+        start_key = None if start is None else _date_key(start)
+        end_key = None if end is None else _date_key(end)
+
+        with self._file_lock(exclusive=False):
+            base_df = self._read_base(self.partitions.months(start_key, end_key))
+            latest = _latest_rows(self._live_records(self._scan_wal()[0]))
+
+        latest = {key: row for key, row in latest.items()
+                  if (start_key is None or key >= start_key) and (end_key is None or key <= end_key)}
+        df = _merge_rows(base_df, latest)
+        if start_key is not None:
+            df = df[df['Date'] >= start_key]
+        if end_key is not None:
+            df = df[df['Date'] <= end_key]
+        return typed_frame(df, self.columns)
+
+    def _refresh_locked(self):
+        """Bring the view in line with the files; the caller holds the lock."""
+        wal_size = self._wal_size()
+
+        if (self._view is None or self._stat_signature(self.partitions.manifest_file) != self._base_sig
+                or wal_size < self._wal_offset):
+            self._reload_locked()
+            return None
+
+        if wal_size == self._wal_offset:
+            return []
+
+        scanned, valid_end = self._scan_wal(self._wal_offset)
+        if any(record['op'] == 'checkpoint' for _, record in scanned):
+            self._reload_locked()
+            return None
+
+        self._wal_offset = valid_end
+        self._wal_records += len(scanned)
+        return self._apply_tail([record for _, record in scanned])
+
+    @timed('storage.full_reload')
+    def _reload_locked(self):
+        """Rebuild the view from the partitions and the whole log."""
+        scanned, valid_end = self._scan_wal()
+        records = self._live_records(scanned)
+
+        mapped = self.sidecar.read(self._sidecar_source(valid_end), self.columns) if self.sidecar else None
+        if mapped is not None:
+            self._view = mapped
+            self._wal_text = {key: _text_of(row) for key, row in _latest_rows(records).items()}
+        else:
+            df = self._apply(self._read_base(), records)
+            self._view = self._share(typed_frame(df, self.columns), valid_end)
+
+        if self.sidecar is not None:
+            # Searched in place: a per-row dict would cost more than the mapped columns save
+            self._index = DateIndex(self._view['Date'])
+        else:
+            self._index = dict(zip(df['Date'], range(len(df))))
+        self._base_sig = self._stat_signature(self.partitions.manifest_file)
+        self._wal_offset = valid_end
+        self._wal_records = len(scanned)
+        self._changes = None
+        self._text_cache = {}
+
+    def _share(self, view, wal_end):
+        """With a sidecar, write ``view`` to it and return the mapped copy in its place."""
+        if self.sidecar is None:
+            return view
+
+        source = self._sidecar_source(wal_end)
+        try:
+            self.sidecar.write(view, source)
+        except OSError as e:
+            print(f"⚠️ Could not write the memory-mapped sidecar: {e}")
+            return view
+
+        mapped = self.sidecar.read(source, self.columns)
+        return view if mapped is None else mapped
+
+    def _sidecar_source(self, wal_end):
+        """Identify the history state: manifest size/checksum and the log up to ``wal_end``."""
+        manifest_size, manifest_crc = self._file_signature(self.partitions.manifest_file)
+        _, wal_crc = self._file_signature(self.wal_file, wal_end) if wal_end else (0, 0)
+        return manifest_size, manifest_crc, wal_end, wal_crc
+
+    @timed('storage.read_base')
+    def _read_base(self, months=None):
+        """Read the partitions of ``months`` (default all) with the date column kept as text."""
+        buffer = self.partitions.csv_buffer(months)
+        if buffer is None:
+            return pd.DataFrame(columns=self.columns)
+        return read_mood_csv(buffer, self.columns, self.csv_engine)
+
+    def _live_records(self, scanned):
+        """Drop records an interrupted compaction already merged into the partitions."""
+        checkpoints = [i for i, (_, record) in enumerate(scanned) if record['op'] == 'checkpoint']
+        if checkpoints and self._base_matches(scanned[checkpoints[-1]][1]):
+            scanned = scanned[checkpoints[-1] + 1:]
+        return [record for _, record in scanned if record['op'] != 'checkpoint']
+
+    def _apply(self, base_df, records):
+        """Apply logged writes on top of the partition rows, keeping one entry per date.
+
+        Also keeps the text columns of the logged rows for ``text()``.
+        """
+        latest = _latest_rows(records)
+        self._wal_text = {key: _text_of(row) for key, row in latest.items()}
+        return _merge_rows(base_df, latest)
+
+    def _apply_tail(self, records):
+        """Apply newly read log records to the view in place; return changed dates."""
+        latest = _latest_rows(records)
+        self._wal_text.update((key, _text_of(row)) for key, row in latest.items())
+
+        tail_df = typed_frame(pd.DataFrame(list(latest.values()), columns=COLUMNS), self.columns)
+        positions = [self._index.get(key) for key in latest]
+        existing = [i for i, position in enumerate(positions) if position is not None]
+        new_rows = [row for row, position in zip(latest.values(), positions) if position is None]
+
+        if existing:
+            if self.sidecar is not None:
+                self._view = self._view.copy()  # the mapping is read-only
+            updated = tail_df.iloc[existing]
+            rows_to_replace = [positions[i] for i in existing]
+            for column in self.columns[1:]:
+                self._view.loc[rows_to_replace, column] = updated[column].array
+
+        if new_rows:
+            tail_df = tail_df.drop(tail_df.index[existing]).reset_index(drop=True)
+
+            start = len(self._view)
+            if start == 0:
+                self._view = tail_df
+            else:
+                self._view = pd.concat([self._view, tail_df], ignore_index=True)
+
+            if not self._view['Date'].is_monotonic_increasing:
+                # Back-dated entry: restore date order and re-index
+                self._view = self._view.sort_values('Date', kind='stable').reset_index(drop=True)
+                if self.sidecar is None:
+                    keys = self._view['Date'].dt.strftime('%Y-%m-%d')
+                    self._index = dict(zip(keys, range(len(keys))))
+            elif self.sidecar is None:
+                for offset, row in enumerate(new_rows):
+                    self._index[row[0]] = start + offset
+
+        if self.sidecar is not None:
+            self._view = self._share(self._view, self._wal_offset)
+            self._index = DateIndex(self._view['Date'])
+
+        if self._changes is not None:
+            self._changes.extend(latest.keys())
+        return list(latest.keys())
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, row):
+        """Durably insert or replace the entry for ``row``'s date.
+
+        ``row`` holds values in ``COLUMNS`` order. The write is a single
+        appended log record whether or not the day already has an entry.
+        """
+        self.upsert_many([row])
+
+    @timed('storage.upsert')
+    def upsert_many(self, rows):
+        """Durably insert or replace several entries with a single fsync."""
+        with self._file_lock(exclusive=True):
+            self._refresh_locked()
+
+            # Drop any torn record a crashed writer left behind, otherwise
+            # every record appended after it would be unreadable.
+            if self._wal_offset < self._wal_size():
+                self._truncate_wal(self._wal_offset)
+
+            records = []
+            for row in rows:
+                row = list(row)
+                row[0] = _date_key(row[0])
+                op = 'update' if row[0] in self._index else 'insert'
+                records.append({'op': op, 'row': row})
+
+            self._write_records(records)
+            self._refresh_locked()
+        self.maybe_compact()
+
+    @timed('storage.wal_write')
+    def _write_records(self, records):
+        """Append checksummed records to the log and fsync them."""
+        lines = []
+        for record in records:
+            payload = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str)
+            crc = zlib.crc32(payload.encode('utf-8'))
+            lines.append(f"{crc:08x} {payload}\n")
+
+        with open(self.wal_file, 'a', encoding='utf-8') as wal:
+            wal.write(''.join(lines))
+            wal.flush()
+            os.fsync(wal.fileno())
+
+    def _scan_wal(self, start=0):
+        """Return ``([(offset, record), ...], valid_end)`` for the intact log from ``start``."""
+        records = []
+        valid_end = start
+
+        if not os.path.exists(self.wal_file):
+            return records, 0
+
+        with open(self.wal_file, 'rb') as wal:
+            wal.seek(start)
+            data = wal.read()
+
+        offset = 0
+        while offset < len(data):
+            newline = data.find(b'\n', offset)
+            if newline == -1:
+                break  # torn final write
+
+            line = data[offset:newline]
+            try:
+                crc_hex, payload = line.split(b' ', 1)
+                if int(crc_hex, 16) != zlib.crc32(payload):
+                    break
+                record = json.loads(payload.decode('utf-8'))
+            except ValueError:
+                break
+
+            records.append((start + offset, record))
+            offset = newline + 1
+            valid_end = start + offset
+
+        return records, valid_end
+
+    def _wal_size(self):
+        """Return the current log size in bytes."""
+        try:
+            return os.path.getsize(self.wal_file)
+        except OSError:
+            return 0
+
+    def _truncate_wal(self, size):
+        """Cut the log back to ``size`` bytes."""
+        if not os.path.exists(self.wal_file):
+            return
+        with open(self.wal_file, 'r+b') as wal:
+            wal.truncate(size)
+            wal.flush()
+            os.fsync(wal.fileno())
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def maybe_compact(self):
+        """Start a background compaction once the log is long enough."""
+        if self._wal_records < self.compact_threshold:
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+
+        self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compaction_thread.start()
+
+    @timed('storage.compact')
+    def compact(self):
+        """Rewrite the partitions of the months in the log and reset the log."""
+        if self.columns != FRAME_COLUMNS:
+            # A pruned view can't rewrite the columns it never loaded
+            self._full_store().compact()
+            return
+
+        with self._file_lock(exclusive=True):
+            self._refresh_locked()
+            if self._wal_size() == 0:
+                return
+
+            replacements = self.partitions.stage(self._view, {key[:7] for key in self._wal_text})
+
+            # The checkpoint lets recovery tell whether the manifest swap
+            # below happened before a crash, so the log is never applied twice.
+            size, crc = self._file_signature(self.partitions.manifest_file + '.tmp')
+            self._write_records([{'op': 'checkpoint', 'size': size, 'crc': crc}])
+
+            self.partitions.commit(replacements)
+            self._truncate_wal(0)
+
+            # The in-memory view already matches the new partitions
+            self._base_sig = self._stat_signature(self.partitions.manifest_file)
+            self._wal_text = {}
+            self._text_cache = {}
+            self._wal_offset = 0
+            self._wal_records = 0
+
+    def archive(self, before_year):
+        """Compact the log, then fold the months of years before ``before_year`` into yearly archives.
+
+        Returns the number of monthly partitions archived.
+        """
+        self.compact()
+        with self._file_lock(exclusive=True):
+            up_to_date = self._base_sig == self._stat_signature(self.partitions.manifest_file)
+            archived = self.partitions.archive(before_year)
+            if archived and up_to_date:
+                # Same rows in new files: this view needs no rebuild
+                self._base_sig = self._stat_signature(self.partitions.manifest_file)
+            return archived
+
+    def _full_store(self):
+        """A store over the same files that loads every column."""
+        return MoodStore(self.data_file, self.compact_threshold, columns=FRAME_COLUMNS,
+                         csv_engine=self.csv_engine, partition_dir=self.partitions.directory)
+
+    def _base_matches(self, checkpoint):
+        """Check whether the partition manifest is the one a checkpoint describes."""
+        if not self.partitions.exists():
+            return False
+        return self._file_signature(self.partitions.manifest_file) == (checkpoint['size'], checkpoint['crc'])
+
+    def _file_signature(self, path, limit=None):
+        """Return ``(size, crc32)`` of a file's contents, or of its first ``limit`` bytes."""
+        crc = 0
+        size = 0
+        with open(path, 'rb') as file:
+            while limit is None or size < limit:
+                chunk = file.read(1 << 20 if limit is None else min(1 << 20, limit - size))
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+        return size, crc
+
+    def _stat_signature(self, path):
+        """Return a cheap ``(inode, size, mtime)`` change marker for a file."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    # ------------------------------------------------------------------
+    # Locking
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        """Hold the cross-process advisory lock (re-entrant within this store)."""
+        with self._lock:
+            if self._lock_depth:
+                if exclusive and not self._lock_exclusive:
+                    raise RuntimeError("Cannot upgrade a shared mood store lock")
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            with open(self.lock_file, 'a+b') as handle:
+                _lock_file(handle, exclusive)
+                self._lock_depth = 1
+                self._lock_exclusive = exclusive
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    _unlock_file(handle)
+
+
+def read_mood_csv(path, columns=FRAME_COLUMNS, csv_engine='c'):
+    """Read a mood CSV with the explicit schema, loading only ``columns``.
+
+    Dates come back as text (they are the index keys); ``typed_frame``
+    finishes the conversion.
+    """
+    usecols = [column for column in COLUMNS if column in columns]
+    try:
+        return pd.read_csv(path, usecols=usecols, engine=csv_engine,
+                           dtype={column: READ_DTYPES[column] for column in usecols})
+    except (ValueError, TypeError, ImportError):
+        # Hand-edited or legacy values that don't fit the schema, or an
+        # unavailable engine: read as text and let typed_frame coerce
+        return pd.read_csv(path, usecols=usecols,
+                           dtype={column: TEXT_COLUMNS.get(column, object) for column in usecols})
+
+
+def _latest_rows(records):
+    """The last logged row for each date, in ``COLUMNS`` order."""
+    latest = {}
+    for record in records:
+        latest[record['row'][0]] = record['row']
+    return latest
+
+
+def _merge_rows(base_df, latest):
+    """Replace or add the ``latest`` logged rows in ``base_df``; one date-sorted row per date."""
+    # Legacy files may hold several rows for a day; the last one wins.
+    if base_df['Date'].duplicated().any():
+        base_df = base_df.drop_duplicates('Date', keep='last')
+
+    if latest:
+        base_df = base_df[~base_df['Date'].isin(latest.keys())]
+        tail_df = pd.DataFrame(list(latest.values()), columns=COLUMNS)[list(base_df.columns)]
+        base_df = tail_df if len(base_df) == 0 else pd.concat([base_df, tail_df], ignore_index=True)
+
+    return base_df.sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def _text_of(row):
+    """The (Note, Timestamp) of a logged row in ``COLUMNS`` order."""
+    return row[COLUMNS.index('Note')], row[COLUMNS.index('Timestamp')]
+
+
+def _date_key(value):
+    """Normalize a date, datetime or date string to the ``YYYY-MM-DD`` storage key.
+
+    Strings are parsed, so ``2024-3-5`` and ``2024-03-05`` name the same
+    day; one that is not a date raises ValueError.
+    """
+    if hasattr(value, 'strftime'):
+        return value.strftime(DATE_FORMAT)
+    text = str(value).strip()
+    try:
+        return date.fromisoformat(text).strftime(DATE_FORMAT)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(text, DATE_FORMAT).strftime(DATE_FORMAT)
+    except ValueError:
+        pass
+    try:
+        return pd.Timestamp(text).strftime(DATE_FORMAT)
+    except ValueError:  # unparseable, or NaT for an empty string
+        raise ValueError(f"Not a date: {value!r}") from None
+
+
+def _lock_file(handle, exclusive):
+    """Block until an advisory lock on ``handle`` is acquired."""
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    else:
+        # msvcrt only offers exclusive byte-range locks
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(handle):
+    """Release a lock taken with ``_lock_file``."""
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,279 @@
+# Time-of-Day Analytics
+# Entry timestamps parsed once into int64 epoch seconds, then binned by weekday, hour and day part per entry
+
+import os
+import numpy as np
+import pandas as pd
+from .analytics import WEEKDAY_NAMES, weekday_codes
+from .model import TIMESTAMP_FORMAT
+from .perf import timed
+
+TIMES_NAME = 'timestamps.npy'
+
+# The log is folded into the base once it grows past this
+MERGE_BYTES = 1 << 20
+
+# Epoch value of an entry without a readable Timestamp (the int64 form of NaT)
+MISSING = np.iinfo(np.int64).min
+
+# Day number and Timestamp (seconds since 1970-01-01, wall-clock time) of each entry
+RECORD_DTYPE = np.dtype([('day', '<i8'), ('epoch', '<i8')])
+
+DAY_PARTS = {
+    'night': "Night (10pm-5am)",
+    'morning': "Morning (5am-12pm)",
+    'afternoon': "Afternoon (12-5pm)",
+    'evening': "Evening (5-10pm)",
+}
+
+# Day part code of each hour, in DAY_PARTS order
+HOUR_PARTS = np.array([0] * 5 + [1] * 7 + [2] * 5 + [3] * 5 + [0] * 2)
+
+
+def epoch_seconds(timestamps):
+    """int64 epoch seconds of Timestamp text (``TIMESTAMP_FORMAT``) or datetime64 values; ``MISSING`` for blanks."""
+    values = pd.Series(timestamps)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values.astype(object), format=TIMESTAMP_FORMAT, errors='coerce')
+    return values.to_numpy(dtype='datetime64[s]').view('i8')
+
+
+def day_numbers(keys):
+    """Days since 1970-01-01 of date keys (or datetime64 dates)."""
+    return np.asarray(keys, dtype='datetime64[D]').view('i8')
+
+
+def bin_codes(epochs):
+    """Weekday x hour code (``weekday * 24 + hour``, Monday first) of epoch seconds."""
+    epochs = np.asarray(epochs, dtype=np.int64)
+    return weekday_codes((epochs // 86400).astype('datetime64[D]')) * 24 + epochs % 86400 // 3600
+
+
+class EntryTimes:
+    """
+    The Timestamp of every day's entry as int64 epoch seconds, kept beside the partitions.
+
+    Building it reads and parses every Timestamp once; the base is an
+    ``np.save`` array of ``RECORD_DTYPE`` records. Entries written after
+    that are appended to ``<path>.log`` as raw 16-byte records (a later
+    record for a day replaces the earlier one) and ``merge`` folds the log
+    back into the base, so no query parses a timestamp again.
+
+    Writes (``build``, ``add``, ``merge``, ``clear``) run under the store's
+    exclusive lock and ``refresh`` under its shared lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.log_file = path + '.log'
+        self._sig = None
+        self._log_offset = 0
+        self.epochs = {}  # day number -> epoch seconds
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def refresh(self):
+        """Re-read the base after another process rewrote it and replay new log records."""
+        signature = (_stat_signature(self.path), _stat_signature(self.log_file, inode_only=True))
+        if signature != self._sig:
+            self._sig = signature
+            self._log_offset = 0
+            self.epochs = {}
+            self._load_base()
+        self._replay_log()
+
+    def _load_base(self):
+        try:
+            records = np.load(self.path)
+        except (OSError, ValueError):
+            return
+        if records.dtype == RECORD_DTYPE:
+            self.epochs = dict(zip(records['day'].tolist(), records['epoch'].tolist()))
+
+    def _replay_log(self):
+        try:
+            with open(self.log_file, 'rb') as file:
+                file.seek(self._log_offset)
+                data = file.read()
+        except FileNotFoundError:
+            return
+
+        usable = len(data) - len(data) % RECORD_DTYPE.itemsize  # a record may still be being written
+        records = np.frombuffer(data[:usable], RECORD_DTYPE)
+        self.epochs.update(zip(records['day'].tolist(), records['epoch'].tolist()))
+        self._log_offset += usable
+
+    def arrays(self):
+        """``(days, epochs)`` as int64 arrays sorted by day."""
+        days = np.fromiter(self.epochs, np.int64, len(self.epochs))
+        epochs = np.fromiter(self.epochs.values(), np.int64, len(self.epochs))
+        order = np.argsort(days, kind='stable')
+        return days[order], epochs[order]
+
+    @timed('times.build')
+    def build(self, keys, timestamps):
+        """Replace the stored times with the parsed ``timestamps`` of the date ``keys`` and empty the log."""
+        self.epochs = dict(zip(day_numbers(keys).tolist(), epoch_seconds(timestamps).tolist()))
+        self._write()
+
+    def add(self, keys, timestamps):
+        """Log the Timestamps of newly written entries; skipped until a base exists."""
+        if not self.exists() or not len(keys):
+            return
+        records = np.empty(len(keys), RECORD_DTYPE)
+        records['day'] = day_numbers(keys)
+        records['epoch'] = epoch_seconds(timestamps)
+        with open(self.log_file, 'ab') as file:
+            file.write(records.tobytes())
+        if os.path.getsize(self.log_file) > MERGE_BYTES:
+            self.merge()
+
+    @timed('times.merge')
+    def merge(self):
+        """Fold the log into a new base."""
+        self.refresh()
+        self._write()
+
+    def clear(self):
+        """Delete the stored times; the next time-of-day query rebuilds them."""
+        for path in (self.path, self.log_file):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._sig = None
+
+    def _write(self):
+        days, epochs = self.arrays()
+        records = np.empty(len(days), RECORD_DTYPE)
+        records['day'], records['epoch'] = days, epochs
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            np.save(file, records)
+        os.replace(tmp_path, self.path)
+        try:
+            os.remove(self.log_file)
+        except FileNotFoundError:
+            pass
+        self._sig = None
+
+
+class HourBins:
+    """
+    Entry counts per weekday x hour logged x mood score, plus note sentiment per weekday x hour.
+
+    ``from_arrays`` bins the whole history with ``np.bincount``; ``set``
+    then moves a single day's entry between bins in O(1) when it is logged
+    or replaced. Every read (by hour, by day part, weekday x hour) sums the
+    bins, so no query touches the entries themselves. Entries without a
+    Timestamp are left out.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros((7, 24, 5), np.int64)  # score index 0 is score 1
+        self.sentiment_totals = np.zeros((7, 24))
+        self.sentiment_counts = np.zeros((7, 24), np.int64)
+        self._entries = {}  # day number -> (bin code, score, sentiment) of its binned entry
+
+    @classmethod
+    @timed('times.bin')
+    def from_arrays(cls, days, epochs, scores, sentiments):
+        """Bin aligned arrays of day numbers, epoch seconds, mood scores and sentiment scores."""
+        bins = cls()
+        epochs = np.asarray(epochs, dtype=np.int64)
+        valid = epochs != MISSING
+        codes = bin_codes(epochs[valid])
+        scores = np.asarray(scores, dtype=np.int64)[valid]
+        sentiments = np.asarray(sentiments, dtype=np.float64)[valid]
+
+        bins.counts = np.bincount(codes * 5 + scores - 1, minlength=7 * 24 * 5).reshape(7, 24, 5)
+        has_sentiment = ~np.isnan(sentiments)
+        bins.sentiment_totals = np.bincount(codes[has_sentiment], weights=sentiments[has_sentiment],
+                                            minlength=7 * 24).reshape(7, 24)
+        bins.sentiment_counts = np.bincount(codes[has_sentiment], minlength=7 * 24).reshape(7, 24)
+        bins._entries = dict(zip(np.asarray(days)[valid].tolist(),
+                                 zip(codes.tolist(), scores.tolist(), sentiments.tolist())))
+        return bins
+
+    @classmethod
+    def from_frame(cls, df):
+        """Bin a mood DataFrame that has its Timestamp column loaded."""
+        return cls.from_arrays(day_numbers(df['Date'].to_numpy()), epoch_seconds(df['Timestamp']),
+                               df['Mood_Score'].to_numpy(), df['Sentiment_Score'].to_numpy())
+
+    def set(self, day, epoch, score, sentiment=None):
+        """Bin the entry of ``day`` (a day number), moving it out of the bin of the entry it replaces."""
+        previous = self._entries.pop(day, None)
+        if previous is not None:
+            self._count(*previous, -1)
+        if epoch == MISSING:
+            return
+        sentiment = np.nan if sentiment is None else float(sentiment)
+        entry = (int(bin_codes([epoch])[0]), int(score), sentiment)
+        self._entries[day] = entry
+        self._count(*entry, 1)
+
+    def _count(self, code, score, sentiment, delta):
+        weekday, hour = divmod(code, 24)
+        self.counts[weekday, hour, score - 1] += delta
+        if not np.isnan(sentiment):
+            self.sentiment_totals[weekday, hour] += delta * sentiment
+            self.sentiment_counts[weekday, hour] += delta
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @property
+    def total(self):
+        """Number of binned entries."""
+        return len(self._entries)
+
+    def hours(self):
+        """Count, share, mean mood and mean sentiment of the entries logged in each hour, indexed 0-23."""
+        return self._summary(self.counts.sum(axis=0), self.sentiment_totals.sum(axis=0),
+                             self.sentiment_counts.sum(axis=0), pd.RangeIndex(24, name='Hour'))
+
+    def day_parts(self):
+        """Count, share, mean mood and mean sentiment of the entries logged in each of the ``DAY_PARTS``."""
+        parts = np.eye(len(DAY_PARTS), dtype=np.int64)[HOUR_PARTS].T  # (parts, 24) membership
+        return self._summary(parts @ self.counts.sum(axis=0), parts @ self.sentiment_totals.sum(axis=0),
+                             parts @ self.sentiment_counts.sum(axis=0), pd.Index(list(DAY_PARTS), name='Part'))
+
+    def weekday_hours(self):
+        """Weekday x hour-of-day ``(count, mean)`` frames (7 rows, 24 columns) of the mood score."""
+        count = self.counts.sum(axis=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.counts @ np.arange(1, 6) / count
+        index = pd.Index(WEEKDAY_NAMES, name='Weekday')
+        columns = pd.RangeIndex(24, name='Hour')
+        return pd.DataFrame(count, index=index, columns=columns), pd.DataFrame(mean, index=index, columns=columns)
+
+    def usual_hour(self):
+        """The hour most entries are logged in, or None without any."""
+        hours = self.counts.sum(axis=(0, 2))
+        return int(hours.argmax()) if hours.any() else None
+
+    def _summary(self, counts, sentiment_totals, sentiment_counts, index):
+        """Frame of ``(groups, 5)`` score counts and the matching sentiment sums."""
+        count = counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({
+                'count': count,
+                'share': count / max(count.sum(), 1),
+                'mean': counts @ np.arange(1, 6) / count,
+                'sentiment': sentiment_totals / sentiment_counts,
+            }, index=index)
+
+
+def _stat_signature(path, inode_only=False):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino if inode_only else (stat.st_ino, stat.st_size, stat.st_mtime_ns)
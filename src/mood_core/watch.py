@@ -0,0 +1,150 @@
+# Mood Data File Watcher
+# inotify on Linux, cheap stat polling everywhere else
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class MoodFileWatcher:
+    """
+    Calls ``callback`` from a background thread whenever the mood data
+    file or its write-ahead log changes.
+
+    The callback only signals; the owner decides when to pick up the new
+    rows (e.g. ``MoodStore.refresh`` from the Tk thread), so a burst of
+    writes costs a single tail read.
+    """
+
+    def __init__(self, data_file, callback, poll_interval=1.0, debounce=0.05):
+        self.data_file = data_file
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+
+        self.directory = os.path.dirname(os.path.abspath(data_file))
+        self.watched_names = {os.path.basename(data_file), os.path.basename(data_file) + '.wal'}
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._inotify_fd = None
+        self._last_signature = None
+
+    @property
+    def backend(self):
+        """Name of the active change-detection mechanism."""
+        return 'inotify' if self._inotify_fd is not None else 'polling'
+
+    def start(self):
+        """Start watching in a daemon thread."""
+        if self._thread is not None:
+            return self
+
+        self._inotify_fd = _open_inotify(self.directory)
+        self._last_signature = self._signature()
+        target = self._watch_inotify if self._inotify_fd is not None else self._watch_polling
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop watching and release the inotify descriptor."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def _watch_inotify(self):
+        """Block on inotify events for the data directory."""
+        fd = self._inotify_fd
+        while not self._stop.is_set():
+            ready, _, _ = select.select([fd], [], [], 0.5)
+            if not ready:
+                continue
+
+            names = _read_event_names(fd)
+
+            # Coalesce the events of one write (data, fsync, lock release)
+            time.sleep(self.debounce)
+            while select.select([fd], [], [], 0)[0]:
+                names |= _read_event_names(fd)
+
+            if names & self.watched_names:
+                self._notify()
+
+    def _watch_polling(self):
+        """Compare file signatures every ``poll_interval`` seconds."""
+        while not self._stop.wait(self.poll_interval):
+            current = self._signature()
+            if current != self._last_signature:
+                self._last_signature = current
+                self._notify()
+
+    def _signature(self):
+        """Return ``(inode, size, mtime)`` for each watched file."""
+        signature = []
+        for name in sorted(self.watched_names):
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+                signature.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _notify(self):
+        """Run the callback, keeping the watcher alive if it fails."""
+        try:
+            self.callback()
+        except Exception as e:
+            print(f"⚠️ File watcher callback error: {e}")
+
+
+def _open_inotify(directory):
+    """Return an inotify descriptor watching ``directory``, or None if unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+def _read_event_names(fd):
+    """Read pending inotify events and return the file names they mention."""
+    data = os.read(fd, 64 * 1024)
+    names = set()
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(data):
+        _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+        offset += _EVENT_HEADER.size
+        raw_name = data[offset:offset + length].rstrip(b'\0')
+        offset += length
+        if raw_name:
+            names.add(os.fsdecode(raw_name))
+    return names
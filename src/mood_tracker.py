@@ -1,21 +1,16 @@
 # Adaptive Emotion-Based Productivity Assistant with Daily Reminders
 # Day 10: Adding daily reminder functionality with the schedule library
 
-import csv
+import argparse
 import os
-from datetime import datetime, timedelta
-import sys
-import matplotlib.pyplot as plt
-import pandas as pd
-from textblob import TextBlob
-from collections import Counter, defaultdict
+from datetime import datetime
 import numpy as np
-import random
 import schedule
 import time
 import threading
 import json
-from pathlib import Path
+from mood_core import (BACKENDS, DAY_PARTS, MISMATCHES, MoodDataset, MoodStore, MOOD_SCALE, analyze_sentiment,
+                       correlation_strength, perf, set_backend)
 
 class MoodTrackerWithReminders:
     """
@@ -25,14 +20,7 @@ class MoodTrackerWithReminders:
     def __init__(self, data_file='data/mood_data.csv'):
         self.data_file = data_file
         self.settings_file = 'data/settings.json'
-        
-        self.mood_scale = {
-            1: "Very Sad 😢",
-            2: "Sad 😞", 
-            3: "Neutral 😐",
-            4: "Happy 😊",
-            5: "Very Happy 😄"
-        }
+        self.mood_scale = MOOD_SCALE
         
         # Default reminder settings
         self.default_settings = {
@@ -45,9 +33,10 @@ class MoodTrackerWithReminders:
         
         # Setup data directory and files
         self.setup_data_directory()
-        self.initialize_csv_file()
+        self.data = MoodDataset(self.data_file)
         self.load_settings()
-        self.load_data()
+        if len(self.df) > 0:
+            print(f"📊 Loaded {len(self.df)} existing mood entries")
         
         # Start background reminder scheduler
         self.reminder_thread = None
@@ -65,13 +54,10 @@ class MoodTrackerWithReminders:
         if not os.path.exists(reports_dir):
             os.makedirs(reports_dir)
     
-    def initialize_csv_file(self):
-        """Create CSV file with proper headers if it doesn't exist."""
-        if not os.path.exists(self.data_file):
-            with open(self.data_file, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
-            print(f"✅ Created new mood data file: {self.data_file}")
+    @property
+    def df(self):
+        """De-duplicated, date-sorted mood history."""
+        return self.data.df
     
     def load_settings(self):
         """Load user settings from JSON file."""
@@ -97,20 +83,13 @@ class MoodTrackerWithReminders:
             print(f"⚠️ Error saving settings: {e}")
     
     def load_data(self):
-        """Load existing data from CSV into pandas DataFrame."""
+        """Reload the full mood history from disk."""
         try:
-            if os.path.exists(self.data_file):
-                self.df = pd.read_csv(self.data_file)
-                if len(self.df) > 0:
-                    self.df['Date'] = pd.to_datetime(self.df['Date'])
-                    print(f"📊 Loaded {len(self.df)} existing mood entries")
-                else:
-                    self.df = pd.DataFrame(columns=['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
-            else:
-                self.df = pd.DataFrame(columns=['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
+            self.data.load()
+            if len(self.df) > 0:
+                print(f"📊 Loaded {len(self.df)} existing mood entries")
         except Exception as e:
             print(f"⚠️ Error loading data: {e}")
-            self.df = pd.DataFrame(columns=['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
     
     def start_reminder_scheduler(self):
         """Start the background scheduler for daily reminders."""
@@ -185,31 +164,11 @@ class MoodTrackerWithReminders:
     
     def has_logged_today(self):
         """Check if user has already logged mood today."""
-        if len(self.df) == 0:
-            return False
-        
-        today = datetime.now().date()
-        today_entries = self.df[self.df['Date'].dt.date == today]
-        return len(today_entries) > 0
+        return self.data.has_logged_today()
     
     def calculate_streak(self):
         """Calculate current logging streak."""
-        if len(self.df) == 0:
-            return 0
-        
-        sorted_df = self.df.sort_values('Date', ascending=False)
-        streak = 0
-        current_date = datetime.now().date()
-        
-        for _, row in sorted_df.iterrows():
-            entry_date = row['Date'].date()
-            if (current_date - entry_date).days == streak:
-                streak += 1
-                current_date = entry_date
-            else:
-                break
-        
-        return streak
+        return self.data.aggregates.streak()
     
     def configure_reminders(self):
         """Configure reminder settings through interactive menu."""
@@ -341,25 +300,7 @@ class MoodTrackerWithReminders:
     
     def analyze_sentiment(self, text):
         """Analyze sentiment of text using TextBlob."""
-        if not text or text.strip() == "":
-            return 0.0, "Neutral"
-        
-        try:
-            blob = TextBlob(text)
-            sentiment_score = blob.sentiment.polarity
-            
-            if sentiment_score > 0.1:
-                sentiment_label = "Positive"
-            elif sentiment_score < -0.1:
-                sentiment_label = "Negative"
-            else:
-                sentiment_label = "Neutral"
-            
-            return round(sentiment_score, 3), sentiment_label
-            
-        except Exception as e:
-            print(f"⚠️ Sentiment analysis error: {e}")
-            return 0.0, "Neutral"
+        return analyze_sentiment(text)
     
     def log_mood(self):
         """Main mood logging function."""
@@ -397,9 +338,6 @@ class MoodTrackerWithReminders:
         # Update streak counter
         streak = self.calculate_streak()
         print(f"\n🎉 Great job! Current streak: {streak} days")
-        
-        # Reload data to include new entry
-        self.load_data()
     
     def display_mood_scale(self):
         """Display the mood scale options."""
@@ -437,20 +375,14 @@ class MoodTrackerWithReminders:
         note = input("Note: ").strip()
         return note
     
+    @perf.timed('cli.save_entry')
     def save_mood_entry(self, mood_score, mood_label, note, sentiment_score, sentiment_label):
-        """Save mood entry to CSV file."""
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        current_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        mood_entry = [current_date, mood_score, mood_label, note, sentiment_score, sentiment_label, current_timestamp]
-        
+        """Save today's mood entry."""
         try:
-            with open(self.data_file, 'a', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(mood_entry)
+            mood_entry = self.data.log_entry(mood_score, note, sentiment=(sentiment_score, sentiment_label))
             
             print(f"\n✅ Mood entry saved successfully!")
-            print(f"   Date: {current_date}")
+            print(f"   Date: {mood_entry[0]}")
             print(f"   Mood: {mood_label}")
             print(f"   Note: {note if note else 'No note added'}")
             
@@ -459,8 +391,27 @@ class MoodTrackerWithReminders:
     
     def update_mood_entry(self, date):
         """Update existing mood entry for a given date."""
-        # Implementation similar to your existing code
-        pass
+        print(f"\n✏️ UPDATE ENTRY FOR {date}")
+        self.display_mood_scale()
+        mood_score, mood_label = self.get_mood_input()
+        
+        if mood_score is None:
+            return
+        
+        note = self.get_note_input()
+        sentiment_score, sentiment_label = self.analyze_sentiment(note)
+        
+        try:
+            # Replaces the day's entry with one log record; the CSV is rewritten only on compaction
+            self.data.log_entry(mood_score, note, date=date, sentiment=(sentiment_score, sentiment_label))
+            
+            print(f"\n✅ Mood entry updated successfully!")
+            print(f"   Date: {date}")
+            print(f"   Mood: {mood_label}")
+            print(f"   Note: {note if note else 'No note added'}")
+            
+        except Exception as e:
+            print(f"❌ Error updating mood entry: {e}")
     
     def run(self):
         """Main application loop with reminder functionality."""
@@ -484,8 +435,7 @@ class MoodTrackerWithReminders:
                     # Add your existing create_mood_frequency_chart method
                     pass
                 elif choice == '5':
-                    # Add your existing analyze_weekday_patterns method
-                    pass
+                    print_weekday_patterns(self.data)
                 elif choice == '6':
                     # Add your existing get_personalized_recommendations method
                     pass
@@ -517,9 +467,231 @@ class MoodTrackerWithReminders:
                 print(f"\n❌ Unexpected error: {e}")
                 print("Please try again.")
 
+def show_statistics(data_file='data/mood_data.csv', show_perf=False, prometheus_file=None):
+    """Print summary statistics, optionally with hot-path timings."""
+    if show_perf or prometheus_file:
+        perf.enable()
+    
+    data = MoodDataset(data_file)
+    aggregates = data.aggregates
+    
+    print("\n📊 MOOD STATISTICS")
+    print("="*40)
+    if aggregates.count == 0:
+        print("No mood entries yet. Log your first mood to see statistics!")
+    else:
+        most_common = aggregates.most_common()
+        print(f"Total entries:    {aggregates.count}")
+        print(f"Date range:       {data.df['Date'].min():%Y-%m-%d} → {data.df['Date'].max():%Y-%m-%d}")
+        print(f"Average mood:     {aggregates.mean():.2f}/5.0")
+        stats = aggregates.stats
+        if stats.std() is not None:
+            print(f"Std. deviation:   {stats.std():.2f}")
+        if stats.sentiment_mean() is not None:
+            print(f"Sentiment median: {stats.sentiment_quantile(0.5):+.3f} "
+                  f"(IQR {stats.sentiment_quantile(0.25):+.3f} to {stats.sentiment_quantile(0.75):+.3f})")
+        print(f"Most common mood: {MOOD_SCALE[most_common]}")
+        print(f"Current streak:   {aggregates.streak()} days")
+        print(f"Last 7 days:      {aggregates.recent_count(7)} entries")
+        print(f"Logged today:     {'✅ yes' if data.has_logged_today() else '❓ not yet'}")
+    
+    if show_perf:
+        print("\n⏱️ PERFORMANCE")
+        print("="*40)
+        print(perf.format_table())
+    
+    if prometheus_file:
+        perf.write_prometheus(prometheus_file)
+        print(f"\n📁 Metrics written to {prometheus_file}")
+
+def print_weekday_patterns(data, hours=False):
+    """Print the mood by weekday with 95% intervals, optionally as a weekday x hour grid."""
+    weekdays = data.weekdays()
+    
+    print("\n📅 WEEKDAY PATTERNS")
+    print("="*40)
+    if weekdays['count'].sum() == 0:
+        print("No mood entries yet. Log your first mood to see weekday patterns!")
+        return
+    
+    print(f"{'Day':<10} {'Entries':>7} {'Average':>8}   95% interval")
+    for day, row in weekdays.iterrows():
+        if row['count'] == 0:
+            print(f"{day:<10} {0:>7}        —")
+            continue
+        interval = f"{row['ci_low']:.2f} – {row['ci_high']:.2f}" if row['count'] > 1 else "—"
+        print(f"{day:<10} {int(row['count']):>7} {row['mean']:>8.2f}   {interval}")
+    
+    if not hours:
+        return
+    
+    counts, means = data.weekday_hours()
+    print("\n🕐 AVERAGE MOOD BY HOUR LOGGED")
+    print(f"{'':<4}" + "".join(f"{hour:>4}" for hour in range(24)))
+    for day in means.index:
+        cells = "".join(f"{mean:>4.1f}" if count else f"{'·':>4}"
+                        for count, mean in zip(counts.loc[day], means.loc[day]))
+        print(f"{day[:3]:<4}{cells}")
+    
+    parts = data.time_of_day().day_parts()
+    print(f"\n{'Part of day':<20} {'Entries':>7} {'Share':>6} {'Average':>8} {'Sentiment':>10}")
+    for part, row in parts.iterrows():
+        if row['count'] == 0:
+            print(f"{DAY_PARTS[part]:<20} {0:>7}")
+            continue
+        print(f"{DAY_PARTS[part]:<20} {int(row['count']):>7} {row['share']:>6.0%} {row['mean']:>8.2f} "
+              f"{row['sentiment']:>+10.2f}")
+
+def print_forecast(data, days=7):
+    """Print the mood forecast for the coming days with its 95% band."""
+    forecast = data.forecast(days)
+    
+    print("\n🔮 MOOD FORECAST")
+    print("="*40)
+    if len(forecast) == 0:
+        print("No mood entries yet. Log your first mood to see a forecast!")
+        return
+    
+    print(f"{'Day':<16} {'Forecast':>8}   95% band")
+    for _, row in forecast.iterrows():
+        print(f"{row['Date']:%a %Y-%m-%d}   {row['Forecast']:>8.2f}   {row['Low']:.2f} – {row['High']:.2f}")
+
+def print_correlation(data, months=6):
+    """Print how the mood scores track note sentiment: overall, by weekday, by recent month and mismatches."""
+    correlation = data.correlations()
+    overall = correlation.overall()
+    
+    print("\n🔗 MOOD VS. NOTE SENTIMENT")
+    print("="*40)
+    if np.isnan(overall):
+        print("Not enough entries with notes yet to relate mood and sentiment!")
+        return
+    
+    print(f"Overall Pearson r: {overall:+.2f} ({correlation_strength(overall)})")
+    
+    def rows(frame, label):
+        print(f"\n{label:<10} {'Entries':>7} {'Pearson':>8} {'Spearman':>9}")
+        for name, row in frame.iterrows():
+            pearson = "—" if np.isnan(row['pearson']) else f"{row['pearson']:+.2f}"
+            spearman = "—" if np.isnan(row['spearman']) else f"{row['spearman']:+.2f}"
+            print(f"{name:<10} {int(row['count']):>7} {pearson:>8} {spearman:>9}")
+    
+    rows(correlation.weekdays(), 'Day')
+    monthly = correlation.monthly().tail(months)
+    rows(monthly.set_axis(monthly.index.strftime('%Y-%m')), 'Month')
+    
+    mismatched = data.mismatches(30)
+    print(f"\n🧩 Score/note mismatches in the last 30 days: {len(mismatched)}")
+    for _, row in mismatched.tail(5).iterrows():
+        print(f"  {row['Date']:%Y-%m-%d}  {row['Mood_Score']}/5, sentiment {row['Sentiment_Score']:+.2f}  "
+              f"({MISMATCHES[row['Mismatch']]})")
+
+def print_keywords(data, limit=10, recount=False):
+    """Print the note terms that stand out on high-mood and on low-mood days."""
+    if recount:
+        data.check_terms(rebuild=True)
+        print("🔁 Recounted the note terms")
+    
+    for title, scores in (("😊 ON YOUR BEST DAYS (4-5)", (4, 5)), ("😔 ON HARDER DAYS (1-2)", (1, 2))):
+        print(f"\n{title}")
+        print("="*40)
+        terms = data.keywords(scores, limit)
+        if not terms:
+            print("Not enough notes with these scores yet!")
+        for term, weight, notes in terms:
+            print(f"  {term:<24} {weight:>6.3f}   in {notes} notes")
+
+def search_notes(data_file='data/mood_data.csv', query='', start=None, end=None, moods=None, limit=20,
+                 reindex=False):
+    """Print the entries whose notes match ``query``, newest first."""
+    data = MoodDataset(data_file)
+    if reindex:
+        data.check_note_index(rebuild=True)
+        print("🔁 Rebuilt the note index")
+    
+    rows = data.search(query, start, end, moods)
+    print(f"\n🔎 {len(rows)} {'entry matches' if len(rows) == 1 else 'entries match'} {query!r}")
+    if len(rows) == 0:
+        return
+    
+    shown = data.with_text(rows.iloc[::-1].head(limit))
+    for _, row in shown.iterrows():
+        print(f"  {row['Date']:%Y-%m-%d}  {MOOD_SCALE[row['Mood_Score']]:<14}  {row['Note']}")
+    if len(rows) > limit:
+        print(f"  … {len(rows) - limit} older matches (use --limit to see more)")
+
+def export_report(data_file='data/mood_data.csv', start=None, end=None):
+    """Write a PDF report for a date range without loading the rest of the history."""
+    from mood_tracker_pdf import export_range_pdf
+    
+    if export_range_pdf(data_file, start, end) is None:
+        print("⚠️ No report was written")
+
+def serve_api(data_file='data/mood_data.csv', host='127.0.0.1', port=8765):
+    """Serve the tracker as a local HTTP/JSON API until interrupted."""
+    from mood_api import serve
+    
+    serve(data_file, host, port)
+
+def archive_partitions(data_file='data/mood_data.csv', before_year=None):
+    """Fold the monthly partitions of old years into one compressed archive per year."""
+    before_year = before_year or datetime.now().year - 1
+    archived = MoodStore(data_file).archive(before_year)
+    if archived:
+        print(f"📦 Archived {archived} monthly partitions from before {before_year}")
+    else:
+        print(f"Nothing to archive before {before_year}.")
+
 def main():
     """Main function with dependency checking."""
     
+    parser = argparse.ArgumentParser(description="Adaptive Emotion-Based Productivity Assistant")
+    parser.add_argument('--sentiment', choices=list(BACKENDS),
+                        help="sentiment backend for new notes (default: MOOD_SENTIMENT or textblob)")
+    subcommands = parser.add_subparsers(dest='command')
+    stats_parser = subcommands.add_parser('stats', help="print mood statistics and exit")
+    stats_parser.add_argument('--perf', action='store_true',
+                              help="also report call counts and latencies of the hot paths")
+    stats_parser.add_argument('--prometheus', metavar='FILE',
+                              help="write the timings to FILE in Prometheus text format")
+    stats_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    report_parser = subcommands.add_parser('report', help="export a PDF report for a date range and exit")
+    report_parser.add_argument('--from', dest='start', metavar='YYYY-MM-DD', help="first day (default: first entry)")
+    report_parser.add_argument('--to', dest='end', metavar='YYYY-MM-DD', help="last day (default: last entry)")
+    report_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    weekdays_parser = subcommands.add_parser('weekdays', help="print mood by weekday and exit")
+    weekdays_parser.add_argument('--hours', action='store_true',
+                                 help="also print a weekday x hour-of-day grid and the mood by part of day")
+    weekdays_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    forecast_parser = subcommands.add_parser('forecast', help="print the mood forecast and exit")
+    forecast_parser.add_argument('--days', type=int, default=7, help="days to forecast (default 7)")
+    forecast_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    correlation_parser = subcommands.add_parser('correlation', help="relate mood scores to note sentiment and exit")
+    correlation_parser.add_argument('--months', type=int, default=6, help="recent months to list (default 6)")
+    correlation_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    keywords_parser = subcommands.add_parser('keywords', help="print the note terms tied to high and low moods")
+    keywords_parser.add_argument('--limit', type=int, default=10, help="terms per group (default 10)")
+    keywords_parser.add_argument('--recount', action='store_true', help="recount the note terms first")
+    keywords_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    search_parser = subcommands.add_parser('search', help="search the notes and exit")
+    search_parser.add_argument('query', help='words that must all appear; "quote" phrases')
+    search_parser.add_argument('--from', dest='start', metavar='YYYY-MM-DD', help="first day")
+    search_parser.add_argument('--to', dest='end', metavar='YYYY-MM-DD', help="last day")
+    search_parser.add_argument('--mood', type=int, action='append', choices=range(1, 6),
+                               help="only entries with this score (repeatable)")
+    search_parser.add_argument('--limit', type=int, default=20, help="matches to print (default 20)")
+    search_parser.add_argument('--reindex', action='store_true', help="rebuild the note index first")
+    search_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    archive_parser = subcommands.add_parser('archive', help="compress the monthly partitions of old years")
+    archive_parser.add_argument('--before-year', type=int,
+                                help="archive every year before this one (default: last year)")
+    archive_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    serve_parser = subcommands.add_parser('serve', help="serve a local HTTP/JSON API (log, stats, charts, reports)")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="address to bind (default 127.0.0.1)")
+    serve_parser.add_argument('--port', type=int, default=8765, help="port (default 8765)")
+    serve_parser.add_argument('--data-file', default='data/mood_data.csv', help="mood data CSV")
+    args = parser.parse_args()
+    
     # Check for required libraries
     missing_libs = []
     
@@ -543,6 +715,36 @@ def main():
         print("\nThen run the program again!")
         return
     
+    if args.sentiment:
+        set_backend(args.sentiment)
+    if args.command == 'stats':
+        show_statistics(args.data_file, args.perf, args.prometheus)
+        return
+    if args.command == 'report':
+        export_report(args.data_file, args.start, args.end)
+        return
+    if args.command == 'weekdays':
+        print_weekday_patterns(MoodDataset(args.data_file), args.hours)
+        return
+    if args.command == 'forecast':
+        print_forecast(MoodDataset(args.data_file), args.days)
+        return
+    if args.command == 'correlation':
+        print_correlation(MoodDataset(args.data_file), args.months)
+        return
+    if args.command == 'keywords':
+        print_keywords(MoodDataset(args.data_file), args.limit, args.recount)
+        return
+    if args.command == 'search':
+        search_notes(args.data_file, args.query, args.start, args.end, args.mood, args.limit, args.reindex)
+        return
+    if args.command == 'archive':
+        archive_partitions(args.data_file, args.before_year)
+        return
+    if args.command == 'serve':
+        serve_api(args.data_file, args.host, args.port)
+        return
+    
     # Run the application
     print("🚀 Starting Adaptive Emotion-Based Productivity Assistant with Reminders...")
     tracker = MoodTrackerWithReminders()
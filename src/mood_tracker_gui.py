@@ -4,16 +4,14 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import csv
-import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.colors import ListedColormap
 import pandas as pd
-from textblob import TextBlob
-import numpy as np
-import random
-from PIL import Image, ImageTk
+from mood_core import (MoodDataset, MOOD_EMOJIS, MOOD_SCALE,
+                       analyze_sentiment, calendar_ticks, generate_sample_entries, nearest_score,
+                       perf, profile_from_argv)
 
 class MoodTrackerGUI:
     """
@@ -22,13 +20,7 @@ class MoodTrackerGUI:
     
     def __init__(self):
         self.data_file = 'data/mood_data.csv'
-        self.mood_scale = {
-            1: "Very Sad 😢",
-            2: "Sad 😞", 
-            3: "Neutral 😐",
-            4: "Happy 😊",
-            5: "Very Happy 😄"
-        }
+        self.mood_scale = MOOD_SCALE
         
         # Colors for modern UI
         self.colors = {
@@ -43,39 +35,19 @@ class MoodTrackerGUI:
         }
         
         # Setup data
-        self.setup_data_directory()
-        self.initialize_csv_file()
-        self.load_data()
+        self.data = MoodDataset(self.data_file)
         
         # Create GUI
         self.create_gui()
-        
-    def setup_data_directory(self):
-        """Create data directory if it doesn't exist."""
-        data_dir = os.path.dirname(self.data_file)
-        if data_dir and not os.path.exists(data_dir):
-            os.makedirs(data_dir)
     
-    def initialize_csv_file(self):
-        """Create CSV file with proper headers if it doesn't exist."""
-        if not os.path.exists(self.data_file):
-            with open(self.data_file, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
+    @property
+    def df(self):
+        """De-duplicated, date-sorted mood history."""
+        return self.data.df
     
     def load_data(self):
-        """Load existing data from CSV into pandas DataFrame."""
-        try:
-            if os.path.exists(self.data_file):
-                self.df = pd.read_csv(self.data_file)
-                if len(self.df) > 0:
-                    self.df['Date'] = pd.to_datetime(self.df['Date'])
-                else:
-                    self.df = pd.DataFrame(columns=['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
-            else:
-                self.df = pd.DataFrame(columns=['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
-        except Exception as e:
-            self.df = pd.DataFrame(columns=['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
+        """Reload the full mood history from disk."""
+        self.data.load()
     
     def create_gui(self):
         """Create the main GUI interface."""
@@ -155,23 +127,7 @@ class MoodTrackerGUI:
     
     def calculate_streak(self):
         """Calculate current logging streak."""
-        if len(self.df) == 0:
-            return 0
-        
-        # Sort by date and check consecutive days
-        sorted_df = self.df.sort_values('Date', ascending=False)
-        streak = 0
-        current_date = datetime.now().date()
-        
-        for _, row in sorted_df.iterrows():
-            entry_date = row['Date'].date()
-            if (current_date - entry_date).days == streak:
-                streak += 1
-                current_date = entry_date
-            else:
-                break
-        
-        return streak
+        return self.data.aggregates.streak()
     
     def create_mood_log_tab(self):
         """Create the mood logging tab."""
@@ -309,6 +265,10 @@ class MoodTrackerGUI:
         self.weekday_frame = ttk.Frame(chart_notebook)
         chart_notebook.add(self.weekday_frame, text="📅 Weekday Patterns")
         
+        # Calendar heatmap
+        self.calendar_frame = ttk.Frame(chart_notebook)
+        chart_notebook.add(self.calendar_frame, text="🗓️ Mood Calendar")
+        
         # Create charts
         self.create_charts()
     
@@ -355,8 +315,8 @@ class MoodTrackerGUI:
         avg_frame = ttk.LabelFrame(parent, text="Average Mood", padding=15)
         avg_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
         
-        if len(self.df) > 0:
-            avg_mood = self.df['Mood_Score'].mean()
+        avg_mood = self.data.aggregates.mean()
+        if avg_mood is not None:
             avg_text = f"{avg_mood:.1f}"
             avg_emoji = self.get_mood_emoji(avg_mood)
         else:
@@ -390,7 +350,7 @@ class MoodTrackerGUI:
         """Create all the analytics charts."""
         if len(self.df) < 2:
             # Show message if not enough data
-            for frame in [self.trends_frame, self.frequency_frame, self.weekday_frame]:
+            for frame in [self.trends_frame, self.frequency_frame, self.weekday_frame, self.calendar_frame]:
                 ttk.Label(frame,
                          text="Generate sample data to view charts",
                          font=('Helvetica', 14),
@@ -403,6 +363,9 @@ class MoodTrackerGUI:
         # Frequency chart
         self.create_frequency_chart()
         
+        # Calendar heatmap
+        self.create_calendar_chart()
+        
         # Weekday patterns
         if len(self.df) >= 7:
             self.create_weekday_chart()
@@ -412,8 +375,14 @@ class MoodTrackerGUI:
                      font=('Helvetica', 14),
                      background=self.colors['light']).pack(expand=True)
     
-    def create_trends_chart(self):
-        """Create mood trends line chart."""
+    def embed_figure(self, fig, frame):
+        """Render a chart figure into a Tk frame."""
+        canvas = FigureCanvasTkAgg(fig, frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+    
+    def build_trends_figure(self):
+        """Build the mood trends figure; usable headless."""
         fig, ax = plt.subplots(figsize=(10, 6))
         fig.patch.set_facecolor('white')
         
@@ -426,6 +395,15 @@ class MoodTrackerGUI:
                 markeredgecolor=self.colors['primary'], markeredgewidth=2)
         ax.fill_between(dates, moods, alpha=0.3, color=self.colors['primary'])
         
+        # Forecast for the coming week with its 95% band
+        forecast = self.data.forecast()
+        if len(forecast):
+            ax.plot(forecast['Date'], forecast['Forecast'], linestyle='--', linewidth=2,
+                    color=self.colors['secondary'], label='7-day forecast')
+            ax.fill_between(forecast['Date'], forecast['Low'], forecast['High'],
+                            alpha=0.2, color=self.colors['secondary'], label='95% band')
+            ax.legend(loc='upper left')
+        
         ax.set_title('Your Mood Trends Over Time', fontsize=16, fontweight='bold', pad=20)
         ax.set_xlabel('Date', fontsize=12)
         ax.set_ylabel('Mood Score', fontsize=12)
@@ -435,43 +413,46 @@ class MoodTrackerGUI:
         ax.grid(True, alpha=0.3)
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
-        canvas = FigureCanvasTkAgg(fig, self.trends_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        return fig
     
-    def create_frequency_chart(self):
-        """Create mood frequency pie chart."""
+    @perf.timed('chart.light.trends')
+    def create_trends_chart(self):
+        """Create mood trends line chart."""
+        self.embed_figure(self.build_trends_figure(), self.trends_frame)
+    
+    def build_frequency_figure(self):
+        """Build the mood frequency figure; usable headless."""
         fig, ax = plt.subplots(figsize=(8, 8))
         fig.patch.set_facecolor('white')
         
-        mood_counts = self.df['Mood_Label'].value_counts()
+        # Count by score so entries saved under older label spellings aren't split
+        score_counts = self.data.aggregates.score_counts
+        scores = [score for score in sorted(score_counts) if score_counts[score] > 0]
         colors = ['#FF6B6B', '#FFA07A', '#FFD700', '#98FB98', '#87CEEB']
         
-        wedges, texts, autotexts = ax.pie(mood_counts.values, 
-                                         labels=mood_counts.index, 
+        wedges, texts, autotexts = ax.pie([score_counts[score] for score in scores], 
+                                         labels=[self.mood_scale[score] for score in scores], 
                                          autopct='%1.1f%%',
-                                         colors=colors, 
+                                         colors=[colors[score - 1] for score in scores], 
                                          startangle=90,
                                          textprops={'fontsize': 12})
         
         ax.set_title('Your Mood Distribution', fontsize=16, fontweight='bold', pad=20)
         
-        canvas = FigureCanvasTkAgg(fig, self.frequency_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        return fig
     
-    def create_weekday_chart(self):
-        """Create weekday patterns bar chart."""
+    @perf.timed('chart.light.frequency')
+    def create_frequency_chart(self):
+        """Create mood frequency pie chart."""
+        self.embed_figure(self.build_frequency_figure(), self.frequency_frame)
+    
+    def build_weekday_figure(self):
+        """Build the weekday patterns figure; usable headless."""
         fig, ax = plt.subplots(figsize=(10, 6))
         fig.patch.set_facecolor('white')
         
-        df_copy = self.df.copy()
-        df_copy['Weekday'] = df_copy['Date'].dt.day_name()
-        weekday_moods = df_copy.groupby('Weekday')['Mood_Score'].mean()
-        
-        weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        available_days = [day for day in weekday_order if day in weekday_moods.index]
-        weekday_moods = weekday_moods.reindex(available_days)
+        weekdays = self.data.weekdays()
+        weekday_moods = weekdays.loc[weekdays['count'] > 0, 'mean']
         
         colors_list = ['#FF6B6B', '#FFA07A', '#FFD700', '#98FB98', '#87CEEB', '#DDA0DD', '#F0E68C']
         bars = ax.bar(weekday_moods.index, weekday_moods.values, 
@@ -492,9 +473,41 @@ class MoodTrackerGUI:
         
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
-        canvas = FigureCanvasTkAgg(fig, self.weekday_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        return fig
+    
+    @perf.timed('chart.light.weekday')
+    def create_weekday_chart(self):
+        """Create weekday patterns bar chart."""
+        self.embed_figure(self.build_weekday_figure(), self.weekday_frame)
+    
+    def build_calendar_figure(self):
+        """Build the calendar heatmap from the precomputed day grid; usable headless."""
+        fig, ax = plt.subplots(figsize=(10, 4))
+        fig.patch.set_facecolor('white')
+        
+        # One image for the whole range, one cell per day (Monday on top)
+        matrix, first_monday = self.data.aggregates.calendar.weeks()
+        cmap = ListedColormap(['#FF6B6B', '#FFA07A', '#FFD700', '#98FB98', '#87CEEB'])
+        cmap.set_bad('#EEEEEE')
+        image = ax.imshow(matrix, cmap=cmap, vmin=0.5, vmax=5.5, aspect='auto', interpolation='nearest')
+        
+        ax.set_title('Your Mood Calendar', fontsize=16, fontweight='bold', pad=20)
+        columns, labels = calendar_ticks(first_monday, matrix.shape[1])
+        ax.set_xticks(columns)
+        ax.set_xticklabels(labels)
+        ax.set_yticks([0, 2, 4])
+        ax.set_yticklabels(['Mon', 'Wed', 'Fri'])
+        ax.tick_params(length=0)
+        
+        colorbar = fig.colorbar(image, ax=ax, ticks=[1, 2, 3, 4, 5])
+        colorbar.ax.set_yticklabels(['Very Sad', 'Sad', 'Neutral', 'Happy', 'Very Happy'])
+        
+        return fig
+    
+    @perf.timed('chart.light.calendar')
+    def create_calendar_chart(self):
+        """Create the mood calendar heatmap."""
+        self.embed_figure(self.build_calendar_figure(), self.calendar_frame)
     
     def on_mood_select(self):
         """Handle mood selection."""
@@ -507,6 +520,7 @@ class MoodTrackerGUI:
         if recommendations:
             self.quick_rec_label.config(text=f"💡 {recommendations[0]}")
     
+    @perf.timed('gui.light.save_entry')
     def save_mood_entry(self):
         """Save the mood entry."""
         mood_score = self.mood_var.get()
@@ -516,18 +530,12 @@ class MoodTrackerGUI:
         # Analyze sentiment
         sentiment_score, sentiment_label = self.analyze_sentiment(note)
         
-        # Check for duplicate (simplified - allow updates)
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        current_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        mood_entry = [current_date, mood_score, mood_label, note, sentiment_score, sentiment_label, current_timestamp]
-        
         try:
-            with open(self.data_file, 'a', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(mood_entry)
+            # Saving again on the same day replaces today's entry
+            action = "updated" if self.data.has_logged_today() else "saved"
+            self.data.log_entry(mood_score, note, sentiment=(sentiment_score, sentiment_label))
             
-            messagebox.showinfo("Success", f"Mood entry saved!\n\nMood: {mood_label}\nSentiment: {sentiment_label}")
+            messagebox.showinfo("Success", f"Mood entry {action}!\n\nMood: {mood_label}\nSentiment: {sentiment_label}")
             
             # Clear form
             self.mood_var.set(3)
@@ -535,8 +543,7 @@ class MoodTrackerGUI:
             self.mood_display.config(text="Selected: Neutral 😐")
             self.quick_rec_label.config(text="Select a mood to see personalized recommendations")
             
-            # Reload data and update displays
-            self.load_data()
+            # Update displays
             self.update_dashboard()
             self.update_recommendations()
             
@@ -559,9 +566,7 @@ class MoodTrackerGUI:
                               "This will replace existing data with 21 days of sample entries. Continue?"):
             
             # Clear existing data
-            if os.path.exists(self.data_file):
-                os.remove(self.data_file)
-            self.initialize_csv_file()
+            self.data.clear()
             
             sample_notes = [
                 "Had a great morning workout", "Stressful day at work", "Enjoyed time with friends",
@@ -573,31 +578,12 @@ class MoodTrackerGUI:
                 "Nice walk in the park", "Feeling grateful today"
             ]
             
-            base_date = datetime.now() - timedelta(days=20)
-            
-            for i in range(21):
-                date = base_date + timedelta(days=i)
-                
-                if date.weekday() >= 5:  # Weekend
-                    mood_score = random.choices([3, 4, 5], weights=[2, 4, 3])[0]
-                else:  # Weekday
-                    mood_score = random.choices([2, 3, 4, 5], weights=[1, 4, 3, 2])[0]
-                
-                mood_label = self.mood_scale[mood_score]
-                note = random.choice(sample_notes)
-                sentiment_score, sentiment_label = self.analyze_sentiment(note)
-                
-                date_str = date.strftime('%Y-%m-%d')
-                timestamp = date.strftime('%Y-%m-%d %H:%M:%S')
-                
-                mood_entry = [date_str, mood_score, mood_label, note, sentiment_score, sentiment_label, timestamp]
-                
-                with open(self.data_file, 'a', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(mood_entry)
+            sample_entries = generate_sample_entries(21, sample_notes,
+                                                     weekday_weights={2: 1, 3: 4, 4: 3, 5: 2},
+                                                     weekend_weights={3: 2, 4: 4, 5: 3})
+            self.data.log_entries(sample_entries)
             
-            # Reload and update everything
-            self.load_data()
+            # Update everything
             self.update_dashboard()
             self.update_recommendations()
             
@@ -613,6 +599,7 @@ class MoodTrackerGUI:
             
             messagebox.showinfo("Success", "Generated 21 days of sample data!")
     
+    @perf.timed('gui.light.update_dashboard')
     def update_dashboard(self):
         """Update the dashboard with recent entries."""
         # Clear existing content
@@ -626,15 +613,15 @@ class MoodTrackerGUI:
                      background=self.colors['light']).pack()
             return
         
-        # Show recent entries
-        recent_df = self.df.sort_values('Date', ascending=False).head(5)
+        # Show recent entries (the frame is kept date-sorted)
+        recent_df = self.data.with_text(self.df.tail(5)).iloc[::-1]
         
         for _, row in recent_df.iterrows():
             entry_frame = ttk.Frame(self.recent_frame)
             entry_frame.pack(fill=tk.X, pady=5)
             
             date_str = row['Date'].strftime('%Y-%m-%d (%A)')
-            mood_str = f"{row['Mood_Score']} - {row['Mood_Label']}"
+            mood_str = f"{row['Mood_Score']} - {self.mood_scale[row['Mood_Score']]}"
             note_str = row['Note'] if pd.notna(row['Note']) and row['Note'] else "No note"
             
             ttk.Label(entry_frame,
@@ -672,13 +659,14 @@ class MoodTrackerGUI:
         # Update status
         recent_mood = self.df.tail(1)['Mood_Score'].iloc[0]
         recent_mood_label = self.mood_scale[recent_mood]
-        avg_mood = self.df['Mood_Score'].mean()
+        avg_mood = self.data.aggregates.mean()
         
         status_text = f"Current Mood: {recent_mood_label} | 7-day Average: {avg_mood:.1f}"
         self.status_label.config(text=status_text)
         
         # Generate recommendations
-        recommendations = self.generate_mood_based_recommendations(recent_mood, avg_mood)
+        forecast = self.data.forecast()
+        recommendations = self.generate_mood_based_recommendations(recent_mood, avg_mood, forecast)
         
         rec_text = "🎯 RECOMMENDATIONS FOR TODAY:\n\n"
         for i, rec in enumerate(recommendations, 1):
@@ -686,13 +674,11 @@ class MoodTrackerGUI:
         
         # Add weekday insights if available
         if len(self.df) >= 7:
-            df_copy = self.df.copy()
-            df_copy['Weekday'] = df_copy['Date'].dt.day_name()
-            weekday_moods = df_copy.groupby('Weekday')['Mood_Score'].mean()
+            weekdays = self.data.weekdays()
             
             today_weekday = datetime.now().strftime('%A')
-            if today_weekday in weekday_moods:
-                typical_mood = weekday_moods[today_weekday]
+            if weekdays.at[today_weekday, 'count'] > 0:
+                typical_mood = weekdays.at[today_weekday, 'mean']
                 rec_text += f"📅 WEEKDAY INSIGHTS:\n\n"
                 rec_text += f"Typical {today_weekday} mood: {typical_mood:.1f}\n\n"
                 
@@ -704,15 +690,26 @@ class MoodTrackerGUI:
                     rec_text += f"🧘 Focus on self-care and easier, familiar tasks\n\n"
         
         # Add mood statistics
-        if len(self.df) >= 7:
-            recent_avg = self.df.tail(7)['Mood_Score'].mean()
+        last_week = self.data.recent(7)
+        if len(self.df) >= 7 and len(last_week) > 0:
+            recent_avg = last_week['Mood_Score'].mean()
             overall_avg = self.df['Mood_Score'].mean()
             
             rec_text += f"📈 TREND ANALYSIS:\n\n"
             rec_text += f"Last 7 days average: {recent_avg:.2f}\n"
-            rec_text += f"Overall average: {overall_avg:.2f}\n\n"
+            rec_text += f"Overall average: {overall_avg:.2f}\n"
+            if len(forecast):
+                best = forecast.loc[forecast['Forecast'].idxmax()]
+                lowest = forecast.loc[forecast['Forecast'].idxmin()]
+                rec_text += (f"Next 7 days forecast: {forecast['Forecast'].mean():.2f} "
+                             f"(best {best['Date']:%A}, lowest {lowest['Date']:%A})\n")
+            rec_text += "\n"
             
-            if recent_avg > overall_avg + 0.2:
+            drop_start = self.data.anomalies.ongoing().get('mood')
+            if drop_start is not None:
+                rec_text += f"⚠️ Your mood has been running below its usual level since {drop_start:%b %d}\n"
+                rec_text += f"💙 A sustained dip, not a one-off - make room for rest and support\n"
+            elif recent_avg > overall_avg + 0.2:
                 rec_text += f"🌟 You're on an upward trend! Keep it up!\n"
             elif recent_avg < overall_avg - 0.2:
                 rec_text += f"💙 Recent mood is below your average - consider self-care activities\n"
@@ -724,27 +721,10 @@ class MoodTrackerGUI:
     
     def analyze_sentiment(self, text):
         """Analyze sentiment of text using TextBlob."""
-        if not text or text.strip() == "":
-            return 0.0, "Neutral"
-        
-        try:
-            blob = TextBlob(text)
-            sentiment_score = blob.sentiment.polarity
-            
-            if sentiment_score > 0.1:
-                sentiment_label = "Positive"
-            elif sentiment_score < -0.1:
-                sentiment_label = "Negative"
-            else:
-                sentiment_label = "Neutral"
-            
-            return round(sentiment_score, 3), sentiment_label
-            
-        except Exception as e:
-            return 0.0, "Neutral"
+        return analyze_sentiment(text)
     
-    def generate_mood_based_recommendations(self, mood_score, avg_mood):
-        """Generate specific recommendations based on mood score."""
+    def generate_mood_based_recommendations(self, mood_score, avg_mood, forecast=None):
+        """Generate specific recommendations based on mood score and, if given, the week's forecast."""
         recommendations = []
         
         if mood_score == 5:  # Very Happy
@@ -783,20 +763,26 @@ class MoodTrackerGUI:
                 "⏰ Consider postponing major decisions until you feel better"
             ])
         
+        if forecast is not None and len(forecast):
+            recommendations[3] = self.forecast_recommendation(forecast, avg_mood)
+        
         return recommendations[:4]
     
+    def forecast_recommendation(self, forecast, avg_mood):
+        """One recommendation for the coming week from the mood forecast."""
+        outlook = forecast['Forecast'].mean()
+        best = forecast.loc[forecast['Forecast'].idxmax(), 'Date']
+        lowest = forecast.loc[forecast['Forecast'].idxmin(), 'Date']
+        
+        if outlook < avg_mood - 0.3:
+            return f"🌦️ The coming week looks lower than usual - keep {lowest:%A} light and plan rest"
+        if outlook > avg_mood + 0.3:
+            return f"☀️ The coming week looks brighter than usual - line up ambitious work for {best:%A}"
+        return f"🗓️ Plan demanding work for {best:%A} and lighter tasks for {lowest:%A}"
+    
     def get_mood_emoji(self, mood_score):
         """Convert mood score to emoji."""
-        if mood_score >= 4.5:
-            return "😄"
-        elif mood_score >= 3.5:
-            return "😊"
-        elif mood_score >= 2.5:
-            return "😐"
-        elif mood_score >= 1.5:
-            return "😞"
-        else:
-            return "😢"
+        return MOOD_EMOJIS[nearest_score(mood_score)]
     
     def run(self):
         """Start the GUI application."""
@@ -831,8 +817,17 @@ def main():
             return
         
         # Run the application
-        app = MoodTrackerGUI()
-        app.run()
+        profiler = profile_from_argv('mood_tracker_gui')
+        if profiler is None:
+            app = MoodTrackerGUI()
+            app.run()
+            return
+        
+        try:
+            app = profiler.run(MoodTrackerGUI, (), handler='MoodTrackerGUI.__init__', event='startup')
+            app.run()
+        finally:
+            profiler.finish()
         
     except Exception as e:
         print(f"Error starting application: {e}")
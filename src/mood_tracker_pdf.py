@@ -2,24 +2,76 @@
 # Fixes all character encoding and font issues
 
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import matplotlib.pyplot as plt
+from matplotlib.colors import ListedColormap
 import pandas as pd
 from fpdf import FPDF
+from mood_core import (DAY_PARTS, FRAME_COLUMNS, MOOD_LABELS, DayGrid, HourBins, MoodAnomalies, MoodStats,
+                       MoodStore, calendar_ticks, describe_anomaly, perf)
 
 class SimplePDFExporter:
     """Simple, working PDF exporter without character encoding issues."""
     
-    def __init__(self, df, data_file):
+    def __init__(self, df, data_file, dataset=None, output_dir='data'):
         self.df = df
         self.data_file = data_file
-        self.mood_scale = {
-            1: "Very Sad",
-            2: "Sad", 
-            3: "Neutral",
-            4: "Happy",
-            5: "Very Happy"
-        }
+        self.dataset = dataset  # MoodDataset that ``df`` came from, used to fetch notes
+        self.charts_dir = os.path.join(output_dir, 'charts')
+        self.reports_dir = os.path.join(output_dir, 'reports')
+        self.mood_scale = MOOD_LABELS
+        self._stats = None
+        self._anomalies = None
+        self._hour_bins = None
+        self._calendar = None
+    
+    @property
+    def stats(self):
+        """Running ``MoodStats`` of the report's entries, reused from the dataset for a full export."""
+        if self._stats is None:
+            if self.dataset is not None and self.df is self.dataset.df:
+                self._stats = self.dataset.aggregates.stats
+            else:
+                self._stats = MoodStats.from_frame(self.df)
+        return self._stats
+    
+    @property
+    def anomalies(self):
+        """``MoodAnomalies`` of the report's entries, reused from the dataset for a full export."""
+        if self._anomalies is None:
+            if self.dataset is not None and self.df is self.dataset.df:
+                self._anomalies = self.dataset.anomalies
+            else:
+                self._anomalies = MoodAnomalies.from_frame(self.df)
+        return self._anomalies
+    
+    @property
+    def hour_bins(self):
+        """``HourBins`` of the report's entries by the time they were logged, reused from the dataset for a full export."""
+        if self._hour_bins is None:
+            if self.dataset is not None and self.df is self.dataset.df:
+                self._hour_bins = self.dataset.time_of_day()
+            elif 'Timestamp' in self.df:
+                self._hour_bins = HourBins.from_frame(self.df)
+            elif self.dataset is not None:
+                self._hour_bins = HourBins.from_frame(self.dataset.with_text(self.df))
+            else:
+                self._hour_bins = HourBins()  # no timestamps to bin; the time-of-day section is left out
+        return self._hour_bins
+    
+    @property
+    def calendar(self):
+        """``DayGrid`` of the report's entries, reused from the dataset for a full export."""
+        if self._calendar is None:
+            if self.dataset is not None and self.df is self.dataset.df:
+                self._calendar = self.dataset.aggregates.calendar
+            else:
+                self._calendar = DayGrid.from_frame(self.df.sort_values('Date'))
+        return self._calendar
+    
+    def mood_counts(self):
+        """``{score: count}`` of the logged scores, lowest first."""
+        return {score: int(self.stats.score_counts[score]) for score in range(1, 6) if self.stats.score_counts[score]}
     
     def clean_text(self, text):
         """Remove emojis and special characters for PDF compatibility."""
@@ -31,6 +83,7 @@ class SimplePDFExporter:
         cleaned = ''.join(char for char in text_str if ord(char) < 128)
         return cleaned.strip()
     
+    @perf.timed('pdf.charts')
     def generate_charts_for_pdf(self):
         """Generate clean charts for PDF embedding."""
         if len(self.df) < 2:
@@ -55,14 +108,14 @@ class SimplePDFExporter:
             plt.xticks(rotation=45)
             plt.tight_layout()
             
-            trends_path = 'data/charts/simple_trends.png'
+            trends_path = os.path.join(self.charts_dir, 'simple_trends.png')
             plt.savefig(trends_path, dpi=150, bbox_inches='tight', facecolor='white')
             plt.close()
             chart_paths['trends'] = trends_path
             
             # 2. Simple Bar Chart for Distribution
             plt.figure(figsize=(8, 6))
-            mood_counts = self.df['Mood_Score'].value_counts().sort_index()
+            mood_counts = pd.Series(self.mood_counts())
             
             plt.bar(mood_counts.index, mood_counts.values, color='lightblue', edgecolor='blue')
             plt.title('Mood Distribution', fontsize=14, fontweight='bold')
@@ -76,17 +129,61 @@ class SimplePDFExporter:
             
             plt.tight_layout()
             
-            dist_path = 'data/charts/simple_distribution.png'
+            dist_path = os.path.join(self.charts_dir, 'simple_distribution.png')
             plt.savefig(dist_path, dpi=150, bbox_inches='tight', facecolor='white')
             plt.close()
             chart_paths['distribution'] = dist_path
             
+            # 3. Average mood by hour logged
+            hours = self.hour_bins.hours()
+            hours = hours[hours['count'] > 0]
+            if len(hours):
+                plt.figure(figsize=(10, 5))
+                plt.bar(hours.index, hours['mean'], color='lightblue', edgecolor='blue')
+                plt.title('Average Mood by Hour Logged', fontsize=14, fontweight='bold')
+                plt.xlabel('Hour of Day')
+                plt.ylabel('Average Mood Score')
+                plt.xticks(range(0, 24, 3))
+                plt.xlim(-0.5, 23.5)
+                plt.ylim(0, 5.5)
+                plt.grid(True, axis='y', alpha=0.3)
+                plt.tight_layout()
+                
+                hours_path = os.path.join(self.charts_dir, 'simple_hours.png')
+                plt.savefig(hours_path, dpi=150, bbox_inches='tight', facecolor='white')
+                plt.close()
+                chart_paths['hours'] = hours_path
+            
+            # 4. Calendar heatmap of the report's range in one image
+            matrix, first_monday = self.calendar.weeks(self.df['Date'].min(), self.df['Date'].max())
+            cmap = ListedColormap(['#FF6B6B', '#FFA07A', '#FFD700', '#98FB98', '#87CEEB'])
+            cmap.set_bad('#EEEEEE')
+            
+            fig, ax = plt.subplots(figsize=(10, 3.5))
+            image = ax.imshow(matrix, cmap=cmap, vmin=0.5, vmax=5.5, aspect='auto', interpolation='nearest')
+            ax.set_title('Mood Calendar', fontsize=14, fontweight='bold')
+            columns, labels = calendar_ticks(first_monday, matrix.shape[1])
+            ax.set_xticks(columns)
+            ax.set_xticklabels(labels)
+            ax.set_yticks([0, 2, 4])
+            ax.set_yticklabels(['Mon', 'Wed', 'Fri'])
+            ax.tick_params(length=0)
+            colorbar = fig.colorbar(image, ax=ax, ticks=[1, 2, 3, 4, 5])
+            colorbar.ax.set_yticklabels(['Very Sad', 'Sad', 'Neutral', 'Happy', 'Very Happy'])
+            plt.tight_layout()
+            
+            calendar_path = os.path.join(self.charts_dir, 'simple_calendar.png')
+            plt.savefig(calendar_path, dpi=150, bbox_inches='tight', facecolor='white')
+            plt.close()
+            chart_paths['calendar'] = calendar_path
+            
             return chart_paths
             
         except Exception as e:
             print(f"Error generating charts: {e}")
             return {}
     
+    @perf.timed('pdf.report')
     def create_simple_pdf_report(self):
         """Create a simple, working PDF report."""
         if len(self.df) == 0:
@@ -116,8 +213,8 @@ class SimplePDFExporter:
             pdf.cell(0, 10, 'SUMMARY STATISTICS', 0, 1)
             
             pdf.set_font('Arial', '', 11)
-            total_entries = len(self.df)
-            avg_mood = self.df['Mood_Score'].mean()
+            total_entries = self.stats.count
+            avg_mood = self.stats.mean()
             date_range = (self.df['Date'].max() - self.df['Date'].min()).days + 1
             
             stats = [
@@ -126,6 +223,11 @@ class SimplePDFExporter:
                 f"Tracking Period: {date_range} days",
                 f"Date Range: {self.df['Date'].min().strftime('%Y-%m-%d')} to {self.df['Date'].max().strftime('%Y-%m-%d')}"
             ]
+            if self.stats.std() is not None:
+                stats.append(f"Mood Std. Deviation: {self.stats.std():.2f}")
+            if self.stats.sentiment_mean() is not None:
+                stats.append(f"Median Sentiment: {self.stats.sentiment_quantile(0.5):+.3f} "
+                             f"(IQR {self.stats.sentiment_quantile(0.25):+.3f} to {self.stats.sentiment_quantile(0.75):+.3f})")
             
             for stat in stats:
                 pdf.cell(0, 8, stat, 0, 1)
@@ -137,12 +239,34 @@ class SimplePDFExporter:
             pdf.cell(0, 10, 'MOOD BREAKDOWN', 0, 1)
             pdf.set_font('Arial', '', 10)
             
-            mood_counts = self.df['Mood_Score'].value_counts().sort_index()
-            for mood_score, count in mood_counts.items():
+            for mood_score, count in self.mood_counts().items():
                 mood_label = self.mood_scale[mood_score]
                 percentage = (count / total_entries) * 100
                 pdf.cell(0, 6, f"{mood_label}: {count} times ({percentage:.1f}%)", 0, 1)
             
+            # When entries are logged and how the mood differs across the day
+            parts = self.hour_bins.day_parts()
+            if parts['count'].sum():
+                pdf.ln(10)
+                pdf.set_font('Arial', 'B', 12)
+                pdf.cell(0, 10, 'TIME OF DAY', 0, 1)
+                pdf.set_font('Arial', '', 10)
+                for part, row in parts[parts['count'] > 0].iterrows():
+                    pdf.cell(0, 6, f"{DAY_PARTS[part]}: {int(row['count'])} entries ({row['share']:.0%}), "
+                                   f"average mood {row['mean']:.2f}/5.0", 0, 1)
+                pdf.cell(0, 6, f"Most entries are logged around {self.hour_bins.usual_hour():02d}:00", 0, 1)
+            
+            # Unusual days flagged by the anomaly detector, newest first
+            flagged = self.anomalies.flagged()
+            if flagged:
+                pdf.ln(10)
+                pdf.set_font('Arial', 'B', 12)
+                pdf.cell(0, 10, 'UNUSUAL DAYS', 0, 1)
+                pdf.set_font('Arial', '', 10)
+                pdf.cell(0, 6, f"{len(flagged)} flagged days; the latest:", 0, 1)
+                for day, tags in reversed(flagged[-10:]):
+                    pdf.cell(0, 6, f"{day:%Y-%m-%d}: {describe_anomaly(tags)}", 0, 1)
+            
             # Add charts if available
             if chart_paths:
                 pdf.add_page()
@@ -162,6 +286,19 @@ class SimplePDFExporter:
                     pdf.set_font('Arial', 'B', 12)
                     pdf.cell(0, 8, 'Mood Distribution', 0, 1)
                     pdf.image(chart_paths['distribution'], x=20, y=pdf.get_y(), w=170)
+                
+                # Calendar heatmap and time-of-day chart on their own page
+                if 'calendar' in chart_paths or 'hours' in chart_paths:
+                    pdf.add_page()
+                if 'calendar' in chart_paths:
+                    pdf.set_font('Arial', 'B', 12)
+                    pdf.cell(0, 8, 'Mood Calendar', 0, 1)
+                    pdf.image(chart_paths['calendar'], x=10, y=pdf.get_y(), w=190)
+                    pdf.ln(75)
+                if 'hours' in chart_paths:
+                    pdf.set_font('Arial', 'B', 12)
+                    pdf.cell(0, 8, 'Average Mood by Hour Logged', 0, 1)
+                    pdf.image(chart_paths['hours'], x=10, y=pdf.get_y(), w=190)
             
             # Recent entries (simplified)
             pdf.add_page()
@@ -170,6 +307,8 @@ class SimplePDFExporter:
             pdf.ln(5)
             
             recent_df = self.df.sort_values('Date', ascending=False).head(8)
+            if 'Note' not in recent_df and self.dataset is not None:
+                recent_df = self.dataset.with_text(recent_df)
             
             pdf.set_font('Arial', '', 10)
             for _, row in recent_df.iterrows():
@@ -178,9 +317,12 @@ class SimplePDFExporter:
                 
                 pdf.cell(0, 6, f"Date: {date_str}", 0, 1)
                 pdf.cell(0, 6, mood_str, 0, 1)
+                tags = self.anomalies.flags.get(row['Date'].date())
+                if tags:
+                    pdf.cell(0, 6, f"Flagged: {describe_anomaly(tags)}", 0, 1)
                 
                 # Add note if available (cleaned)
-                if pd.notna(row['Note']) and str(row['Note']).strip():
+                if pd.notna(row.get('Note')) and str(row['Note']).strip():
                     note_text = self.clean_text(str(row['Note']))
                     if len(note_text) > 80:
                         note_text = note_text[:80] + "..."
@@ -190,7 +332,7 @@ class SimplePDFExporter:
             
             # Save PDF
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            pdf_filename = f'data/reports/simple_mood_report_{timestamp}.pdf'
+            pdf_filename = os.path.join(self.reports_dir, f'simple_mood_report_{timestamp}.pdf')
             pdf.output(pdf_filename)
             
             print(f"PDF report created successfully!")
@@ -216,7 +358,25 @@ def export_simple_pdf(mood_tracker_instance):
         print("Generate sample data first!")
         return
     
-    exporter = SimplePDFExporter(mood_tracker_instance.df, mood_tracker_instance.data_file)
+    exporter = SimplePDFExporter(mood_tracker_instance.df, mood_tracker_instance.data_file,
+                                 getattr(mood_tracker_instance, 'data', None))
+    return exporter.create_simple_pdf_report()
+
+def export_range_pdf(data_file, start=None, end=None):
+    """
+    Export a report covering only the entries dated ``start``..``end``.
+    
+    Reads just the monthly partitions that overlap the range, so a
+    one-month report doesn't load years of history.
+    """
+    df = MoodStore(data_file, columns=FRAME_COLUMNS).read_range(start, end)
+    if len(df) == 0:
+        print("No mood entries in that date range!")
+        return None
+    
+    os.makedirs('data/charts', exist_ok=True)
+    os.makedirs('data/reports', exist_ok=True)
+    exporter = SimplePDFExporter(df, data_file)
     return exporter.create_simple_pdf_report()
 
 # Test function
@@ -233,7 +393,7 @@ def test_pdf_export():
     for i in range(10):
         date = base_date + timedelta(days=i)
         mood_score = random.randint(2, 5)
-        mood_label = {1: "Very Sad", 2: "Sad", 3: "Neutral", 4: "Happy", 5: "Very Happy"}[mood_score]
+        mood_label = MOOD_LABELS[mood_score]
         note = f"Sample note for day {i+1}"
         
         sample_data.append({
@@ -2,26 +2,23 @@
 # Dark blue background with high contrast interactive elements
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import csv
-import os
-from datetime import datetime, timedelta
+from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.colors import ListedColormap
 import pandas as pd
-from textblob import TextBlob
 import numpy as np
-import random
+import threading
+from mood_core import (DAY_PARTS, MoodDataset, MoodFileWatcher, MoodSnapshot, MISMATCHES, MOOD_LABELS, MOOD_EMOJIS,
+                       analyze_sentiment, calendar_ticks, correlation_strength, describe_anomaly, empty_frame,
+                       generate_sample_entries, perf, profile_from_argv)
 
 class MoodWiseDark:
     def __init__(self):
         self.data_file = 'data/mood_data.csv'
         self.mood_scale = {
-            1: {"label": "Very Low", "emoji": "😢"},
-            2: {"label": "Low", "emoji": "😞"}, 
-            3: {"label": "Neutral", "emoji": "😐"},
-            4: {"label": "High", "emoji": "😊"},
-            5: {"label": "Very High", "emoji": "😄"}
+            score: {"label": label, "emoji": MOOD_EMOJIS[score]}
+            for score, label in MOOD_LABELS.items()
         }
         
         # Dark professional theme colors
@@ -82,24 +79,98 @@ class MoodWiseDark:
         self.create_dark_gui()
         
     def setup_data(self):
-        os.makedirs('data', exist_ok=True)
-        
-        if not os.path.exists(self.data_file):
-            with open(self.data_file, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
+        # Paint the header and cards from the summary snapshot and load the
+        # full history in the background; without a snapshot, load it now
+        self.snapshot = MoodSnapshot.read(self.data_file)
+        self.data = None
+        self.loaded_data = None
+        self.load_error = None
+        self.load_thread = None
+        
+        if self.snapshot is None:
+            self.data = MoodDataset(self.data_file)
+            return
         
-        self.load_data()
+        self.load_thread = threading.Thread(target=self.load_data_in_background, daemon=True)
+        self.load_thread.start()
     
-    def load_data(self):
+    def load_data_in_background(self):
         try:
-            self.df = pd.read_csv(self.data_file)
-            if len(self.df) > 0:
-                self.df['Date'] = pd.to_datetime(self.df['Date'])
-            else:
-                self.df = pd.DataFrame(columns=['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
+            self.loaded_data = MoodDataset(self.data_file)
         except Exception as e:
-            self.df = pd.DataFrame(columns=['Date', 'Mood_Score', 'Mood_Label', 'Note', 'Sentiment_Score', 'Sentiment_Label', 'Timestamp'])
+            self.load_error = e
+    
+    def poll_data_loaded(self):
+        """Tk-thread side of the background load: swap the full data in once it is ready."""
+        if self.load_thread.is_alive():
+            self.root.after(100, self.poll_data_loaded)
+            return
+        
+        if self.data is None:
+            self.ensure_data()
+            self.refresh_live_widgets(None)
+    
+    def ensure_data(self):
+        """Wait for the background load; retry it here if it failed."""
+        if self.data is not None:
+            return self.data
+        
+        self.load_thread.join()
+        if self.loaded_data is None:
+            print(f"⚠️ Background load failed ({self.load_error}), retrying")
+            self.loaded_data = MoodDataset(self.data_file)
+        self.data = self.loaded_data
+        return self.data
+    
+    @property
+    def df(self):
+        return self.data.df if self.data is not None else empty_frame()
+    
+    @property
+    def aggregates(self):
+        return self.data.aggregates if self.data is not None else self.snapshot
+    
+    def load_data(self):
+        self.ensure_data().load()
+    
+    def start_data_watcher(self):
+        """Watch the data file so entries logged by other processes show up live."""
+        self.data_changed = threading.Event()
+        self.watcher = MoodFileWatcher(self.data_file, self.data_changed.set).start()
+        self.root.after(500, self.poll_data_changes)
+        if self.data is None:
+            self.root.after(100, self.poll_data_loaded)
+    
+    def poll_data_changes(self):
+        """Tk-thread side of the watcher: pick up only the new rows."""
+        # While the background load runs the event stays set: a write landing after
+        # it read the files is synced once the loaded dataset is swapped in
+        if self.data is not None and self.data_changed.is_set():
+            self.data_changed.clear()
+            try:
+                changes = self.data.sync()
+                if changes is None or changes:
+                    self.refresh_live_widgets(changes)
+            except Exception as e:
+                print(f"⚠️ Live update failed: {e}")
+        
+        self.root.after(500, self.poll_data_changes)
+    
+    @perf.timed('gui.dark.refresh_live')
+    def refresh_live_widgets(self, changes):
+        """Update the widgets that depend on the changed entries."""
+        self.update_header_stats()
+        self.update_metric_cards()
+        
+        # The activity list shows the newest 8 days; skip it for back-dated edits
+        shown = self.recent_dates
+        if changes is None or len(shown) < 8 or any(key >= min(shown) for key in changes):
+            self.update_dark_recent_activity()
+        
+        if self.current_view == "analytics":
+            self.update_dark_analytics()
+        elif self.current_view == "insights":
+            self.update_dark_insights()
     
     def create_dark_gui(self):
         self.root = tk.Tk()
@@ -112,6 +183,7 @@ class MoodWiseDark:
         plt.style.use('dark_background')
         
         self.create_dark_layout()
+        self.start_data_watcher()
     
     def create_dark_layout(self):
         # Main container with dark theme
@@ -157,7 +229,7 @@ class MoodWiseDark:
         right_header.pack(side=tk.RIGHT, fill=tk.Y)
         
         self.header_stats = tk.Label(right_header,
-                                   text=f"Sessions: {len(self.df)} | Streak: {self.calculate_streak()}d",
+                                   text=f"Sessions: {self.aggregates.count} | Streak: {self.calculate_streak()}d",
                                    font=self.fonts['body_medium'],
                                    fg=self.colors['text_accent'],
                                    bg=self.colors['primary_bg'])
@@ -291,7 +363,8 @@ class MoodWiseDark:
         metrics_container.pack(fill=tk.X)
         
         # Enhanced metric cards with dark theme
-        self.create_dark_metric_card(metrics_container, "Total Sessions", str(len(self.df)), self.colors['accent'], 0)
+        self.metric_labels = {}
+        self.create_dark_metric_card(metrics_container, "Total Sessions", str(self.aggregates.count), self.colors['accent'], 0)
         self.create_dark_metric_card(metrics_container, "Average Score", self.get_avg_mood_display(), self.colors['success'], 1)
         self.create_dark_metric_card(metrics_container, "Current Streak", f"{self.calculate_streak()} days", self.colors['warning'], 2)
         self.create_dark_metric_card(metrics_container, "This Week", self.get_week_summary(), self.colors['danger'], 3)
@@ -318,6 +391,7 @@ class MoodWiseDark:
                              fg=self.colors['text_primary'],
                              bg=self.colors['surface'])
         value_label.pack(anchor='w')
+        self.metric_labels[title] = value_label
         
         # Clear title with accent color
         title_label = tk.Label(card_content,
@@ -522,6 +596,28 @@ class MoodWiseDark:
                              bg=self.colors['secondary_bg'])
         title_label.pack(side=tk.LEFT)
         
+        # Note search: Enter searches, an empty box goes back to recent entries
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(header_frame,
+                                textvariable=self.search_var,
+                                width=28,
+                                font=self.fonts['body'],
+                                fg=self.colors['text_primary'],
+                                bg=self.colors['input_bg'],
+                                insertbackground=self.colors['text_primary'],
+                                selectbackground=self.colors['accent'],
+                                relief='solid',
+                                bd=2)
+        search_entry.pack(side=tk.RIGHT, ipady=6)
+        search_entry.bind("<Return>", lambda e: self.update_dark_recent_activity())
+        search_entry.bind("<Escape>", lambda e: (self.search_var.set(""), self.update_dark_recent_activity()))
+        
+        tk.Label(header_frame,
+                text="🔎",
+                font=self.fonts['body'],
+                fg=self.colors['text_muted'],
+                bg=self.colors['secondary_bg']).pack(side=tk.RIGHT, padx=(0, 8))
+        
         # Enhanced activity container
         self.activity_container = tk.Frame(activity_section, bg=self.colors['surface'], relief='solid', bd=2)
         self.activity_container.configure(highlightbackground=self.colors['border'])
@@ -566,10 +662,14 @@ class MoodWiseDark:
         self.trends_frame = tk.Frame(self.chart_notebook, bg=self.colors['surface'])
         self.frequency_frame = tk.Frame(self.chart_notebook, bg=self.colors['surface'])
         self.patterns_frame = tk.Frame(self.chart_notebook, bg=self.colors['surface'])
+        self.time_of_day_frame = tk.Frame(self.chart_notebook, bg=self.colors['surface'])
+        self.calendar_frame = tk.Frame(self.chart_notebook, bg=self.colors['surface'])
         
         self.chart_notebook.add(self.trends_frame, text="📈 Trends")
         self.chart_notebook.add(self.frequency_frame, text="🍕 Distribution")
         self.chart_notebook.add(self.patterns_frame, text="📅 Patterns")
+        self.chart_notebook.add(self.time_of_day_frame, text="🕐 Time of Day")
+        self.chart_notebook.add(self.calendar_frame, text="🗓️ Calendar")
         
         self.views["analytics"] = analytics
     
@@ -654,13 +754,16 @@ class MoodWiseDark:
                 )
         
         if view_name == "analytics":
+            self.ensure_data()
             self.update_dark_analytics()
         elif view_name == "insights":
+            self.ensure_data()
             self.update_dark_insights()
     
     def quick_mood_entry(self):
         self.switch_view("overview")
     
+    @perf.timed('gui.dark.save_entry')
     def save_quick_mood(self):
         mood_score = self.mood_var.get()
         mood_data = self.mood_scale[mood_score]
@@ -668,15 +771,13 @@ class MoodWiseDark:
         
         sentiment_score, sentiment_label = self.analyze_sentiment(note)
         
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        current_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        mood_entry = [current_date, mood_score, mood_data['label'], note, sentiment_score, sentiment_label, current_timestamp]
-        
         try:
-            with open(self.data_file, 'a', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(mood_entry)
+            self.ensure_data()
+            
+            # Saving again on the same day replaces today's entry
+            action = "Updated" if self.data.has_logged_today() else "Saved"
+            entry = self.data.log_entry(mood_score, note, sentiment=(sentiment_score, sentiment_label))
+            current_date = entry[0]
             
             # Enhanced success message with dark theme
             msg = tk.Toplevel(self.root)
@@ -687,7 +788,7 @@ class MoodWiseDark:
             msg.grab_set()
             
             tk.Label(msg, 
-                    text="✅ Entry Saved Successfully!",
+                    text=f"✅ Entry {action} Successfully!",
                     font=self.fonts['subheading'],
                     fg=self.colors['success'],
                     bg=self.colors['surface']).pack(pady=20)
@@ -712,51 +813,46 @@ class MoodWiseDark:
             self.quick_note_entry.delete("1.0", tk.END)
             self.select_enhanced_mood(3)
             
-            self.load_data()
-            self.update_header_stats()
-            self.update_dark_recent_activity()
+            self.refresh_live_widgets([current_date])
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save entry: {str(e)}")
     
     def get_avg_mood_display(self):
-        if len(self.df) == 0:
+        avg_mood = self.aggregates.mean()
+        if avg_mood is None:
             return "—"
-        return f"{self.df['Mood_Score'].mean():.1f}"
+        return f"{avg_mood:.1f}"
     
     def get_week_summary(self):
-        if len(self.df) == 0:
-            return "—"
-        
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_data = self.df[self.df['Date'] >= week_ago]
-        return f"{len(recent_data)} entries" if len(recent_data) > 0 else "—"
+        recent_count = self.aggregates.recent_count(7)
+        return f"{recent_count} entries" if recent_count > 0 else "—"
     
     def calculate_streak(self):
-        if len(self.df) == 0:
-            return 0
-        
-        sorted_df = self.df.sort_values('Date', ascending=False)
-        streak = 0
-        current_date = datetime.now().date()
-        
-        for _, row in sorted_df.iterrows():
-            entry_date = row['Date'].date()
-            if (current_date - entry_date).days == streak:
-                streak += 1
-                current_date = entry_date
-            else:
-                break
-        
-        return streak
+        return self.aggregates.streak()
     
     def update_header_stats(self):
-        self.header_stats.config(text=f"Sessions: {len(self.df)} | Streak: {self.calculate_streak()}d")
+        self.header_stats.config(text=f"Sessions: {self.aggregates.count} | Streak: {self.calculate_streak()}d")
+    
+    def update_metric_cards(self):
+        self.metric_labels["Total Sessions"].config(text=str(self.aggregates.count))
+        self.metric_labels["Average Score"].config(text=self.get_avg_mood_display())
+        self.metric_labels["Current Streak"].config(text=f"{self.calculate_streak()} days")
+        self.metric_labels["This Week"].config(text=self.get_week_summary())
     
     def update_dark_recent_activity(self):
         # Clear existing content
         for widget in self.activity_container.winfo_children():
             widget.destroy()
+        self.recent_dates = []
+        
+        if self.data is None:
+            tk.Label(self.activity_container,
+                    text="⏳ Loading history...",
+                    font=self.fonts['body'],
+                    fg=self.colors['text_muted'],
+                    bg=self.colors['surface']).pack(expand=True, pady=80)
+            return
         
         if len(self.df) == 0:
             empty_frame = tk.Frame(self.activity_container, bg=self.colors['surface'])
@@ -775,12 +871,34 @@ class MoodWiseDark:
                     bg=self.colors['surface']).pack(pady=(12, 0))
             return
         
-        # Show recent entries with dark theme
-        recent_df = self.df.sort_values('Date', ascending=False).head(8)
+        query = self.search_var.get().strip()
+        if query:
+            self.show_dark_search_results(query)
+            return
+        
+        # Show recent entries with dark theme (the store keeps the frame date-sorted)
+        recent_df = self.data.with_text(self.df.tail(8)).iloc[::-1]
+        self.recent_dates = [date.strftime('%Y-%m-%d') for date in recent_df['Date']]
         
         for i, (_, row) in enumerate(recent_df.iterrows()):
             self.create_dark_activity_row(self.activity_container, row, i)
     
+    @perf.timed('gui.dark.search')
+    def show_dark_search_results(self, query):
+        """List the newest 8 entries whose notes match ``query`` in the activity panel."""
+        matches = self.data.search(query)
+        
+        tk.Label(self.activity_container,
+                text=f"{len(matches)} {'entry matches' if len(matches) == 1 else 'entries match'} \"{query}\"  ·  Esc to clear",
+                font=self.fonts['caption'],
+                fg=self.colors['text_muted'],
+                bg=self.colors['surface']).pack(anchor='w', padx=24, pady=(12, 4))
+        
+        # recent_dates stays empty, so every live change refreshes the results
+        shown = self.data.with_text(matches.tail(8)).iloc[::-1]
+        for i, (_, row) in enumerate(shown.iterrows()):
+            self.create_dark_activity_row(self.activity_container, row, i)
+    
     def create_dark_activity_row(self, parent, row, index):
         # Enhanced dark activity rows
         bg_color = self.colors['surface_light'] if index % 2 == 0 else self.colors['surface']
@@ -831,7 +949,8 @@ class MoodWiseDark:
         """Update analytics charts with dark theme"""
         if len(self.df) == 0:
             # Show "no data" message in each tab
-            for frame in [self.trends_frame, self.frequency_frame, self.patterns_frame]:
+            for frame in [self.trends_frame, self.frequency_frame, self.patterns_frame, self.time_of_day_frame,
+                          self.calendar_frame]:
                 for widget in frame.winfo_children():
                     widget.destroy()
                 tk.Label(frame, 
@@ -844,13 +963,17 @@ class MoodWiseDark:
         self.create_trends_chart()
         self.create_frequency_chart() 
         self.create_patterns_chart()
+        self.create_time_of_day_chart()
+        self.create_calendar_chart()
     
-    def create_trends_chart(self):
-        """Create mood trends over time chart"""
-        # Clear existing content
-        for widget in self.trends_frame.winfo_children():
-            widget.destroy()
-        
+    def embed_figure(self, fig, frame):
+        """Render a chart figure into a Tk frame."""
+        canvas = FigureCanvasTkAgg(fig, frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+    
+    def build_trends_figure(self):
+        """Build the mood trends figure; usable headless"""
         # Prepare data
         chart_df = self.df.copy()
         chart_df = chart_df.sort_values('Date')
@@ -864,6 +987,16 @@ class MoodWiseDark:
         ax.plot(chart_df['Date'], chart_df['Mood_Score'], 
                color=self.colors['accent'], linewidth=3, marker='o', markersize=6)
         
+        # Forecast for the coming week with its 95% band
+        forecast = self.data.forecast()
+        if len(forecast):
+            ax.plot(forecast['Date'], forecast['Forecast'], linestyle='--', linewidth=2,
+                    color=self.colors['text_secondary'], label='7-day forecast')
+            ax.fill_between(forecast['Date'], forecast['Low'], forecast['High'],
+                            alpha=0.2, color=self.colors['accent'], label='95% band')
+            ax.legend(loc='upper left', facecolor=self.colors['surface'], edgecolor=self.colors['border'],
+                      labelcolor=self.colors['text_secondary'])
+        
         # Style the chart
         ax.set_title('Mood Trends Over Time', 
                     color=self.colors['text_primary'], 
@@ -881,17 +1014,19 @@ class MoodWiseDark:
         
         plt.tight_layout()
         
-        # Add to tkinter
-        canvas = FigureCanvasTkAgg(fig, self.trends_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-
-    def create_frequency_chart(self):
-        """Create mood frequency distribution chart"""
+        return fig
+    
+    @perf.timed('chart.dark.trends')
+    def create_trends_chart(self):
+        """Create mood trends over time chart"""
         # Clear existing content
-        for widget in self.frequency_frame.winfo_children():
+        for widget in self.trends_frame.winfo_children():
             widget.destroy()
         
+        self.embed_figure(self.build_trends_figure(), self.trends_frame)
+
+    def build_frequency_figure(self):
+        """Build the mood frequency figure; usable headless"""
         # Prepare data
         mood_counts = self.df['Mood_Score'].value_counts().sort_index()
         
@@ -929,28 +1064,22 @@ class MoodWiseDark:
         
         plt.tight_layout()
         
-        # Add to tkinter
-        canvas = FigureCanvasTkAgg(fig, self.frequency_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-
-    def create_patterns_chart(self):
-        """Create weekly patterns chart"""
+        return fig
+    
+    @perf.timed('chart.dark.frequency')
+    def create_frequency_chart(self):
+        """Create mood frequency distribution chart"""
         # Clear existing content
-        for widget in self.patterns_frame.winfo_children():
+        for widget in self.frequency_frame.winfo_children():
             widget.destroy()
         
-        if len(self.df) == 0:
-            return
-        
-        # Prepare data - group by day of week
-        df_copy = self.df.copy()
-        df_copy['DayOfWeek'] = df_copy['Date'].dt.day_name()
-        df_copy['DayNum'] = df_copy['Date'].dt.dayofweek
-        
-        # Calculate average mood by day of week
-        day_avg = df_copy.groupby(['DayNum', 'DayOfWeek'])['Mood_Score'].mean().reset_index()
-        day_avg = day_avg.sort_values('DayNum')
+        self.embed_figure(self.build_frequency_figure(), self.frequency_frame)
+
+    def build_patterns_figure(self):
+        """Build the weekly patterns figure; usable headless"""
+        # Average mood by day of week, Monday first
+        weekdays = self.data.weekdays()
+        day_avg = weekdays[weekdays['count'] > 0]
         
         # Create matplotlib figure
         fig, ax = plt.subplots(figsize=(12, 6), facecolor=self.colors['surface'])
@@ -958,8 +1087,10 @@ class MoodWiseDark:
         ax.set_facecolor(self.colors['surface'])
         
         # Create line chart
-        ax.plot(day_avg['DayOfWeek'], day_avg['Mood_Score'], 
+        ax.plot(day_avg.index, day_avg['mean'], 
                color=self.colors['accent'], linewidth=4, marker='o', markersize=8)
+        ax.fill_between(day_avg.index, day_avg['ci_low'], day_avg['ci_high'],
+                        color=self.colors['accent'], alpha=0.15)
         
         # Style the chart
         ax.set_title('Weekly Mood Patterns', 
@@ -977,10 +1108,109 @@ class MoodWiseDark:
         plt.xticks(rotation=45)
         plt.tight_layout()
         
-        # Add to tkinter
-        canvas = FigureCanvasTkAgg(fig, self.patterns_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        return fig
+    
+    @perf.timed('chart.dark.patterns')
+    def create_patterns_chart(self):
+        """Create weekly patterns chart"""
+        # Clear existing content
+        for widget in self.patterns_frame.winfo_children():
+            widget.destroy()
+        
+        if len(self.df) == 0:
+            return
+        
+        self.embed_figure(self.build_patterns_figure(), self.patterns_frame)
+    
+    def build_time_of_day_figure(self):
+        """Build the time-of-day figure from the hour bins; usable headless"""
+        bins = self.data.time_of_day()
+        hours = bins.hours()
+        parts = bins.day_parts()
+        
+        # Create matplotlib figure: mood by hour logged, then by part of the day
+        fig, (hour_ax, part_ax) = plt.subplots(1, 2, figsize=(12, 6), facecolor=self.colors['surface'],
+                                               gridspec_kw={'width_ratios': [2, 1]})
+        fig.patch.set_facecolor(self.colors['surface'])
+        
+        logged = hours[hours['count'] > 0]
+        hour_ax.bar(logged.index, logged['mean'], color=self.colors['accent'], alpha=0.8, width=0.8)
+        hour_ax.set_title('Average Mood by Hour Logged', color=self.colors['text_primary'],
+                          fontsize=16, fontweight='bold', pad=20)
+        hour_ax.set_xlabel('Hour of Day', color=self.colors['text_secondary'], fontsize=12)
+        hour_ax.set_ylabel('Average Mood Score', color=self.colors['text_secondary'], fontsize=12)
+        hour_ax.set_xticks(range(0, 24, 3))
+        hour_ax.set_xlim(-0.5, 23.5)
+        
+        labels = [DAY_PARTS[part].split(' (')[0] for part in parts.index]
+        bars = part_ax.bar(labels, parts['mean'].fillna(0), color=self.colors['accent'], alpha=0.8, width=0.6)
+        part_ax.set_title('By Part of Day', color=self.colors['text_primary'],
+                          fontsize=16, fontweight='bold', pad=20)
+        
+        # Share of entries logged in each part above its bar
+        for bar, share in zip(bars, parts['share']):
+            part_ax.text(bar.get_x() + bar.get_width()/2., bar.get_height() + 0.05, f'{share:.0%}',
+                         ha='center', va='bottom', color=self.colors['text_primary'], fontweight='bold')
+        
+        for ax in (hour_ax, part_ax):
+            ax.set_facecolor(self.colors['surface'])
+            ax.grid(True, axis='y', color=self.colors['border'], alpha=0.3)
+            ax.tick_params(colors=self.colors['text_secondary'])
+            ax.set_ylim(0, 5.5)
+        
+        plt.tight_layout()
+        
+        return fig
+    
+    @perf.timed('chart.dark.time_of_day')
+    def create_time_of_day_chart(self):
+        """Create mood by time of day chart"""
+        # Clear existing content
+        for widget in self.time_of_day_frame.winfo_children():
+            widget.destroy()
+        
+        self.embed_figure(self.build_time_of_day_figure(), self.time_of_day_frame)
+    
+    def build_calendar_figure(self):
+        """Build the calendar heatmap from the precomputed day grid; usable headless"""
+        matrix, first_monday = self.data.aggregates.calendar.weeks()
+        
+        # Create matplotlib figure
+        fig, ax = plt.subplots(figsize=(12, 4), facecolor=self.colors['surface'])
+        fig.patch.set_facecolor(self.colors['surface'])
+        ax.set_facecolor(self.colors['surface'])
+        
+        # One image for the whole range, one cell per day (Monday on top)
+        cmap = ListedColormap([self.colors['danger'], self.colors['warning'], self.colors['surface_light'],
+                               self.colors['accent_pressed'], self.colors['accent']])
+        cmap.set_bad(self.colors['card'])
+        ax.imshow(matrix, cmap=cmap, vmin=0.5, vmax=5.5, aspect='auto', interpolation='nearest')
+        
+        # Style the chart
+        ax.set_title('Mood Calendar', 
+                    color=self.colors['text_primary'], 
+                    fontsize=16, fontweight='bold', pad=20)
+        columns, labels = calendar_ticks(first_monday, matrix.shape[1])
+        ax.set_xticks(columns)
+        ax.set_xticklabels(labels)
+        ax.set_yticks([0, 2, 4])
+        ax.set_yticklabels(['Mon', 'Wed', 'Fri'])
+        ax.tick_params(colors=self.colors['text_secondary'], length=0)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        
+        plt.tight_layout()
+        
+        return fig
+    
+    @perf.timed('chart.dark.calendar')
+    def create_calendar_chart(self):
+        """Create the calendar heatmap chart"""
+        # Clear existing content
+        for widget in self.calendar_frame.winfo_children():
+            widget.destroy()
+        
+        self.embed_figure(self.build_calendar_figure(), self.calendar_frame)
     
     def update_dark_insights(self):
         # Clear existing content
@@ -1008,15 +1238,57 @@ class MoodWiseDark:
         insights_content = tk.Frame(self.insights_container, bg=self.colors['secondary_bg'])
         insights_content.pack(fill=tk.BOTH, expand=True, padx=32, pady=24)
         
-        # Sample insights based on data
-        avg_mood = self.df['Mood_Score'].mean()
-        total_entries = len(self.df)
+        # Insights from the running statistics, kept current with every entry
+        stats = self.data.aggregates.stats
+        mode = stats.mode()
+        lowest, highest = stats.score_range()
         
         insights = [
-            f"📈 Your average mood score is {avg_mood:.1f}/5.0",
-            f"📊 You've logged {total_entries} mood entries",
-            f"🎯 Most common mood: {self.df['Mood_Score'].mode().iloc[0]}/5 ({self.mood_scale[self.df['Mood_Score'].mode().iloc[0]]['label']})",
+            f"📈 Your average mood score is {stats.mean():.1f}/5.0",
+            f"📊 You've logged {stats.count} mood entries",
+            f"🎯 Most common mood: {mode}/5 ({self.mood_scale[mode]['label']})",
+            f"↕️ Moods range from {lowest} to {highest}/5",
         ]
+        if stats.std() is not None:
+            insights.append(f"〰️ Typical day-to-day spread: ±{stats.std():.2f} points")
+        if stats.sentiment_mean() is not None:
+            insights.append(f"💬 Median note sentiment {stats.sentiment_quantile(0.5):+.2f} "
+                            f"(middle half {stats.sentiment_quantile(0.25):+.2f} to {stats.sentiment_quantile(0.75):+.2f})")
+        
+        # Sustained drops still running and recently flagged days, from the anomaly detector
+        anomalies = self.data.anomalies
+        for name, start in anomalies.ongoing().items():
+            subject = 'mood' if name == 'mood' else 'note sentiment'
+            insights.append(f"⚠️ Your {subject} has been running below its usual level since {start:%b %d}")
+        flagged = anomalies.recent(30)
+        if flagged:
+            day, tags = flagged[-1]
+            insights.append(f"🔎 {len(flagged)} unusual day(s) in the last 30 days; latest {day:%b %d}: "
+                            f"{describe_anomaly(tags)}")
+        
+        # How closely the scores follow what the notes say
+        correlation = self.data.correlations()
+        overall = correlation.overall()
+        if not np.isnan(overall):
+            direction = "move together" if overall >= 0 else "move in opposite directions"
+            text = (f"🔗 Mood and note sentiment {direction} {correlation_strength(overall)}ly "
+                    f"(r = {overall:+.2f})")
+            recent = correlation.rolling(last=1)
+            if len(recent) and not np.isnan(recent['pearson'].iloc[-1]):
+                text += f"; over your last 30 entries r = {recent['pearson'].iloc[-1]:+.2f}"
+            insights.append(text)
+        mismatched = self.data.mismatches(30)
+        if len(mismatched):
+            latest = mismatched.iloc[-1]
+            insights.append(f"🧩 {len(mismatched)} entries in the last 30 days where the score and note disagree; "
+                            f"latest {latest['Date']:%b %d}: {MISMATCHES[latest['Mismatch']]}")
+        
+        # Words that set the best and hardest days apart
+        for emoji, subject, scores in (("😊", "your best days", (4, 5)), ("😔", "harder days", (1, 2))):
+            terms = self.data.keywords(scores, limit=5)
+            if terms:
+                insights.append(f"{emoji} On {subject} your notes often mention: "
+                                f"{', '.join(term for term, _, _ in terms)}")
         
         for i, insight in enumerate(insights):
             insight_card = tk.Frame(insights_content, bg=self.colors['surface'], relief='solid', bd=1)
@@ -1031,7 +1303,8 @@ class MoodWiseDark:
     def generate_sample_data(self):
         """Generate sample mood data for testing"""
         if messagebox.askyesno("Generate Sample Data", 
-                              "This will add 30 days of sample mood data.\n\nContinue?"):
+                              "This will add sample mood data to the last 30 days.\n"
+                              "Days that already have an entry are kept as they are.\n\nContinue?"):
             
             sample_notes = [
                 "Productive morning session", "Challenging but rewarding day", "Great collaboration",
@@ -1040,58 +1313,30 @@ class MoodWiseDark:
                 "Strong accomplishment feeling", "Good work-life balance", "Meaningful progress made"
             ]
             
-            base_date = datetime.now() - timedelta(days=29)
-            
             try:
-                for i in range(30):
-                    date = base_date + timedelta(days=i)
-                    
-                    if date.weekday() >= 5:  # Weekend
-                        mood_score = random.choices([3, 4, 5], weights=[1, 3, 2])[0]
-                    else:  # Weekday
-                        mood_score = random.choices([2, 3, 4, 5], weights=[1, 3, 3, 1])[0]
-                    
-                    mood_data = self.mood_scale[mood_score]
-                    note = random.choice(sample_notes)
-                    sentiment_score, sentiment_label = self.analyze_sentiment(note)
-                    
-                    date_str = date.strftime('%Y-%m-%d')
-                    timestamp = date.strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    mood_entry = [date_str, mood_score, mood_data['label'], note, sentiment_score, sentiment_label, timestamp]
-                    
-                    with open(self.data_file, 'a', newline='', encoding='utf-8') as file:
-                        writer = csv.writer(file)
-                        writer.writerow(mood_entry)
+                sample_entries = generate_sample_entries(
+                    30, sample_notes,
+                    weekday_weights={2: 1, 3: 3, 4: 3, 5: 1},
+                    weekend_weights={3: 1, 4: 3, 5: 2})
+                
+                # Writes are keyed by date: never replace a day the user logged
+                data = self.ensure_data()
+                sample_entries = [entry for entry in sample_entries if not data.has_entry(entry[0])]
+                if not sample_entries:
+                    messagebox.showinfo("Generate Sample Data", "Every one of the last 30 days already has an entry.")
+                    return
                 
-                self.load_data()
-                self.update_header_stats()
-                self.update_dark_recent_activity()
+                changes = data.log_entries(sample_entries)
+                self.refresh_live_widgets(changes)
                 
-                messagebox.showinfo("Success", "Generated 30 days of sample data!")
+                messagebox.showinfo("Success", f"Generated {len(sample_entries)} days of sample data!")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to generate sample data: {str(e)}")
     
     def analyze_sentiment(self, text):
         """Analyze sentiment of text input"""
-        if not text or text.strip() == "":
-            return 0.0, "Neutral"
-        
-        try:
-            blob = TextBlob(text)
-            sentiment_score = blob.sentiment.polarity
-            
-            if sentiment_score > 0.1:
-                sentiment_label = "Positive"
-            elif sentiment_score < -0.1:
-                sentiment_label = "Negative"
-            else:
-                sentiment_label = "Neutral"
-            
-            return round(sentiment_score, 3), sentiment_label
-        except:
-            return 0.0, "Neutral"
+        return analyze_sentiment(text)
     
     def run(self):
         """Start the application"""
@@ -1103,6 +1348,7 @@ class MoodWiseDark:
         self.root.geometry(f'{width}x{height}+{x}+{y}')
         
         self.root.mainloop()
+        self.watcher.stop()
 
 def main():
     """Main function to start the application"""
@@ -1132,8 +1378,17 @@ def main():
             messagebox.showerror("Installation Required", error_msg)
             return
         
-        app = MoodWiseDark()
-        app.run()
+        profiler = profile_from_argv('mood_tracker_professional')
+        if profiler is None:
+            app = MoodWiseDark()
+            app.run()
+            return
+        
+        try:
+            app = profiler.run(MoodWiseDark, (), handler='MoodWiseDark.__init__', event='startup')
+            app.run()
+        finally:
+            profiler.finish()
         
     except Exception as e:
         import tkinter as tk
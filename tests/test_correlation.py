@@ -0,0 +1,23 @@
+import math
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from mood_core import MoodDataset
+
+
+def test_overall_after_reload(tmp_path):
+    data = MoodDataset(str(tmp_path / 'mood_data.csv'))
+    start = date(2024, 1, 1)
+    for i in range(60):
+        data.log_entry(i % 5 + 1, date=start + timedelta(days=i), sentiment=((i % 5 - 2) / 2, 'Neutral'))
+    before = data.correlations().overall()
+
+    data.load()
+    correlation = data.correlations()
+    assert not math.isnan(correlation.overall())
+    assert math.isclose(correlation.overall(), before)
+    assert len(correlation.monthly()) == 2
+    assert correlation.weekdays()['count'].sum() == 60